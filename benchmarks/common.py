@@ -0,0 +1,126 @@
+"""
+Shared helpers for the benchmark suites: timing, percentiles, result
+files and comparison against a stored baseline.
+"""
+
+import json
+import math
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Percentile with linear interpolation between closest ranks.
+    
+    Args:
+        samples: Measured values
+        q: Percentile between 0 and 100
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds of samples given in seconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4) if samples else 0.0,
+    }
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time repeated calls of a function.
+    
+    Args:
+        func: Zero-argument callable to measure
+        iterations: Measured calls
+        warmup: Unmeasured calls made first
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def environment() -> Dict[str, str]:
+    """Machine description stored alongside results"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith(("requests_per_second", "tokens_per_second"))
+
+def _compared(metric: str) -> bool:
+    return metric.endswith(("_ms", "_per_second")) and not metric.endswith("max_ms")
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2
+) -> List[Dict[str, Any]]:
+    """
+    Find metrics that got worse than the baseline by more than the tolerance.
+    
+    Latencies (``*_ms``) must not grow, rates (``*_per_second``) must not
+    drop; max latencies are too noisy to be compared.
+    
+    Args:
+        results: Current suites results
+        baseline: Stored suites results
+        tolerance: Allowed relative change, 0.2 meaning 20%
+        
+    Returns:
+        One entry per regression, empty when everything is within tolerance
+    """
+    current, previous = _flatten(results.get("suites", {})), _flatten(baseline.get("suites", {}))
+    regressions = []
+    for metric, before in previous.items():
+        after = current.get(metric)
+        if after is None or before <= 0 or not _compared(metric):
+            continue
+        change = (after - before) / before
+        worse = -change if _higher_is_better(metric) else change
+        if worse > tolerance:
+            regressions.append({
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+            })
+    return regressions
@@ -0,0 +1,133 @@
+"""
+End-to-end benchmark: full `generate_linkedin_post` runs through the
+real Ollama backend against the stand-in server, at several `n_drafts`,
+with the classic and the pipelined writer/critic loop, and one
+multi-audience generation against a generation per audience. A
+pipelined round is also run against a recording fake backend to check
+that the supervisor decision is taken while the critique is in flight.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Sequence
+
+from benchmarks.common import summarize
+from benchmarks.micro import SAMPLE_TEXT
+
+if TYPE_CHECKING:
+    from src.models.config import Configuration
+
+def run(n_drafts_values: Iterable[int] = (1, 3, 5), runs: int = 3) -> Dict[str, Any]:
+    """
+    Time complete generations.
+    
+    Args:
+        n_drafts_values: Draft counts to measure
+        runs: Generations per draft count
+        
+    Returns:
+        Latency summary and LLM call statistics per draft count, for the
+        classic (`n_drafts_N`) and the pipelined (`pipelined_n_drafts_N`)
+        workflow, the multi-audience comparison (`audiences_N`) and the
+        overlap of a pipelined round (`pipelined_round`)
+        
+    Raises:
+        RuntimeError: When the pipelined round does not overlap
+    """
+    from src.models.config import Configuration
+
+    results = {}
+    for n_drafts in n_drafts_values:
+        classic = results[f"n_drafts_{n_drafts}"] = _measure(n_drafts, runs, Configuration(pipelined=False))
+        pipelined = results[f"pipelined_n_drafts_{n_drafts}"] = _measure(n_drafts, runs, Configuration(pipelined=True))
+        pipelined["latency_reduction_percent"] = round(100 * (1 - pipelined["mean_ms"] / classic["mean_ms"]), 2) if classic["mean_ms"] else 0.0
+    results[f"audiences_{len(AUDIENCES)}"] = _measure_fan_out(AUDIENCES, 3, runs)
+    results["pipelined_round"] = _measure_round_overlap()
+    return results
+
+def _measure_round_overlap(latency: float = 0.05) -> Dict[str, Any]:
+    """Time the critique call and the supervisor decision of one pipelined round"""
+    from src.main import _initial_state
+    from src.models.config import Configuration
+    from src.services.backends.fake import FakeBackend
+    from src.services.linkedin_agent import LinkedInAgent
+    from src.utils.prompts import prompt_library
+
+    critique_system = prompt_library.get("linkedin_critique").system
+    calls, decisions = [], []
+
+    class RecordingBackend(FakeBackend):
+        async def agenerate(self, system_prompt: str, user_prompt: str, model: str, temperature: float):
+            start = time.perf_counter()
+            try:
+                return await super().agenerate(system_prompt, user_prompt, model, temperature)
+            finally:
+                calls.append((system_prompt == critique_system, start, time.perf_counter()))
+
+    agent = LinkedInAgent(
+        Configuration(pipelined=True, early_exit=False), backend=RecordingBackend(latency, 0)
+    )
+    decide = agent.supervisor_node
+
+    def supervisor_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return decide(state)
+        finally:
+            decisions.append((start, time.perf_counter()))
+
+    agent.supervisor_node = supervisor_node
+    state = _initial_state(SAMPLE_TEXT, "Engineering managers", n_drafts=3, use_cache=False)
+    asyncio.run(agent.adraft_node({**state, "edit_text": SAMPLE_TEXT}))
+    [(_, critique_start, critique_end)] = [call for call in calls if call[0]]
+    [(decision_start, decision_end)] = decisions
+    if not (critique_start <= decision_start and decision_end <= critique_end):
+        raise RuntimeError("The supervisor decision was not taken while the critique was in flight")
+    return {"llm_calls": len(calls), "decision_in_critique": True}
+
+AUDIENCES = ("Engineering managers", "CFOs", "Data scientists")
+
+def _measure_fan_out(audiences: Sequence[str], n_drafts: int, runs: int) -> Dict[str, Any]:
+    """One `generate_linkedin_posts` run against one `generate_linkedin_post` per audience"""
+    from src.main import generate_linkedin_post, generate_linkedin_posts
+
+    fan_out, sequential, calls, sequential_calls = [], [], 0, 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        calls += generate_linkedin_posts(SAMPLE_TEXT, audiences, n_drafts=n_drafts, use_cache=False)["usage"]["calls"]
+        fan_out.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for audience in audiences:
+            sequential_calls += generate_linkedin_post(
+                SAMPLE_TEXT, audience, n_drafts=n_drafts, use_cache=False
+            )["usage"]["calls"]
+        sequential.append(time.perf_counter() - start)
+    summary, baseline = summarize(fan_out), summarize(sequential)
+    return {
+        **summary,
+        "llm_calls": calls / runs,
+        "sequential_mean_ms": baseline["mean_ms"],
+        "sequential_llm_calls": sequential_calls / runs,
+        "latency_reduction_percent": round(100 * (1 - summary["mean_ms"] / baseline["mean_ms"]), 2) if baseline["mean_ms"] else 0.0,
+    }
+
+def _measure(n_drafts: int, runs: int, config: Optional["Configuration"] = None) -> Dict[str, Any]:
+    """Latency summary and LLM call statistics of `runs` generations"""
+    from src.main import generate_linkedin_post
+
+    samples, calls, completion_tokens = [], 0, 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = generate_linkedin_post(
+            SAMPLE_TEXT, "Engineering managers", n_drafts=n_drafts, config=config, use_cache=False
+        )
+        samples.append(time.perf_counter() - start)
+        usage = result["usage"]
+        calls += usage.get("calls", 0)
+        completion_tokens += usage.get("completion_tokens", 0)
+    total = sum(samples)
+    return {
+        **summarize(samples),
+        "llm_calls": calls / runs,
+        "tokens_per_second": round(completion_tokens / total, 2) if total else 0.0,
+    }
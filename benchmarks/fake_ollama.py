@@ -0,0 +1,144 @@
+"""
+Stand-in Ollama HTTP server
+---------------------------
+Serves /api/chat (streaming and not) and /api/tags with a configurable
+time to first token and token rate, so the real OllamaBackend, its
+connection pool and the whole workflow can be benchmarked without a
+model. Responses are built from the request deterministically.
+
+Usage:
+    python -m benchmarks.fake_ollama --port 11435 --latency 0.2 --tokens-per-second 50
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+MODEL = "llama3:latest"
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler; timing settings live on the server instance"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != "/api/tags":
+            self.send_error(404)
+            return
+        self._send_json({"models": [{"name": MODEL, "model": MODEL}]})
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        system, user = _prompts(body.get("messages", []))
+        tokens = _response_tokens(system, user)
+        prompt_tokens = (len(system) + len(user)) // 4
+        latency = self.server.latency
+        delay = 1 / self.server.tokens_per_second if self.server.tokens_per_second else 0
+
+        time.sleep(latency)
+        stats = {
+            "done": True,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(latency * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int(delay * len(tokens) * 1e9),
+        }
+        if not body.get("stream", True):
+            time.sleep(delay * len(tokens))
+            self._send_json({"model": MODEL, "message": {"role": "assistant", "content": "".join(tokens)}, **stats})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            if delay:
+                time.sleep(delay)
+            self._send_chunk({"model": MODEL, "message": {"role": "assistant", "content": token}, "done": False})
+        self._send_chunk({"model": MODEL, "message": {"role": "assistant", "content": ""}, **stats})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json(self, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, payload):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+def _prompts(messages: List[dict]) -> Tuple[str, str]:
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in messages if m.get("role") == "user"), "")
+    return system, user
+
+def _response_tokens(system: str, user: str) -> List[str]:
+    """Deterministic response: critique with a verdict, post with hashtags, or edited text"""
+    seed = int(hashlib.sha256((system + "\0" + user).encode("utf-8")).hexdigest()[:8], 16)
+    excerpt = " ".join(user.split())[:400]
+    if "VERDICT" in system:
+        text = f"Solid hook, tighten the middle (ref {seed % 1000}).\nSCORE: {5 + seed % 4}\nVERDICT: REVISE"
+    elif "hashtags" in system:
+        text = f"Draft {seed % 1000}: {excerpt}\n\nWhat do you think?\n\n#AI #Innovation #Leadership"
+    else:
+        text = excerpt
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + words[-1:]
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """
+    Threaded fake Ollama server.
+    
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency: Seconds before the first token
+        tokens_per_second: Generation speed, 0 for instantaneous
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, tokens_per_second: float = 0.0):
+        super().__init__(("127.0.0.1", port), FakeOllamaHandler)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve in a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server for benchmarks")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    args = parser.parse_args()
+    server = FakeOllamaServer(args.port, args.latency, args.tokens_per_second)
+    print(f"Fake Ollama listening on {server.url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+HTTP load generator against POST /generate.
+
+Starts the API with uvicorn in a subprocess (environment inherited, so
+it talks to the stand-in Ollama server) unless an existing URL is given,
+then fires requests at each concurrency level and reports latency
+percentiles and throughput.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.micro import SAMPLE_TEXT
+
+def start_api(port: int) -> subprocess.Popen:
+    """Start the API with uvicorn in a subprocess inheriting the environment"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float = 60.0, interval: float = 0.05) -> float:
+    """
+    Poll an endpoint until it answers with a success status.
+    
+    Args:
+        url: Endpoint to poll
+        process: Server process, polling stops if it exits
+        timeout: Seconds to wait
+        interval: Seconds between two attempts
+        
+    Returns:
+        Seconds waited
+    """
+    started_at = time.monotonic()
+    while True:
+        try:
+            httpx.get(url, timeout=1.0).raise_for_status()
+            return time.monotonic() - started_at
+        except httpx.HTTPError:
+            if process.poll() is not None or time.monotonic() - started_at > timeout:
+                raise RuntimeError(f"{url} did not become available")
+            time.sleep(interval)
+
+@contextmanager
+def api_server(port: int, startup_timeout: float = 60.0) -> Iterator[str]:
+    """
+    Run the API in a uvicorn subprocess for the duration of the block.
+    
+    Args:
+        port: Port to bind on localhost
+        startup_timeout: Seconds to wait for the API to be ready
+        
+    Yields:
+        Base URL of the API
+    """
+    url = f"http://127.0.0.1:{port}"
+    process = start_api(port)
+    try:
+        wait_for(f"{url}/readyz", process, startup_timeout)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+async def _load_level(url: str, concurrency: int, requests: int, n_drafts: int) -> Dict[str, Any]:
+    payload = {
+        "text": SAMPLE_TEXT,
+        "target_audience": "Engineering managers",
+        "n_drafts": n_drafts,
+        "use_cache": False,
+    }
+    samples, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{url}/generate", json=payload)
+                response.raise_for_status()
+                samples.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        **summarize(samples),
+        "errors": errors,
+        "requests_per_second": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+    }
+
+def run(
+    concurrencies: Iterable[int] = (1, 4, 8),
+    requests: int = 16,
+    n_drafts: int = 3,
+    url: Optional[str] = None,
+    port: int = 8765
+) -> Dict[str, Any]:
+    """
+    Load the /generate endpoint at several concurrency levels.
+    
+    Args:
+        concurrencies: Concurrent clients per level
+        requests: Requests sent per level
+        n_drafts: Drafts requested per generation
+        url: Existing API to target, a local one is started when omitted
+        port: Port of the local API
+        
+    Returns:
+        Latency summary, errors and requests/sec per concurrency level
+    """
+    async def levels(base_url: str) -> Dict[str, Any]:
+        return {
+            f"concurrency_{concurrency}": await _load_level(base_url, concurrency, requests, n_drafts)
+            for concurrency in concurrencies
+        }
+
+    if url:
+        return asyncio.run(levels(url))
+    with api_server(port) as base_url:
+        return asyncio.run(levels(base_url))
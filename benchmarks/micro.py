@@ -0,0 +1,167 @@
+"""
+Micro-benchmarks of the CPU-side work done around each LLM call:
+compiling the workflow, reading posts from the state, building prompts,
+splitting long source texts into chunks and searching the semantic editor
+cache.
+No LLM is contacted.
+
+Prompt cases also report the estimated tokens of the prompt sent and a
+per-call time measured over many calls (sub-microsecond work is below the
+resolution of the per-call latency summary), and are compared with the
+inline f-string builders the templates replaced (`*_prompt_legacy`):
+`prompt_vs_legacy` gives the per-call time ratio (above 1 when the
+template is slower) and the prompt tokens saved.
+"""
+
+import timeit
+from typing import Any, Callable, Dict
+
+from benchmarks.common import measure
+
+SAMPLE_TEXT = (
+    "We shipped our new data platform last quarter. It cut reporting time from days to "
+    "minutes and let every team explore their own metrics. Here is what we learned. "
+) * 8
+
+# Article-sized input, several editor chunks long
+LONG_TEXT = "\n\n".join([SAMPLE_TEXT] * 40)
+
+def _legacy_editor_prompt(state: Dict[str, Any]) -> str:
+    return f"""
+            text:
+            ```
+            {state["user_text"]}
+            ```
+        """.strip()
+
+def _legacy_feedback_section(post: Any) -> str:
+    feedback = post.get_latest_feedback()
+    if not feedback or not post.get_latest_draft():
+        return ""
+    
+    return f"""
+        Previous version and feedback:
+        ```
+        Post: {post.get_latest_draft()}
+        Feedback: {feedback}
+        ```
+        """.strip()
+
+def _legacy_writer_prompt(state: Dict[str, Any], post: Any) -> str:
+    return f"""
+            text:
+            ```
+            {state["edit_text"]}
+            ```
+            
+            Target audience: {state["target_audience"]}
+            
+            {_legacy_feedback_section(post)}
+            
+            Write only the post content.
+        """.strip()
+
+def _legacy_critique_prompt(state: Dict[str, Any], post: Any) -> str:
+    return f"""
+            Original text:
+            ```
+            {state["edit_text"]}
+            ```
+            
+            Target audience: {state["target_audience"]}
+            
+            Current LinkedIn post:
+            ```
+            {post.get_latest_draft()}
+            ```
+        """.strip()
+
+def run(iterations: int = 200) -> Dict[str, Any]:
+    """
+    Run the micro-benchmarks.
+    
+    Args:
+        iterations: Measured calls per case
+        
+    Returns:
+        Latency summary per case
+    """
+    from src.models.post import Post
+    from src.models.state import WorkflowStatus
+    from src.services.linkedin_agent import LinkedInAgent
+    from src.services.backends.fake import FakeBackend
+    from src.services.semantic_cache import SemanticCache
+    from src.services.token_budget import count_prompt_tokens, split_text
+    from src.utils.prompts import prompt_library
+    from src.workflow import build_linkedin_workflow
+
+    agent = LinkedInAgent(backend=FakeBackend())
+    # Source and edited texts about one editor chunk long
+    state = {
+        "user_text": SAMPLE_TEXT * 3,
+        "edit_text": SAMPLE_TEXT * 3,
+        "target_audience": "Engineering managers",
+        "drafts": [SAMPLE_TEXT] * 5,
+        "feedback": ["Tighten the hook. SCORE: 6\nVERDICT: REVISE"] * 5,
+        "n_drafts": 5,
+        "workflow_status": WorkflowStatus.IN_PROGRESS,
+    }
+    post = Post.from_state(state)
+    semantic_cache = SemanticCache(max_entries=256)
+    for i in range(256):
+        semantic_cache.add("bench", f"Release {i}. {SAMPLE_TEXT}", SAMPLE_TEXT)
+    editor, writer, critique = (
+        prompt_library.get(name) for name in ("editor", "linkedin_writer", "linkedin_critique")
+    )
+
+    def prompt_case(system_prompt: str, build: Callable[[], str]) -> Dict[str, Any]:
+        """Time a prompt builder and size the prompt it builds"""
+        calls = iterations * 50
+        return {
+            **measure(build, iterations),
+            "per_call_us": round(timeit.timeit(build, number=calls) / calls * 1e6, 4),
+            "prompt_tokens": count_prompt_tokens(system_prompt, build(), agent.config.model),
+        }
+
+    results = {
+        # Compilation is much slower than the other cases, keep it short
+        "build_workflow": measure(
+            lambda: build_linkedin_workflow(agent=agent), max(1, iterations // 20)
+        ),
+        "post_from_state": measure(lambda: Post.from_state(state), iterations),
+        "post_to_dict": measure(post.to_dict, iterations),
+        "all_versions": measure(lambda: agent.get_all_versions(state), iterations),
+        "editor_prompt": prompt_case(
+            editor.system, lambda: agent._build_editor_prompt(editor, state["user_text"])
+        ),
+        "editor_prompt_legacy": prompt_case(editor.system, lambda: _legacy_editor_prompt(state)),
+        "writer_prompt": prompt_case(
+            writer.system,
+            lambda: agent._build_writer_prompt(writer, state, agent._build_feedback_section(post))
+        ),
+        "writer_prompt_legacy": prompt_case(writer.system, lambda: _legacy_writer_prompt(state, post)),
+        "critique_prompt": prompt_case(
+            critique.system, lambda: agent._build_critique_prompt(critique, state, post)
+        ),
+        "critique_prompt_legacy": prompt_case(critique.system, lambda: _legacy_critique_prompt(state, post)),
+        "split_long_text": measure(
+            lambda: split_text(LONG_TEXT, 800, agent.config.model), max(1, iterations // 10)
+        ),
+        # Near-duplicate of an entry among 256 (hit, patched)
+        "semantic_lookup": measure(
+            lambda: semantic_cache.lookup("bench", f"Release 7. {SAMPLE_TEXT}".replace("days", "weeks", 1)),
+            max(1, iterations // 10)
+        ),
+    }
+    results["prompt_vs_legacy"] = {
+        name: {
+            "per_call_ratio": round(
+                results[f"{name}_prompt"]["per_call_us"] / results[f"{name}_prompt_legacy"]["per_call_us"], 2
+            ),
+            "prompt_tokens_saved": (
+                results[f"{name}_prompt_legacy"]["prompt_tokens"] - results[f"{name}_prompt"]["prompt_tokens"]
+            ),
+        }
+        for name in ("editor", "writer", "critique")
+    }
+    return results
@@ -0,0 +1,115 @@
+"""
+Benchmark runner
+----------------
+Starts the stand-in Ollama server, points the application at it and
+runs the selected suites. Results are written as JSON and compared to a
+stored baseline; the exit code is 1 when a metric regressed beyond the
+tolerance.
+
+Usage:
+    python -m benchmarks.run                          # all suites
+    python -m benchmarks.startup                      # import-time budget check only
+    python -m benchmarks.run --suite micro --suite e2e
+    python -m benchmarks.run --save-baseline          # refresh the baseline
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import compare, environment, load_results, write_results
+from benchmarks.fake_ollama import FakeOllamaServer
+
+SUITES = ("startup", "micro", "e2e", "load")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def _configure_environment(server_url: str, checkpoint_dir: str) -> None:
+    """Point the application at the fake server; must run before `src` is imported"""
+    os.environ.update({
+        "OLLAMA_BASE_URL": server_url,
+        "OLLAMA_BASE_URLS": server_url,
+        "LLM_BACKEND": "ollama",
+        # Every run must reach the server, and always go through n_drafts
+        "LLM_CACHE_ENABLED": "false",
+        "EARLY_EXIT_ENABLED": "false",
+        "CHECKPOINT_PATH": os.path.join(checkpoint_dir, "checkpoints.sqlite"),
+        "DOCKER_CONTAINER": "1",  # skip loading a local .env
+    })
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the LinkedIn post generator")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run, repeatable (default: all)")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="results JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="fake LLM generation speed")
+    parser.add_argument("--iterations", type=int, default=200, help="micro-benchmark iterations")
+    parser.add_argument("--runs", type=int, default=3, help="end-to-end runs per n_drafts")
+    parser.add_argument("--n-drafts", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=16, help="load requests per concurrency level")
+    parser.add_argument("--url", help="benchmark an already running API instead of starting one")
+    args = parser.parse_args()
+    suites = args.suite or list(SUITES)
+
+    server = FakeOllamaServer(latency=args.latency, tokens_per_second=args.tokens_per_second).start()
+    checkpoint_dir = tempfile.TemporaryDirectory()
+    _configure_environment(server.url, checkpoint_dir.name)
+    try:
+        # Imported late so the application reads the environment set above
+        from benchmarks import end_to_end, load, micro, startup
+
+        results = {
+            "created_at": time.time(),
+            "environment": environment(),
+            "fake_llm": {"latency": args.latency, "tokens_per_second": args.tokens_per_second},
+            "suites": {},
+        }
+        if "startup" in suites:
+            print("Profiling imports and time to ready...")
+            results["suites"]["startup"] = startup.run()
+        if "micro" in suites:
+            print("Running micro-benchmarks...")
+            results["suites"]["micro"] = micro.run(args.iterations)
+            for name, comparison in results["suites"]["micro"]["prompt_vs_legacy"].items():
+                print(
+                    f"  {name} prompt: {comparison['per_call_ratio']:.2f}x the legacy time, "
+                    f"{comparison['prompt_tokens_saved']} tokens saved"
+                )
+        if "e2e" in suites:
+            print("Running end-to-end generations...")
+            results["suites"]["e2e"] = end_to_end.run(args.n_drafts, args.runs)
+        if "load" in suites:
+            print("Running HTTP load...")
+            results["suites"]["load"] = load.run(args.concurrency, args.requests, url=args.url)
+    finally:
+        server.stop()
+        checkpoint_dir.cleanup()
+
+    write_results(results, args.output)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        write_results(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print("No baseline to compare with, run with --save-baseline to create one")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['metric']}: {regression['baseline']:.3f} -> "
+            f"{regression['current']:.3f} ({regression['change']:+.0%})"
+        )
+    if not regressions:
+        print(f"No regression beyond {args.tolerance:.0%} of the baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
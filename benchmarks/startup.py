@@ -0,0 +1,153 @@
+"""
+Cold start benchmark and import-time budget
+-------------------------------------------
+Profiles the imports of each entry point with ``python -X importtime``
+(in a fresh interpreter, interpreter startup imports excluded) and the
+time for a fresh API process to answer /livez and /readyz.
+
+Run standalone, it checks the import budgets and exits with status 1 when
+an entry point exceeds its budget, listing the heaviest imports:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget src.api=800
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Milliseconds of cumulative import time allowed per entry point. Importing
+# the package or the CLI must not load the workflow stack; the API loads
+# FastAPI and pydantic but defers langgraph to its startup hook.
+IMPORT_BUDGETS_MS = {
+    "src": 50,
+    "src.cli": 250,
+    "src.api": 1500,
+}
+
+def _importtime(statement: str) -> List[Tuple[str, int, int]]:
+    """(module, cumulative µs, depth) of every import done by a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"`{statement}` failed: {completed.stderr.strip().splitlines()[-1]}")
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), int(cumulative), depth))
+    return imports
+
+def profile_imports(module: str, top: int = 10) -> Dict[str, Any]:
+    """
+    Measure the import time of a module.
+
+    Args:
+        module: Module to import
+        top: Number of heaviest packages reported
+
+    Returns:
+        Cumulative import time in milliseconds and the heaviest imports
+    """
+    startup = {name for name, _, _ in _importtime("pass")}
+    imports = [item for item in _importtime(f"import {module}") if item[0] not in startup]
+    # Top-level packages (third-party libraries mostly) pulled in at any depth
+    packages = sorted(
+        ((name, cumulative) for name, cumulative, _ in imports if "." not in name and name != "src"),
+        key=lambda item: item[1], reverse=True
+    )
+    return {
+        "import_ms": round(sum(cumulative for _, cumulative, depth in imports if depth == 0) / 1000, 3),
+        "heaviest": [{"module": name, "ms": round(cumulative / 1000, 3)} for name, cumulative in packages[:top]],
+    }
+
+def time_to_ready(port: int = 8766, timeout: float = 120.0) -> Dict[str, float]:
+    """
+    Start a fresh API process and time its probes.
+
+    Args:
+        port: Port of the API
+        timeout: Seconds allowed to become ready
+
+    Returns:
+        Seconds until /livez and then /readyz answered
+    """
+    from benchmarks.load import start_api, wait_for
+
+    url = f"http://127.0.0.1:{port}"
+    started_at = time.monotonic()
+    process = start_api(port)
+    try:
+        wait_for(f"{url}/livez", process, timeout)
+        live = time.monotonic() - started_at
+        wait_for(f"{url}/readyz", process, timeout)
+        ready = time.monotonic() - started_at
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {"live_ms": round(live * 1000, 1), "ready_ms": round(ready * 1000, 1)}
+
+def check_budgets(
+    profiles: Dict[str, Dict[str, Any]],
+    budgets: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """Describe every entry point whose import time exceeds its budget"""
+    budgets = budgets or IMPORT_BUDGETS_MS
+    return [
+        f"{module}: {profile['import_ms']:.0f} ms > budget {budgets[module]:.0f} ms "
+        f"(heaviest: {', '.join(item['module'] for item in profile['heaviest'][:3])})"
+        for module, profile in profiles.items()
+        if module in budgets and profile["import_ms"] > budgets[module]
+    ]
+
+def run(modules: Optional[List[str]] = None, ready: bool = True) -> Dict[str, Any]:
+    """
+    Run the startup benchmark.
+
+    Args:
+        modules: Entry points to profile, those with a budget by default
+        ready: Whether to also time a fresh API process
+
+    Returns:
+        Import time per entry point (dots replaced by underscores) and
+        time to live/ready
+    """
+    results = {
+        module.replace(".", "_"): {"import_ms": profile_imports(module)["import_ms"]}
+        for module in modules or IMPORT_BUDGETS_MS
+    }
+    if ready:
+        results["api_process"] = time_to_ready()
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the import time budget of the entry points")
+    parser.add_argument(
+        "--budget", action="append", default=[], metavar="MODULE=MS",
+        help="override the budget of an entry point, repeatable"
+    )
+    args = parser.parse_args()
+    budgets = dict(IMPORT_BUDGETS_MS)
+    for override in args.budget:
+        module, _, value = override.partition("=")
+        budgets[module] = float(value)
+
+    profiles = {module: profile_imports(module) for module in budgets}
+    for module, profile in profiles.items():
+        print(f"{module}: {profile['import_ms']:.1f} ms (budget {budgets[module]:.0f} ms)")
+        for item in profile["heaviest"][:5]:
+            print(f"    {item['ms']:>9.1f} ms  {item['module']}")
+    failures = check_budgets(profiles, budgets)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,29 @@
 LinkedIn Post Generator
 ---------------------
 An AI-powered tool for generating and optimizing LinkedIn posts.
+
+The public functions are resolved on first access, so importing a
+submodule (the API, the CLI, the utilities) does not load the workflow
+stack (langgraph, langchain) until it is actually used.
 """
 
-from .main import generate_linkedin_post, build_linkedin_workflow
+import importlib
+
+_EXPORTS = {
+    'generate_linkedin_post': 'src.main',
+    'agenerate_linkedin_post': 'src.main',
+    'generate_linkedin_posts': 'src.main',
+    'agenerate_linkedin_posts': 'src.main',
+    'resume_linkedin_post': 'src.main',
+    'aresume_linkedin_post': 'src.main',
+    'build_linkedin_workflow': 'src.workflow',
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = ['generate_linkedin_post', 'build_linkedin_workflow'] 
\ No newline at end of file
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -1,12 +1,42 @@
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+from typing import Annotated, Optional, Dict, Any, List, Union
 from datetime import datetime
-import platform
-import psutil
-import ollama
-from src.main import generate_linkedin_post
-from src.utils.constants import OLLAMA_MODEL
+import asyncio
+import importlib
+import json
+import math
+import sys
+import time
+from contextlib import asynccontextmanager
+from src.services.admission import AdmissionRejected, Ticket, admission, estimate_cost
+from src.services.backends.factory import get_backend
+from src.services.cache import get_response_cache
+from src.services.coalescing import coalescer
+from src.services.errors import GenerationExistsError
+from src.services.health import health_monitor
+from src.services.workers import agenerate_post, agenerate_posts, aresume_post, astream_post, worker_pool
+from src.utils.logger import logger
+from src.utils.metrics import GENERATION_SLOT_WAIT, metrics
+from src.utils.constants import (
+    MAX_CONCURRENT_GENERATIONS,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_N_DRAFTS,
+    DEFAULT_N_CANDIDATES,
+    MAX_N_DRAFTS,
+    MAX_N_CANDIDATES,
+    MAX_TARGET_AUDIENCES,
+    API_KEY_HEADER
+)
+
+# The workflow stack (src.main, streaming, batch, jobs, registry: langgraph
+# and langchain underneath) is imported in a worker thread at startup or by
+# the first request that needs it, never when this module is imported, so
+# the server binds and answers liveness probes without waiting for it. In
+# worker-process mode (WORKER_PROCESSES > 0) it is only loaded by the
+# generation workers.
 
 app = FastAPI(
     title="LinkedIn Post Generator API",
@@ -14,15 +44,51 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Bounds the number of generations in flight in this worker
+generation_slots = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+@asynccontextmanager
+async def generation_slot():
+    """Hold a generation slot, recording how long the request waited for it"""
+    started_at = time.perf_counter()
+    async with generation_slots:
+        GENERATION_SLOT_WAIT.observe(time.perf_counter() - started_at)
+        yield
+
 class PostRequest(BaseModel):
     text: str
+    # Several audiences (/generate only): one post each, sharing the editor pass
+    target_audience: Union[str, Annotated[List[str], Field(min_length=1, max_length=MAX_TARGET_AUDIENCES)]]
+    n_drafts: Optional[int] = Field(default=3, ge=1, le=MAX_N_DRAFTS)
+    use_cache: Optional[bool] = True
+    n_candidates: Optional[int] = Field(default=None, ge=1, le=MAX_N_CANDIDATES)
+    generation_id: Optional[str] = None
+
+class BatchItem(PostRequest):
+    id: Optional[str] = None
+    target_audience: str
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem]
+    concurrency: int = Field(default=DEFAULT_BATCH_CONCURRENCY, ge=1)
+
+class JobRequest(PostRequest):
+    priority: Optional[str] = "normal"
     target_audience: str
-    n_drafts: Optional[int] = 3
 
 class PostResponse(BaseModel):
+    generation_id: Optional[str] = None
     final_post: str
     all_versions: list[dict]
     workflow_status: str
+    stop_reason: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+
+class MultiAudienceResponse(BaseModel):
+    """Posts of a multi-audience request, by audience; usage covers the whole run"""
+    generation_id: Optional[str] = None
+    audiences: Dict[str, Optional[PostResponse]]
+    usage: Optional[Dict[str, Any]] = None
 
 class HealthResponse(BaseModel):
     """Detailed health check response"""
@@ -32,85 +98,399 @@ class HealthResponse(BaseModel):
     environment: Dict[str, str]
     services: Dict[str, Dict[str, Any]]
     system: Dict[str, Any]
+    checked_at: Optional[str] = None
+    age_seconds: Optional[float] = None
+    stale: bool = False
 
-@app.post("/generate", response_model=PostResponse)
-async def generate_post(request: PostRequest) -> PostResponse:
-    """Generate an optimized LinkedIn post"""
+# Background warm-up of the workflow stack, readiness waits for it
+warm_up: Optional[asyncio.Task] = None
+
+def _load_workflows() -> None:
+    """Import the workflow stack and compile the default workflow"""
+    from src.services.registry import registry
+    # Imported here, off the event loop
+    importlib.import_module("src.services.streaming")
+    registry.warm_up()
+
+async def _warm_up() -> None:
+    started_at = time.perf_counter()
     try:
-        result = generate_linkedin_post(
-            text=request.text,
-            target_audience=request.target_audience,
-            n_drafts=request.n_drafts
-        )
+        if worker_pool.enabled:
+            await worker_pool.start()
+        else:
+            await asyncio.to_thread(_load_workflows)
+    except Exception as e:
+        logger.error(f"Workflow warm-up failed: {e}")
+        raise
+    from src.services.jobs import job_manager
+    job_manager.start()
+    logger.info(f"Workflows ready in {time.perf_counter() - started_at:.2f}s")
+
+@app.on_event("startup")
+async def start_background_services() -> None:
+    """
+    Start the health refresher and warm the workflows up in the background
+    
+    Startup does not wait for either: the server accepts connections (and
+    /livez answers) immediately, /readyz reports ready once both are done.
+    """
+    global warm_up
+    await health_monitor.start()
+    warm_up = asyncio.create_task(_warm_up())
+
+@app.on_event("shutdown")
+async def close_backend() -> None:
+    """
+    Stop the job workers and health refresher, drain the generation
+    workers, close the pooled LLM backend connections
+    """
+    await health_monitor.stop()
+    if warm_up is not None:
+        warm_up.cancel()
+        await asyncio.gather(warm_up, return_exceptions=True)
+    if "src.services.jobs" in sys.modules:
+        from src.services.jobs import job_manager
+        await job_manager.stop()
+    await worker_pool.stop()
+    await get_backend().aclose()
+
+def _workflows_ready() -> bool:
+    return warm_up is not None and warm_up.done() and not warm_up.cancelled() and warm_up.exception() is None
+
+def _request_cost(request: PostRequest) -> float:
+    """Expected LLM tokens of a generation request"""
+    return estimate_cost(
+        request.n_drafts or DEFAULT_N_DRAFTS,
+        request.n_candidates or DEFAULT_N_CANDIDATES,
+        n_audiences=1 if isinstance(request.target_audience, str) else len(set(request.target_audience))
+    )
+
+def _rejection(e: AdmissionRejected) -> JSONResponse:
+    """429 when the tenant budget is spent, 503 when the service is saturated"""
+    return JSONResponse(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS if e.reason == "rate_limited"
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={"detail": str(e), "reason": e.reason},
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+def _coalescing_key(kind: str, request: PostRequest):
+    """Requests with the same key share one running generation"""
+    return coalescer.key(
+        kind,
+        request.text,
+        request.target_audience,
+        generation_id=request.generation_id,
+        n_drafts=request.n_drafts,
+        n_candidates=request.n_candidates,
+        use_cache=request.use_cache
+    )
+
+@app.post("/generate", response_model=Union[PostResponse, MultiAudienceResponse])
+async def generate_post(
+    request: PostRequest,
+    api_key: Optional[str] = Header(default=None, alias=API_KEY_HEADER)
+) -> Union[PostResponse, MultiAudienceResponse]:
+    """
+    Generate an optimized LinkedIn post
+    
+    With a list of target audiences, one post is generated per audience:
+    the source text is edited once, then the writer/critic loops of the
+    audiences run concurrently.
+    Identical requests arriving while one is running share its result.
+    Returns 409 when the given generation_id already exists, 429 (tenant budget spent) or 503 (service saturated) with
+    Retry-After when the request is not admitted.
+    """
+    key = _coalescing_key("generate", request)
+    ticket: Optional[Ticket] = None
+    if not coalescer.joinable(key):
+        try:
+            ticket = admission.admit(api_key, _request_cost(request))
+        except AdmissionRejected as e:
+            return _rejection(e)
+
+    async def generate():
+        try:
+            async with generation_slot():
+                if not isinstance(request.target_audience, str):
+                    return await agenerate_posts(
+                        text=request.text,
+                        target_audiences=request.target_audience,
+                        n_drafts=request.n_drafts,
+                        use_cache=request.use_cache,
+                        n_candidates=request.n_candidates,
+                        generation_id=request.generation_id
+                    )
+                return await agenerate_post(
+                    text=request.text,
+                    target_audience=request.target_audience,
+                    n_drafts=request.n_drafts,
+                    use_cache=request.use_cache,
+                    n_candidates=request.n_candidates,
+                    generation_id=request.generation_id
+                )
+        finally:
+            if ticket is not None:
+                admission.release(ticket)
+
+    try:
+        result = await coalescer.run(key, generate)
         if result is None:
             raise HTTPException(status_code=500, detail="Failed to generate post")
-        return PostResponse(**result)
+        return PostResponse(**result) if isinstance(request.target_audience, str) else MultiAudienceResponse(**result)
+    except GenerationExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/generate/{generation_id}/resume", response_model=PostResponse)
+async def resume_post(generation_id: str) -> PostResponse:
+    """Resume an interrupted generation from its last completed node"""
+    try:
+        async with generation_slot():
+            result = await aresume_post(generation_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=500, detail="Failed to resume post")
+    return PostResponse(**result)
+
+@app.post("/generate/stream")
+async def generate_post_stream(
+    request: PostRequest,
+    api_key: Optional[str] = Header(default=None, alias=API_KEY_HEADER)
+) -> StreamingResponse:
+    """
+    Generate an optimized LinkedIn post, streaming progress as NDJSON
+    
+    Each line is a JSON event: LLM tokens, the edited text, every draft
+    and critique, then the final result (same payload as /generate).
+    Identical requests arriving while one is running share its stream.
+    Not admitted requests are rejected like on /generate, requests with
+    several target audiences with 422.
+    """
+    if not isinstance(request.target_audience, str):
+        raise HTTPException(status_code=422, detail="Streaming takes a single target audience")
+    key = _coalescing_key("stream", request)
+    ticket: Optional[Ticket] = None
+    if not coalescer.joinable(key):
+        try:
+            ticket = admission.admit(api_key, _request_cost(request))
+        except AdmissionRejected as e:
+            return _rejection(e)
+
+    async def stream():
+        try:
+            async with generation_slot():
+                async for event in astream_post(
+                    text=request.text,
+                    target_audience=request.target_audience,
+                    n_drafts=request.n_drafts,
+                    use_cache=request.use_cache,
+                    n_candidates=request.n_candidates,
+                    generation_id=request.generation_id
+                ):
+                    yield event
+        finally:
+            if ticket is not None:
+                admission.release(ticket)
+
+    async def events():
+        async for event in coalescer.stream(key, stream):
+            yield json.dumps(event) + "\n"
+
+    # Also releases the ticket if the client left before the stream started
+    background = BackgroundTask(admission.release, ticket) if ticket is not None else None
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=background)
+
+@app.post("/generate/batch")
+async def generate_post_batch(
+    request: BatchRequest,
+    api_key: Optional[str] = Header(default=None, alias=API_KEY_HEADER)
+) -> StreamingResponse:
+    """
+    Generate many posts concurrently, streaming results as NDJSON
+    
+    Results are sent in completion order, one line per item, with either
+    the generated post or the error of that item. The whole batch is
+    charged to the tenant budget upfront (429 with Retry-After when spent).
+    """
+    try:
+        admission.admit(api_key, sum(_request_cost(item) for item in request.items), concurrent=False)
+    except AdmissionRejected as e:
+        return _rejection(e)
+
+    from src.services.batch import BatchJob, arun_batch
+    jobs = [
+        BatchJob(
+            id=item.id or str(index),
+            text=item.text,
+            target_audience=item.target_audience,
+            n_drafts=item.n_drafts,
+            use_cache=item.use_cache,
+            n_candidates=item.n_candidates
+        )
+        for index, item in enumerate(request.items)
+    ]
+
+    async def results():
+        async for result in arun_batch(jobs, request.concurrency, limiter=generation_slots):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: JobRequest,
+    api_key: Optional[str] = Header(default=None, alias=API_KEY_HEADER)
+):
+    """
+    Queue a generation and return its job id immediately
+    
+    Returns 429 with Retry-After and X-Queue-Depth headers when the queue
+    is full, and 429 with Retry-After when the tenant budget is spent.
+    """
+    from src.services.jobs import QueueFullError, job_manager
+    try:
+        admission.admit(api_key, _request_cost(request), concurrent=False)
+    except AdmissionRejected as e:
+        return _rejection(e)
+    try:
+        # Idempotent; covers requests arriving before the warm-up finished
+        job_manager.start()
+        job = job_manager.submit(
+            text=request.text,
+            target_audience=request.target_audience,
+            n_drafts=request.n_drafts,
+            priority=request.priority,
+            use_cache=request.use_cache,
+            n_candidates=request.n_candidates,
+            generation_id=request.generation_id
+        )
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": str(e), "queue_depth": e.depth},
+            headers={"Retry-After": "5", "X-Queue-Depth": str(e.depth)}
+        )
+    except ValueError as e:
+        # Unknown priority; a taken generation_id is only claimed when the
+        # job runs, and fails the job (error event)
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"job_id": job.id, "status": job.status.value, "queue_depth": job_manager.queue_depth()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> dict:
+    """Status, per-node progress and final result of a job"""
+    from src.services.jobs import job_manager
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str) -> StreamingResponse:
+    """Follow a job's progress as NDJSON until it completes"""
+    from src.services.jobs import job_manager
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    async def events():
+        async for event in job_manager.subscribe(job_id):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.get("/workflows")
+async def list_workflows() -> list[dict]:
+    """Compiled workflows with their build/compile timings"""
+    from src.services.registry import registry
+    return registry.stats()
+
+@app.get("/cache")
+async def cache_stats() -> dict:
+    """Hit/miss counters of the LLM response cache and of the semantic editor cache"""
+    from src.services.semantic_cache import get_semantic_cache
+    cache = get_response_cache()
+    semantic = get_semantic_cache()
+    return {
+        "enabled": cache is not None,
+        **(cache.stats() if cache else {}),
+        "semantic": {"enabled": semantic is not None, **(semantic.stats() if semantic else {})},
+    }
+
+@app.get("/workers")
+async def worker_stats() -> dict:
+    """Generation worker processes: pid, jobs run and in flight, memory"""
+    return worker_pool.stats()
+
+@app.get("/admission")
+async def admission_stats() -> dict:
+    """Admission control state: adaptive concurrency limit, admitted generations, tenants"""
+    return admission.stats()
+
+@app.get("/backend")
+async def backend_stats() -> dict:
+    """LLM backend state: per-host in-flight requests, latency and health"""
+    return get_backend().stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Prometheus metrics: node latencies, LLM call latency, queue wait, tokens
+    and tokens/sec, including the calls made by the generation workers
+    """
+    return PlainTextResponse(metrics.render(worker_pool.metrics_snapshots()), media_type="text/plain; version=0.0.4")
+
+@app.get("/livez", status_code=status.HTTP_200_OK)
+async def liveness() -> Dict[str, str]:
+    """Liveness probe: the event loop answers, no I/O is done"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness() -> JSONResponse:
+    """
+    Readiness probe served from the health snapshot
+    
+    Returns:
+        200 when the workflows are warm, the snapshot is fresh and the
+        model is available, 503 otherwise
+    """
+    snapshot = health_monitor.snapshot
+    workflows_ready = _workflows_ready()
+    ready = workflows_ready and health_monitor.is_ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "workflows": "ready" if workflows_ready else "warming_up",
+            "ollama": snapshot.ollama["status"] if snapshot else None,
+            "age_seconds": round(snapshot.age(), 3) if snapshot else None,
+            "stale": health_monitor.is_stale(),
+        }
+    )
 
 @app.get("/health", response_model=HealthResponse, status_code=status.HTTP_200_OK)
 async def health_check() -> HealthResponse:
     """
-    Comprehensive health check endpoint
+    Comprehensive health check endpoint, served from the background snapshot
     
     Returns:
-        Detailed health status of the API and its dependencies
+        Detailed health status of the API and its dependencies, with the
+        age of the checks
     """
-    try:
-        ollama_status = "healthy"
-        ollama_details = {"model": OLLAMA_MODEL, "available": True}
-        model_names = []
-        
-        try:
-            models = ollama.list()
-            model_names = [model.get('model') for model in models.get('models', [])]
-            if OLLAMA_MODEL not in model_names:
-                ollama_status = "degraded"
-                ollama_details.update({
-                    "available": False,
-                    "error": f"Model {OLLAMA_MODEL} not found in available models: {model_names}"
-                })
-        except Exception as e:
-            ollama_status = "degraded"
-            ollama_details.update({
-                "available": False,
-                "error": str(e)
-            })
-
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-
-        return HealthResponse(
-            status="healthy",
-            timestamp=datetime.utcnow().isoformat(),
-            version="1.0.0",
-            environment={
-                "python_version": platform.python_version(),
-                "platform": platform.platform(),
-            },
-            services={
-                "ollama": {
-                    "status": ollama_status,
-                    **ollama_details,
-                    "available_models": model_names if ollama_status == "healthy" else []
-                }
-            },
-            system={
-                "cpu_usage": psutil.cpu_percent(interval=1),
-                "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent
-                },
-                "disk": {
-                    "total": disk.total,
-                    "free": disk.free,
-                    "percent": disk.percent
-                }
-            }
-        )
-    except Exception as e:
+    report = health_monitor.report()
+    if report["checked_at"] is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Service health check failed: {str(e)}"
-        ) 
\ No newline at end of file
+            detail="Service health check failed: no health snapshot yet"
+        )
+    return HealthResponse(
+        timestamp=datetime.utcnow().isoformat(),
+        version="1.0.0",
+        **report
+    )
@@ -0,0 +1,64 @@
+"""
+Command line interface for the LinkedIn Post Generator.
+
+Usage:
+    python -m src.cli batch jobs.jsonl --concurrency 4 --checkpoint progress.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import List, Optional
+from src.utils.constants import DEFAULT_BATCH_CONCURRENCY
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of the CLI"""
+    parser = argparse.ArgumentParser(prog="linkedin-agent", description="LinkedIn post generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Generate posts for every job of a JSONL file")
+    batch.add_argument("input", help="JSONL file, one {text, target_audience, [id, n_drafts]} per line")
+    batch.add_argument("-o", "--output", help="File receiving the JSONL results (default: stdout)")
+    batch.add_argument(
+        "-c", "--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY,
+        help="Number of generations in flight"
+    )
+    batch.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted batch")
+    return parser
+
+async def run_batch_command(args: argparse.Namespace) -> int:
+    """
+    Run the batch command, writing results in completion order.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Process exit code: 0 when every item succeeded, 1 otherwise
+    """
+    # Imported here so that parsing arguments (and --help) stays instant
+    from src.services.batch import arun_batch, load_jobs
+    
+    jobs = load_jobs(args.input)
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    failures = 0
+    try:
+        async for result in arun_batch(jobs, args.concurrency, args.checkpoint):
+            failures += result["status"] != "ok"
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failures else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point"""
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        return asyncio.run(run_batch_command(args))
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,29 @@ Main entry point for the LinkedIn Post Generator.
 Provides high-level functions to interact with the workflow.
 """
 
-from typing import Dict, Any
-from src.models.state import OverallState
-from src.workflow import build_linkedin_workflow
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+from src.models.config import Configuration
+from src.services.checkpoint import get_checkpointer
 from src.services.linkedin_agent import LinkedInAgent
+from src.services.registry import registry
+from src.services.usage import summarize_usage
+from src.utils.constants import MAX_N_DRAFTS
+
+# Graph steps allowed per run: a round of the writer/critic loop takes
+# several steps (nodes and conditional edges), for up to MAX_N_DRAFTS rounds
+RECURSION_LIMIT = 10 * (MAX_N_DRAFTS + 1)
 
 def generate_linkedin_post(
     text: str,
     target_audience: str,
-    n_drafts: int = 3
+    n_drafts: int = 3,
+    config: Optional[Configuration] = None,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    generation_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Generate an optimized LinkedIn post from input text.
@@ -20,33 +34,323 @@ def generate_linkedin_post(
         text: Original text to transform
         target_audience: Target audience for the post
         n_drafts: Number of iterations to perform
+        config: Workflow configuration, defaults are used when omitted
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round, best one kept
+            (configuration default when omitted)
+        generation_id: Identifier of the run, used to resume it; generated
+            when omitted
+        
+    Returns:
+        Dictionary containing the workflow results
+        
+    Raises:
+        GenerationExistsError: When the generation id is already taken
+    """
+    # Reuse the workflow compiled once for this configuration
+    entry = registry.get(config)
+    
+    # Run workflow
+    state = _initial_state(text, target_audience, n_drafts, use_cache, n_candidates, generation_id)
+    result = entry.workflow.invoke(state, _run_config(state["generation_id"]))
+    return _format_result(entry.agent, result)
+
+async def agenerate_linkedin_post(
+    text: str,
+    target_audience: str,
+    n_drafts: int = 3,
+    config: Optional[Configuration] = None,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    generation_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Asynchronously generate an optimized LinkedIn post from input text.
+    
+    Runs the workflow with `ainvoke` so LLM calls never block the event loop.
+    
+    Args:
+        text: Original text to transform
+        target_audience: Target audience for the post
+        n_drafts: Number of iterations to perform
+        config: Workflow configuration, defaults are used when omitted
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round, best one kept
+            (configuration default when omitted)
+        generation_id: Identifier of the run, used to resume it; generated
+            when omitted
         
     Returns:
         Dictionary containing the workflow results
+        
+    Raises:
+        GenerationExistsError: When the generation id is already taken
+    """
+    entry = registry.get(config)
+    state = _initial_state(text, target_audience, n_drafts, use_cache, n_candidates, generation_id)
+    result = await entry.workflow.ainvoke(state, _run_config(state["generation_id"]))
+    return _format_result(entry.agent, result)
+
+def generate_linkedin_posts(
+    text: str,
+    target_audiences: Sequence[str],
+    n_drafts: int = 3,
+    config: Optional[Configuration] = None,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    generation_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate one LinkedIn post per target audience from the same text.
+    
+    The editor runs once; the writer/critic loops of the audiences then
+    run concurrently, each as its own generation (`<generation_id>-<i>`,
+    resumable on its own) sharing the agent, its caches and connections.
+    
+    Args:
+        text: Original text to transform
+        target_audiences: Target audiences, one post each (duplicates are
+            generated once)
+        n_drafts: Number of iterations to perform per audience
+        config: Workflow configuration, defaults are used when omitted
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round, best one kept
+            (configuration default when omitted)
+        generation_id: Identifier of the run, generated when omitted
+        
+    Returns:
+        Dictionary with the result of each audience and the usage of the
+        whole run, editor pass included
+        
+    Raises:
+        ValueError: When no audience is given
+        GenerationExistsError: When a run of the generation id is already
+            taken
+    """
+    entry = registry.get(config)
+    audiences = _fan_out_audiences(target_audiences, generation_id)
+    state = _initial_state(text, audiences[0], n_drafts, use_cache, n_candidates, generation_id, reserve=False)
+    edit = entry.editor.invoke(state)
+    branches = _audience_states(state, edit, audiences)
+    with ThreadPoolExecutor(max_workers=len(branches)) as executor:
+        results = list(executor.map(
+            lambda branch: entry.workflow.invoke(branch, _run_config(branch["generation_id"])), branches
+        ))
+    return _format_fan_out(entry.agent, state["generation_id"], edit, audiences, results)
+
+async def agenerate_linkedin_posts(
+    text: str,
+    target_audiences: Sequence[str],
+    n_drafts: int = 3,
+    config: Optional[Configuration] = None,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    generation_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    # Initialize workflow
-    workflow = build_linkedin_workflow()
+    Asynchronously generate one LinkedIn post per target audience, see
+    `generate_linkedin_posts`.
     
-    # Prepare initial state
-    initial_state = {
+    Args:
+        text: Original text to transform
+        target_audiences: Target audiences, one post each (duplicates are
+            generated once)
+        n_drafts: Number of iterations to perform per audience
+        config: Workflow configuration, defaults are used when omitted
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round, best one kept
+            (configuration default when omitted)
+        generation_id: Identifier of the run, generated when omitted
+        
+    Returns:
+        Dictionary with the result of each audience and the usage of the
+        whole run, editor pass included
+        
+    Raises:
+        ValueError: When no audience is given
+        GenerationExistsError: When a run of the generation id is already
+            taken
+    """
+    entry = registry.get(config)
+    audiences = _fan_out_audiences(target_audiences, generation_id)
+    state = _initial_state(text, audiences[0], n_drafts, use_cache, n_candidates, generation_id, reserve=False)
+    edit = await entry.editor.ainvoke(state)
+    results = await asyncio.gather(*(
+        entry.workflow.ainvoke(branch, _run_config(branch["generation_id"]))
+        for branch in _audience_states(state, edit, audiences)
+    ))
+    return _format_fan_out(entry.agent, state["generation_id"], edit, audiences, results)
+
+def resume_linkedin_post(generation_id: str, config: Optional[Configuration] = None) -> Dict[str, Any]:
+    """
+    Resume an interrupted generation from its last completed node.
+    
+    Args:
+        generation_id: Identifier of the interrupted run
+        config: Workflow configuration the run was started with
+        
+    Returns:
+        Dictionary containing the workflow results
+        
+    Raises:
+        KeyError: When no checkpoint exists for this generation
+    """
+    entry = registry.get(config)
+    _ensure_checkpoint(generation_id)
+    result = entry.workflow.invoke(None, _run_config(generation_id))
+    return _format_result(entry.agent, _resumed_state(generation_id, result))
+
+async def aresume_linkedin_post(generation_id: str, config: Optional[Configuration] = None) -> Dict[str, Any]:
+    """
+    Asynchronously resume an interrupted generation, see `resume_linkedin_post`.
+    
+    Args:
+        generation_id: Identifier of the interrupted run
+        config: Workflow configuration the run was started with
+        
+    Returns:
+        Dictionary containing the workflow results
+        
+    Raises:
+        KeyError: When no checkpoint exists for this generation
+    """
+    entry = registry.get(config)
+    _ensure_checkpoint(generation_id)
+    result = await entry.workflow.ainvoke(None, _run_config(generation_id))
+    return _format_result(entry.agent, _resumed_state(generation_id, result))
+
+def _run_config(generation_id: str) -> Dict[str, Any]:
+    """Runnable config binding a run to its checkpoint thread"""
+    return {"configurable": {"thread_id": generation_id}, "recursion_limit": RECURSION_LIMIT}
+
+def _ensure_checkpoint(generation_id: str) -> None:
+    """Raise KeyError unless a checkpoint exists for the generation"""
+    checkpointer = get_checkpointer()
+    if checkpointer is None or checkpointer.load(generation_id) is None:
+        raise KeyError(f"No checkpoint for generation {generation_id}")
+
+def _reserve(*generation_ids: str) -> None:
+    """Claim the checkpoint threads of new runs, raising GenerationExistsError if one is taken"""
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        checkpointer.reserve(generation_ids)
+
+def _resumed_state(generation_id: str, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Final state of a resumed run; read from the checkpoint if nothing was left to run"""
+    if result is not None:
+        return result
+    checkpoint = get_checkpointer().load(generation_id)
+    return checkpoint["channel_values"] if checkpoint else None
+
+def _initial_state(
+    text: str,
+    target_audience: str,
+    n_drafts: int,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    generation_id: Optional[str] = None,
+    reserve: bool = True
+) -> Dict[str, Any]:
+    """
+    Prepare the initial workflow state, claiming the given generation id
+    unless `reserve` is false (the caller claimed it)
+    
+    Raises:
+        GenerationExistsError: When the given generation id is taken; a
+            new run would append to that generation, it must be resumed
+    """
+    if generation_id is not None and reserve:
+        _reserve(generation_id)
+    return {
+        "generation_id": generation_id or uuid.uuid4().hex,
         "user_text": text,
         "target_audience": target_audience,
         "edit_text": "",
-        "linkedin_post": {"drafts": [], "feedback": None},
+        "edit_summary": None,
+        "drafts": [],
+        "feedback": [],
         "n_drafts": n_drafts,
-        "workflow_status": "starting"
+        "workflow_status": "starting",
+        "stop_reason": None,
+        "use_cache": use_cache,
+        "n_candidates": n_candidates,
+        "llm_usage": []
     }
+
+def _fan_out_audiences(target_audiences: Sequence[str], generation_id: Optional[str]) -> List[str]:
+    """
+    Distinct audiences of a fan-out, in order
     
-    # Run workflow
-    result = workflow.invoke(initial_state)
+    Raises:
+        ValueError: When there is no audience
+        GenerationExistsError: When a run of the given generation id is
+            taken; no run is claimed then
+    """
+    audiences = list(dict.fromkeys(target_audiences))
+    if not audiences:
+        raise ValueError("At least one target audience is required")
+    if generation_id is not None:
+        # Only the audience runs are checkpointed, not the fan-out itself
+        _reserve(*(_audience_id(generation_id, i) for i in range(len(audiences))))
+    return audiences
+
+def _audience_id(generation_id: str, index: int) -> str:
+    """Generation id of the run of one audience of a fan-out"""
+    return f"{generation_id}-{index}"
+
+def _audience_states(
+    state: Dict[str, Any],
+    edit: Dict[str, Any],
+    audiences: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Initial states of the audiences of a fan-out: already edited, so their
+    workflows start at the writer/critic loop; the editor usage is
+    reported once, with the whole run
+    """
+    return [
+        {
+            **state,
+            "generation_id": _audience_id(state["generation_id"], i),
+            "target_audience": audience,
+            "edit_text": edit["edit_text"],
+            "edit_summary": edit.get("edit_summary"),
+            "n_drafts": edit.get("n_drafts") or state["n_drafts"],
+        }
+        for i, audience in enumerate(audiences)
+    ]
+
+def _format_fan_out(
+    agent: LinkedInAgent,
+    generation_id: str,
+    edit: Dict[str, Any],
+    audiences: List[str],
+    results: List[Optional[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Response payload of a fan-out: one result per audience, usage of the whole run"""
+    editor_usage = edit.get("llm_usage") or []
+    calls = editor_usage + [call for result in results if result for call in result.get("llm_usage") or []]
+    return {
+        "generation_id": generation_id,
+        "audiences": {
+            audience: _format_result(agent, result) for audience, result in zip(audiences, results)
+        },
+        "usage": {**summarize_usage(calls), "per_call": editor_usage}
+    }
+
+def _format_result(agent: LinkedInAgent, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Extract the response payload from the final workflow state"""
     if result is None:
         return None
-        
-    # Create agent to access results
-    agent = LinkedInAgent()
     
     return {
+        "generation_id": result.get("generation_id"),
         "final_post": agent.get_final_post(result),
         "all_versions": agent.get_all_versions(result),
-        "workflow_status": result["workflow_status"]
-    } 
\ No newline at end of file
+        "workflow_status": result["workflow_status"],
+        "stop_reason": result.get("stop_reason"),
+        "usage": {
+            **summarize_usage(result.get("llm_usage") or []),
+            "per_call": result.get("llm_usage") or []
+        }
+    }
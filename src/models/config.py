@@ -1,6 +1,37 @@
-from pydantic import BaseModel, Field
-from src.utils.constants import DEFAULT_N_DRAFTS
+from pydantic import BaseModel, ConfigDict, Field
+from src.utils.constants import (
+    DEFAULT_N_DRAFTS,
+    DEFAULT_N_CANDIDATES,
+    OLLAMA_MODEL,
+    OLLAMA_TEMPERATURE,
+    EARLY_EXIT_ENABLED,
+    APPROVE_SCORE,
+    NO_PROGRESS_SIMILARITY,
+    CONTEXT_WINDOW_TOKENS,
+    EDIT_TEXT_TOKEN_BUDGET,
+    PIPELINED_WORKFLOW
+)
 
 class Configuration(BaseModel):
-    """Configuration parameters"""
-    n_drafts: int = Field(default=DEFAULT_N_DRAFTS, gt=0) 
\ No newline at end of file
+    """
+    Configuration parameters
+
+    Instances are immutable and hashable so they can be used as keys
+    of the workflow registry: one compiled graph per configuration.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    n_drafts: int = Field(default=DEFAULT_N_DRAFTS, gt=0)
+    n_candidates: int = Field(default=DEFAULT_N_CANDIDATES, gt=0)
+    model: str = OLLAMA_MODEL
+    temperature: float = Field(default=OLLAMA_TEMPERATURE, ge=0)
+    pipelined: bool = PIPELINED_WORKFLOW
+
+    # Convergence policy of the writer/critic loop
+    early_exit: bool = EARLY_EXIT_ENABLED
+    approve_score: float = Field(default=APPROVE_SCORE, ge=0, le=10)
+    no_progress_similarity: float = Field(default=NO_PROGRESS_SIMILARITY, gt=0, le=1)
+
+    # Prompt token budget
+    context_tokens: int = Field(default=CONTEXT_WINDOW_TOKENS, gt=0)
+    edit_text_budget: int = Field(default=EDIT_TEXT_TOKEN_BUDGET, gt=0)
@@ -1,21 +1,38 @@
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
 
-class Post(BaseModel):
+@dataclass(slots=True)
+class Post:
     """
     Represents a LinkedIn post being created
-    
+
+    A read-only view over the append-only `drafts` and `feedback` state
+    channels: building it from the state copies nothing, and nodes never
+    write it back, they return the items to append.
+
     Attributes:
         drafts: List of different versions of the post
-        feedback: Last analysis of the reviewer
+        feedback: Critic analyses, `feedback[i]` being the one of `drafts[i]`
     """
-    drafts: List[str] = Field(default_factory=list)
-    feedback: Optional[str] = None
+    drafts: List[str] = field(default_factory=list)
+    feedback: List[Optional[str]] = field(default_factory=list)
 
-    def add_draft(self, draft: str) -> None:
-        """Add a new version of the post"""
-        self.drafts.append(draft)
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "Post":
+        """View the post held by a workflow state"""
+        return cls(state.get("drafts") or [], state.get("feedback") or [])
 
     def get_latest_draft(self) -> Optional[str]:
         """Get the latest version of the post"""
-        return self.drafts[-1] if self.drafts else None 
\ No newline at end of file
+        return self.drafts[-1] if self.drafts else None
+
+    def get_feedback(self, index: int) -> Optional[str]:
+        """Get the critic analysis of a draft, None if it was not reviewed"""
+        return self.feedback[index] if 0 <= index < len(self.feedback) else None
+
+    def get_latest_feedback(self) -> Optional[str]:
+        """Get the critic analysis of the latest version"""
+        return self.get_feedback(len(self.drafts) - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"drafts": list(self.drafts), "feedback": list(self.feedback)}
@@ -1,5 +1,6 @@
+import operator
 from enum import Enum
-from typing import TypedDict, Dict, Any
+from typing import TypedDict, Annotated, Dict, Any, List, Optional
 
 class WorkflowStatus(str, Enum):
     """Possible workflow states"""
@@ -9,9 +10,16 @@ class WorkflowStatus(str, Enum):
 
 class OverallState(TypedDict):
     """Global workflow state"""
+    generation_id: str  # unique per generation, routes its LLM calls to one host
     user_text: str
     target_audience: str
     edit_text: str
-    linkedin_post: Dict[str, Any]  # Post serialized
+    edit_summary: Optional[str]  # edit_text condensed for the writer/critic loop, None when within budget
+    drafts: Annotated[List[str], operator.add]  # post versions, appended by the writer
+    feedback: Annotated[List[Optional[str]], operator.add]  # critique of each draft, appended by the critic
     n_drafts: int
-    workflow_status: str 
\ No newline at end of file
+    n_candidates: int  # candidate drafts written concurrently per round
+    workflow_status: str
+    stop_reason: Optional[str]  # convergence rule that ended the loop
+    use_cache: bool  # False bypasses cached LLM responses for this run
+    llm_usage: Annotated[List[Dict[str, Any]], operator.add]  # one record per LLM call, appended by nodes 
\ No newline at end of file
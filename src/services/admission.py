@@ -0,0 +1,262 @@
+"""
+Admission control
+-----------------
+Rejects work early instead of letting queues grow in front of Ollama.
+
+Each request is priced in expected LLM tokens: a generation makes one
+editor call, `n_candidates` writer calls per draft and one critique
+between consecutive drafts. Two checks apply:
+
+- a token bucket per API key, so one tenant cannot monopolize capacity;
+- a global cap on concurrent generations that adapts to the queue wait
+  observed on Ollama (AIMD): it grows by one per round of calls served
+  under the latency target and shrinks multiplicatively above it.
+
+Rejections carry the number of seconds after which a retry may succeed.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+from src.utils.constants import (
+    ADMISSION_ENABLED,
+    EXPECTED_TOKENS_PER_CALL,
+    TENANT_TOKENS_PER_MINUTE,
+    TENANT_BURST_TOKENS,
+    ADMISSION_MIN_CONCURRENCY,
+    ADMISSION_TARGET_QUEUE_SECONDS,
+    MAX_CONCURRENT_GENERATIONS
+)
+from src.utils.logger import logger
+from src.utils.metrics import ADMISSION_REJECTED, ADMISSION_LIMIT, ADMISSION_IN_FLIGHT
+
+DECREASE_FACTOR = 0.7
+DECREASE_COOLDOWN = 5.0  # seconds, one decrease per burst of slow calls
+MAX_TENANTS = 10000
+
+def estimate_llm_calls(n_drafts: int, n_candidates: int = 1, n_audiences: int = 1) -> int:
+    """LLM calls of a generation that runs all its drafts, the editor pass being shared by its audiences"""
+    return 1 + n_audiences * (n_drafts * max(1, n_candidates) + max(0, n_drafts - 1))
+
+def estimate_cost(
+    n_drafts: int,
+    n_candidates: int = 1,
+    tokens_per_call: int = EXPECTED_TOKENS_PER_CALL,
+    n_audiences: int = 1
+) -> float:
+    """Expected tokens (prompt and completion) of a generation"""
+    return float(estimate_llm_calls(n_drafts, n_candidates, n_audiences) * tokens_per_call)
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Args:
+        reason: "rate_limited" (tenant budget spent) or "overloaded"
+            (concurrency cap reached)
+        retry_after: Seconds after which a retry may be admitted
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request rejected ({reason}), retry after {math.ceil(retry_after)}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum tokens held (burst size)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """
+        Spend tokens if the bucket holds enough.
+
+        A cost above the capacity needs a full bucket and empties it.
+
+        Returns:
+            0 when the tokens were taken, else seconds until they will be available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+class AdaptiveLimit:
+    """
+    AIMD cap on concurrent generations driven by observed LLM queue wait.
+
+    Args:
+        initial: Starting limit, also the upper bound
+        minimum: Lowest limit
+        target_queue_seconds: Queue wait above which the limit decreases
+    """
+
+    def __init__(
+        self,
+        initial: int = MAX_CONCURRENT_GENERATIONS,
+        minimum: int = ADMISSION_MIN_CONCURRENCY,
+        target_queue_seconds: float = ADMISSION_TARGET_QUEUE_SECONDS
+    ):
+        self.maximum = initial
+        self.minimum = max(1, minimum)
+        self.target = target_queue_seconds
+        self.limit = float(initial)
+        self._decreased_at = 0.0
+        ADMISSION_LIMIT.set(self.current)
+
+    @property
+    def current(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def observe(self, queue_seconds: float) -> None:
+        """Adjust the limit after an LLM call"""
+        now = time.monotonic()
+        if queue_seconds > self.target:
+            if now - self._decreased_at < DECREASE_COOLDOWN:
+                return
+            self._decreased_at = now
+            self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+            logger.info(f"Admission limit lowered to {self.current} (queue wait {queue_seconds:.2f}s)")
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / max(self.limit, 1))
+        ADMISSION_LIMIT.set(self.current)
+
+@dataclass
+class Ticket:
+    """An admitted generation, released when it ends"""
+    tenant: str
+    cost: float
+    concurrent: bool
+    admitted_at: float
+    released: bool = False
+
+class AdmissionController:
+    """
+    Token buckets per tenant and an adaptive global concurrency cap.
+
+    Args:
+        tokens_per_minute: Refill rate of each tenant bucket
+        burst_tokens: Capacity of each tenant bucket
+        limit: Adaptive concurrency cap
+        enabled: When False every request is admitted
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: float = TENANT_TOKENS_PER_MINUTE,
+        burst_tokens: float = TENANT_BURST_TOKENS,
+        limit: Optional[AdaptiveLimit] = None,
+        enabled: bool = ADMISSION_ENABLED
+    ):
+        self.rate = tokens_per_minute / 60
+        self.burst = burst_tokens
+        self.limit = limit or AdaptiveLimit()
+        self.enabled = enabled
+        self.in_flight = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._duration_ewma: Optional[float] = None
+        # Set in generation worker processes: observations go to the API process
+        self.forward: Optional[Callable[[float], None]] = None
+        # LLM calls are observed from the workflow executor threads too
+        self._lock = threading.Lock()
+
+    def admit(self, tenant: Optional[str], cost: float, concurrent: bool = True) -> Ticket:
+        """
+        Admit a request or reject it.
+
+        Args:
+            tenant: API key of the caller, None for anonymous callers
+            cost: Expected tokens of the request, see `estimate_cost`
+            concurrent: Whether the request runs now and takes a
+                concurrency slot (False for queued or self-limited work)
+
+        Returns:
+            The ticket to release when the generation ends
+
+        Raises:
+            AdmissionRejected: When the tenant budget or the concurrency cap is exceeded
+        """
+        tenant = tenant or "anonymous"
+        ticket = Ticket(tenant, cost, concurrent, time.monotonic())
+        if not self.enabled:
+            return ticket
+
+        with self._lock:
+            if concurrent and self.in_flight >= self.limit.current:
+                self._reject("overloaded", self._retry_after_overload())
+            wait = self._bucket(tenant).take(cost)
+            if wait > 0:
+                self._reject("rate_limited", wait)
+            if concurrent:
+                self.in_flight += 1
+                ADMISSION_IN_FLIGHT.set(self.in_flight)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """End an admitted generation; releasing twice is a no-op"""
+        with self._lock:
+            if ticket.released:
+                return
+            ticket.released = True
+            if not (self.enabled and ticket.concurrent):
+                return
+            self.in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight)
+            duration = time.monotonic() - ticket.admitted_at
+            self._duration_ewma = duration if self._duration_ewma is None else 0.8 * self._duration_ewma + 0.2 * duration
+
+    def observe_llm_call(self, queue_seconds: float) -> None:
+        """Feed the Ollama queue wait of an LLM call to the adaptive limit"""
+        if self.forward is not None:
+            self.forward(queue_seconds)
+        elif self.enabled:
+            with self._lock:
+                self.limit.observe(queue_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "concurrency_limit": self.limit.current,
+            "in_flight": self.in_flight,
+            "tenants": len(self._buckets),
+            "mean_generation_seconds": round(self._duration_ewma, 3) if self._duration_ewma is not None else None,
+        }
+
+    def _bucket(self, tenant: str) -> TokenBucket:
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            bucket = self._buckets[tenant] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > MAX_TENANTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(tenant)
+        return bucket
+
+    def _retry_after_overload(self) -> float:
+        """Expected time until a slot frees up"""
+        if self._duration_ewma is None:
+            return 1.0
+        return self._duration_ewma / max(self.limit.current, 1)
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        ADMISSION_REJECTED.inc(reason=reason)
+        raise AdmissionRejected(reason, retry_after)
+
+admission = AdmissionController()
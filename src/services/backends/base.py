@@ -0,0 +1,123 @@
+"""
+LLM backend interface
+---------------------
+Every LLM call of the agent and the /health probe go through an
+`LLMBackend`. A backend owns its (pooled) connections and is shared by
+all agents of the process; model and temperature are passed per call.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List
+
+TokenCallback = Callable[[str], None]
+
+class BackendError(Exception):
+    """
+    Failure of an LLM backend call.
+    
+    Args:
+        message: Description of the failure
+        retryable: Whether retrying the call may succeed
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+class CircuitOpenError(BackendError):
+    """Raised without calling the backend while its circuit breaker is open"""
+
+    def __init__(self, message: str):
+        super().__init__(message, retryable=False)
+
+@dataclass
+class LLMResult:
+    """
+    Response of an LLM call.
+    
+    Attributes:
+        text: Generated text
+        info: Backend metadata of the response (Ollama field names:
+            prompt_eval_count, prompt_eval_duration, eval_count, ...)
+    """
+    text: str
+    info: Dict[str, Any] = field(default_factory=dict)
+
+class LLMBackend:
+    """
+    Base class of LLM backends.
+    
+    Subclasses implement the sync and async calls; `astream` defaults to a
+    single chunk holding the whole response.
+    """
+
+    name = "base"
+
+    def generate(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> LLMResult:
+        """
+        Generate a response.
+        
+        Args:
+            system_prompt: Instructions for the AI role
+            user_prompt: Specific task or content to process
+            model: Model name
+            temperature: Sampling temperature
+            
+        Returns:
+            The generated response
+        """
+        raise NotImplementedError
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> LLMResult:
+        """Asynchronous counterpart of `generate`"""
+        raise NotImplementedError
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        on_token: TokenCallback
+    ) -> LLMResult:
+        """
+        Generate a response, calling `on_token` for every chunk of text.
+        
+        Returns:
+            The complete response, with the metadata of the final chunk
+        """
+        result = await self.agenerate(system_prompt, user_prompt, model, temperature)
+        on_token(result.text)
+        return result
+
+    def list_models(self) -> List[str]:
+        """Names of the models available on the backend"""
+        raise NotImplementedError
+
+    async def alist_models(self) -> List[str]:
+        """Asynchronous counterpart of `list_models`"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Runtime statistics of the backend"""
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        """Release the backend connections"""
+
+    async def aclose(self) -> None:
+        """Asynchronous counterpart of `close`"""
+        self.close()
+
+def build_messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    """Chat messages sent for a (system prompt, user prompt) pair"""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
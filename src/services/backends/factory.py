@@ -0,0 +1,58 @@
+"""
+Backend factory
+---------------
+Builds the process-wide LLM backend selected by LLM_BACKEND ("ollama" or
+"fake"), wrapped with retries and a circuit breaker. Several
+OLLAMA_BASE_URLS are load balanced by a HostPool; since the pool routes
+every attempt and moves a generation off a host that just failed, retries
+fail over to another host, sticky routing included. All agents and the
+/health probe share it, and therefore share its connection pool.
+"""
+
+import threading
+from typing import Optional
+from src.services.backends.base import LLMBackend
+from src.services.backends.resilience import ResilientBackend
+from src.utils.constants import LLM_BACKEND, OLLAMA_BASE_URLS
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+def build_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    """
+    Build a resilient backend by name.
+    
+    Args:
+        name: "ollama" or "fake"
+        
+    Returns:
+        The backend wrapped with retries and a circuit breaker
+    """
+    if name == "ollama":
+        from src.services.backends.ollama import OllamaBackend
+        if len(OLLAMA_BASE_URLS) > 1:
+            from src.services.backends.pool import HostPool
+            backend = HostPool({url: OllamaBackend(base_url=url) for url in OLLAMA_BASE_URLS})
+        else:
+            backend = OllamaBackend(base_url=OLLAMA_BASE_URLS[0])
+    elif name == "fake":
+        from src.services.backends.fake import FakeBackend
+        backend = FakeBackend()
+    else:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    return ResilientBackend(backend)
+
+def get_backend() -> LLMBackend:
+    """Process-wide LLM backend, built on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = build_backend()
+    return _backend
+
+def set_backend(backend: LLMBackend) -> None:
+    """Replace the process-wide backend (e.g. with a FakeBackend for load tests)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,124 @@
+"""
+Fake backend
+------------
+Deterministic stand-in for Ollama, used to run and load-test the whole
+workflow without a model. Responses depend only on the prompts, with a
+configurable latency and token rate. Writer responses satisfy the post
+constraints and critiques alternate between REVISE and APPROVE verdicts
+depending on the prompt hash, so every workflow path is exercised.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Dict, Any, List
+from src.services.backends.base import LLMBackend, LLMResult, TokenCallback
+from src.utils.constants import FAKE_LLM_LATENCY, FAKE_LLM_TOKENS_PER_SECOND, OLLAMA_MODEL
+
+class FakeBackend(LLMBackend):
+    """
+    Deterministic fake LLM.
+    
+    Args:
+        latency: Seconds before the first token
+        tokens_per_second: Generation speed, 0 for instantaneous
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY,
+        tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+
+    def generate(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> LLMResult:
+        tokens = self._respond(system_prompt, user_prompt)
+        time.sleep(self._duration(tokens))
+        return self._result(system_prompt, user_prompt, tokens)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> LLMResult:
+        tokens = self._respond(system_prompt, user_prompt)
+        await asyncio.sleep(self._duration(tokens))
+        return self._result(system_prompt, user_prompt, tokens)
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        on_token: TokenCallback
+    ) -> LLMResult:
+        tokens = self._respond(system_prompt, user_prompt)
+        await asyncio.sleep(self.latency)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for token in tokens:
+            if delay:
+                await asyncio.sleep(delay)
+            on_token(token)
+        return self._result(system_prompt, user_prompt, tokens)
+
+    def list_models(self) -> List[str]:
+        return [OLLAMA_MODEL]
+
+    async def alist_models(self) -> List[str]:
+        return self.list_models()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "calls": self.calls}
+
+    def _respond(self, system_prompt: str, user_prompt: str) -> List[str]:
+        """Deterministic response tokens for a prompt pair"""
+        self.calls += 1
+        seed = int(hashlib.sha256((system_prompt + "\0" + user_prompt).encode("utf-8")).hexdigest()[:8], 16)
+        if "VERDICT" in system_prompt:
+            verdict = "APPROVE" if seed % 3 == 0 else "REVISE"
+            score = 8 if verdict == "APPROVE" else 5 + seed % 3
+            text = (
+                f"The hook is clear and the audience is well targeted. "
+                f"Tighten the second paragraph and sharpen the call-to-action (ref {seed % 1000}).\n"
+                f"SCORE: {score}\nVERDICT: {verdict}"
+            )
+        elif "hashtags" in system_prompt:
+            text = (
+                f"Big news worth sharing (draft {seed % 1000}).\n\n"
+                f"{_excerpt(user_prompt)}\n\n"
+                f"What would you build with it? Tell us in the comments.\n\n"
+                f"#AI #Innovation #Leadership"
+            )
+        else:
+            text = _excerpt(user_prompt, 600)
+        return [word + " " for word in text.split(" ")]
+
+    def _duration(self, tokens: List[str]) -> float:
+        """Simulated time to produce a response"""
+        return self.latency + (len(tokens) / self.tokens_per_second if self.tokens_per_second else 0)
+
+    def _result(self, system_prompt: str, user_prompt: str, tokens: List[str]) -> LLMResult:
+        prompt_tokens = (len(system_prompt) + len(user_prompt)) // 4
+        generation_seconds = len(tokens) / self.tokens_per_second if self.tokens_per_second else 0
+        return LLMResult(
+            text="".join(tokens).strip(),
+            info={
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(self.latency * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int(generation_seconds * 1e9),
+            }
+        )
+
+def _excerpt(text: str, limit: int = 400) -> str:
+    """First characters of the text between the first pair of code fences, or of the text"""
+    parts = text.split("```")
+    body = parts[1] if len(parts) > 2 else text
+    return " ".join(body.split())[:limit]
@@ -0,0 +1,199 @@
+"""
+Ollama backend
+--------------
+Talks to the Ollama HTTP API (/api/chat) through one pooled httpx client
+per backend (sync and async), with explicit connect/read timeouts and a
+keep_alive so the model stays loaded between the calls of a generation.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+import httpx
+from src.services.backends.base import (
+    BackendError,
+    LLMBackend,
+    LLMResult,
+    TokenCallback,
+    build_messages
+)
+from src.utils.constants import (
+    OLLAMA_BASE_URL,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_READ_TIMEOUT,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_KEEP_ALIVE
+)
+
+class OllamaBackend(LLMBackend):
+    """
+    Ollama HTTP backend with connection pooling.
+    
+    Args:
+        base_url: Ollama server URL
+        connect_timeout: Seconds allowed to establish a connection
+        read_timeout: Seconds allowed between two received chunks
+        max_connections: Size of the connection pool
+        keep_alive: How long Ollama keeps the model loaded after a call
+    """
+
+    name = "ollama"
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_BASE_URL,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        read_timeout: float = OLLAMA_READ_TIMEOUT,
+        max_connections: int = OLLAMA_MAX_CONNECTIONS,
+        keep_alive: Optional[str] = OLLAMA_KEEP_ALIVE
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        """Pooled synchronous client, created on first use"""
+        if self._client is None:
+            self._client = httpx.Client(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+        return self._client
+
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        """Pooled asynchronous client, created on first use"""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+        return self._aclient
+
+    def generate(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> LLMResult:
+        payload = self._chat_payload(system_prompt, user_prompt, model, temperature, stream=False)
+        try:
+            response = self.client.post("/api/chat", json=payload)
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+        return _chat_result(_checked_json(response))
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> LLMResult:
+        payload = self._chat_payload(system_prompt, user_prompt, model, temperature, stream=False)
+        try:
+            response = await self.aclient.post("/api/chat", json=payload)
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+        return _chat_result(_checked_json(response))
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        on_token: TokenCallback
+    ) -> LLMResult:
+        payload = self._chat_payload(system_prompt, user_prompt, model, temperature, stream=True)
+        chunks = []
+        final: Dict[str, Any] = {}
+        try:
+            async with self.aclient.stream("POST", "/api/chat", json=payload) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    _checked_json(response)
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise BackendError(f"Ollama error: {data['error']}")
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        chunks.append(content)
+                        on_token(content)
+                    if data.get("done"):
+                        final = data
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+        return LLMResult(text="".join(chunks), info=_usage_info(final))
+
+    def list_models(self) -> List[str]:
+        try:
+            response = self.client.get("/api/tags")
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+        return [model.get("model") or model.get("name") for model in _checked_json(response).get("models", [])]
+
+    async def alist_models(self) -> List[str]:
+        try:
+            response = await self.aclient.get("/api/tags")
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+        return [model.get("model") or model.get("name") for model in _checked_json(response).get("models", [])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "base_url": self.base_url}
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def _chat_payload(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Body of an /api/chat request"""
+        payload = {
+            "model": model,
+            "messages": build_messages(system_prompt, user_prompt),
+            "stream": stream,
+            "options": {"temperature": temperature},
+        }
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+def _checked_json(response: httpx.Response) -> Dict[str, Any]:
+    """Decode a response, turning HTTP errors into BackendError"""
+    if response.status_code >= 400:
+        # Overload and server errors are transient, client errors are not
+        retryable = response.status_code == 429 or response.status_code >= 500
+        raise BackendError(
+            f"Ollama returned HTTP {response.status_code}: {response.text[:200]}",
+            retryable=retryable
+        )
+    return response.json()
+
+def _transport_error(error: httpx.TransportError) -> BackendError:
+    """Wrap connection errors and timeouts as retryable backend errors"""
+    return BackendError(f"Ollama request failed: {error!r}", retryable=True)
+
+def _chat_result(data: Dict[str, Any]) -> LLMResult:
+    """Build the result of a non-streaming /api/chat response"""
+    return LLMResult(text=data.get("message", {}).get("content", ""), info=_usage_info(data))
+
+def _usage_info(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the usage fields of an Ollama response"""
+    keys = (
+        "total_duration", "load_duration", "prompt_eval_count",
+        "prompt_eval_duration", "eval_count", "eval_duration"
+    )
+    return {key: data[key] for key in keys if key in data}
@@ -0,0 +1,240 @@
+"""
+Multi-host pool
+---------------
+Spreads LLM calls over several Ollama hosts. Each call goes to the
+healthy host with the fewest outstanding requests ("least_outstanding")
+or the lowest expected wait, latency EWMA x (outstanding + 1)
+("latency"). Hosts failing repeatedly are passively ejected for a while.
+With stickiness enabled, all calls of one generation go to the same
+host so they hit its warm KV cache; a retryable failure moves the
+generation to another host, so retries fail over.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
+from src.services.backends.base import BackendError, LLMBackend, LLMResult, TokenCallback
+from src.utils.constants import (
+    OLLAMA_ROUTING,
+    OLLAMA_STICKY,
+    OLLAMA_EJECT_AFTER_ERRORS,
+    OLLAMA_EJECT_SECONDS
+)
+from src.utils.logger import logger
+
+# Key of the generation the current call belongs to, used for stickiness
+routing_affinity: ContextVar[Optional[str]] = ContextVar("routing_affinity", default=None)
+
+LATENCY_SMOOTHING = 0.2
+MAX_AFFINITIES = 10_000
+
+class HostState:
+    """
+    Routing state of one host.
+    
+    Args:
+        backend: Backend calling this host
+        url: Host URL, used in stats and logs
+    """
+
+    def __init__(self, backend: LLMBackend, url: str):
+        self.backend = backend
+        self.url = url
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.latency_ewma: Optional[float] = None
+        self.ejected_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def expected_wait(self) -> float:
+        """Latency-weighted load used by the "latency" strategy"""
+        return (self.latency_ewma or 0.0) * (self.in_flight + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+        }
+
+class HostPool(LLMBackend):
+    """
+    Backend routing calls over several host backends.
+    
+    Args:
+        hosts: Mapping of host URL to the backend calling it
+        strategy: "least_outstanding" or "latency"
+        sticky: Whether calls of one generation stick to one host
+        eject_after_errors: Consecutive failures ejecting a host
+        eject_seconds: How long an ejected host is skipped
+    """
+
+    name = "pool"
+
+    def __init__(
+        self,
+        hosts: Dict[str, LLMBackend],
+        strategy: str = OLLAMA_ROUTING,
+        sticky: bool = OLLAMA_STICKY,
+        eject_after_errors: int = OLLAMA_EJECT_AFTER_ERRORS,
+        eject_seconds: float = OLLAMA_EJECT_SECONDS
+    ):
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.hosts = [HostState(backend, url) for url, backend in hosts.items()]
+        self.strategy = strategy
+        self.sticky = sticky
+        self.eject_after_errors = eject_after_errors
+        self.eject_seconds = eject_seconds
+        self._affinities: "OrderedDict[str, HostState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _candidates(self) -> List[HostState]:
+        """Healthy hosts, or the host that comes back first when all are ejected"""
+        candidates = [host for host in self.hosts if host.healthy]
+        return candidates or [min(self.hosts, key=lambda host: host.ejected_until)]
+
+    def _best(self, candidates: List[HostState]) -> HostState:
+        """Least loaded candidate according to the routing strategy"""
+        if self.strategy == "latency":
+            return min(candidates, key=lambda h: (h.expected_wait(), h.in_flight))
+        return min(candidates, key=lambda h: (h.in_flight, h.latency_ewma or 0.0))
+
+    def _pick(self, key: Optional[str]) -> HostState:
+        """Choose the host of the next call and count it as in flight"""
+        with self._lock:
+            candidates = self._candidates()
+            host = self._affinities.get(key) if key else None
+            if host is None or host not in candidates:
+                host = self._best(candidates)
+                if key:
+                    self._affinities[key] = host
+            if key:
+                self._affinities.move_to_end(key)
+                while len(self._affinities) > MAX_AFFINITIES:
+                    self._affinities.popitem(last=False)
+            
+            host.in_flight += 1
+            host.requests += 1
+            return host
+
+    def _done(
+        self,
+        host: HostState,
+        started_at: float,
+        error: Optional[BaseException],
+        key: Optional[str] = None
+    ) -> None:
+        """Update the host state once a call finished"""
+        with self._lock:
+            host.in_flight -= 1
+            if error is None:
+                elapsed = time.monotonic() - started_at
+                host.consecutive_errors = 0
+                host.latency_ewma = elapsed if host.latency_ewma is None else (
+                    LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * host.latency_ewma
+                )
+                return
+            
+            host.errors += 1
+            if isinstance(error, BackendError) and error.retryable:
+                # The retry of this generation goes to another host when there is one
+                if key and self._affinities.get(key) is host:
+                    others = [other for other in self._candidates() if other is not host]
+                    if others:
+                        self._affinities[key] = self._best(others)
+                    else:
+                        del self._affinities[key]
+                host.consecutive_errors += 1
+                if host.consecutive_errors >= self.eject_after_errors and host.healthy:
+                    host.ejected_until = time.monotonic() + self.eject_seconds
+                    logger.warning(
+                        f"Ejecting LLM host {host.url} for {self.eject_seconds:.0f}s "
+                        f"after {host.consecutive_errors} consecutive errors"
+                    )
+
+    @contextmanager
+    def _route(self) -> Iterator[HostState]:
+        key = routing_affinity.get() if self.sticky else None
+        host = self._pick(key)
+        started_at = time.monotonic()
+        try:
+            yield host
+        except BaseException as e:
+            self._done(host, started_at, e, key)
+            raise
+        self._done(host, started_at, None)
+
+    def generate(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> LLMResult:
+        with self._route() as host:
+            return host.backend.generate(system_prompt, user_prompt, model, temperature)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> LLMResult:
+        with self._route() as host:
+            return await host.backend.agenerate(system_prompt, user_prompt, model, temperature)
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        on_token: TokenCallback
+    ) -> LLMResult:
+        with self._route() as host:
+            return await host.backend.astream(system_prompt, user_prompt, model, temperature, on_token)
+
+    def list_models(self) -> List[str]:
+        models, last_error = set(), None
+        for host in self.hosts:
+            try:
+                models.update(host.backend.list_models())
+            except BackendError as e:
+                last_error = e
+        if not models and last_error is not None:
+            raise last_error
+        return sorted(models)
+
+    async def alist_models(self) -> List[str]:
+        models, last_error = set(), None
+        for host in self.hosts:
+            try:
+                models.update(await host.backend.alist_models())
+            except BackendError as e:
+                last_error = e
+        if not models and last_error is not None:
+            raise last_error
+        return sorted(models)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "strategy": self.strategy,
+            "sticky": self.sticky,
+            "hosts": [host.stats() for host in self.hosts],
+        }
+
+    def close(self) -> None:
+        for host in self.hosts:
+            host.backend.close()
+
+    async def aclose(self) -> None:
+        for host in self.hosts:
+            await host.backend.aclose()
@@ -0,0 +1,207 @@
+"""
+Backend resilience
+------------------
+Retries with jittered exponential backoff (tenacity) and a circuit
+breaker around any `LLMBackend`. Only retryable `BackendError`s
+(timeouts, connection failures, 429/5xx) are retried; while the circuit
+is open calls fail immediately with `CircuitOpenError` instead of
+piling up on an unhealthy server.
+"""
+
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential
+)
+from src.services.backends.base import (
+    BackendError,
+    CircuitOpenError,
+    LLMBackend,
+    LLMResult,
+    TokenCallback
+)
+from src.utils.constants import (
+    LLM_RETRY_ATTEMPTS,
+    LLM_RETRY_MAX_WAIT,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT
+)
+from src.utils.logger import logger
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    
+    The circuit opens after `failure_threshold` consecutive failures and
+    rejects calls for `reset_timeout` seconds, then lets calls through
+    again (half-open); the first success closes it.
+    
+    Args:
+        failure_threshold: Consecutive failures opening the circuit
+        reset_timeout: Seconds the circuit stays open
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls are currently rejected"""
+        if self.state == "open":
+            raise CircuitOpenError(
+                f"Circuit open after {self.failures} consecutive failures, "
+                f"retrying in {self.reset_timeout - (time.monotonic() - self.opened_at):.0f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.state == "half_open":
+                    logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+
+def _is_retryable(error: BaseException) -> bool:
+    return isinstance(error, BackendError) and error.retryable
+
+class ResilientBackend(LLMBackend):
+    """
+    Wrap a backend with retries and a circuit breaker.
+    
+    Args:
+        backend: Backend doing the actual calls
+        attempts: Maximum number of attempts per call
+        max_wait: Upper bound of the backoff between attempts, in seconds
+        breaker: Circuit breaker, a default one when omitted
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        attempts: int = LLM_RETRY_ATTEMPTS,
+        max_wait: float = LLM_RETRY_MAX_WAIT,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.backend = backend
+        self.name = backend.name
+        self.attempts = attempts
+        self.max_wait = max_wait
+        self.breaker = breaker or CircuitBreaker()
+
+    def _retry_options(self) -> Dict[str, Any]:
+        return {
+            "stop": stop_after_attempt(self.attempts),
+            "wait": wait_random_exponential(multiplier=0.5, max=self.max_wait),
+            "retry": retry_if_exception(_is_retryable),
+            "reraise": True,
+        }
+
+    def _call(self, fn, *args):
+        """Run a sync call through the breaker, recording its outcome"""
+        self.breaker.before_call()
+        try:
+            result = fn(*args)
+        except BackendError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _acall(self, fn, *args):
+        """Run an async call through the breaker, recording its outcome"""
+        self.breaker.before_call()
+        try:
+            result = await fn(*args)
+        except BackendError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def generate(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> LLMResult:
+        for attempt in Retrying(**self._retry_options()):
+            with attempt:
+                return self._call(self.backend.generate, system_prompt, user_prompt, model, temperature)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> LLMResult:
+        async for attempt in AsyncRetrying(**self._retry_options()):
+            with attempt:
+                return await self._acall(self.backend.agenerate, system_prompt, user_prompt, model, temperature)
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        on_token: TokenCallback
+    ) -> LLMResult:
+        streamed = False
+
+        def forward(token: str) -> None:
+            nonlocal streamed
+            streamed = True
+            on_token(token)
+
+        # Tokens already sent to the client cannot be taken back: only retry
+        # failures that happened before the first token
+        def retryable(error: BaseException) -> bool:
+            return not streamed and _is_retryable(error)
+
+        options = {**self._retry_options(), "retry": retry_if_exception(retryable)}
+        async for attempt in AsyncRetrying(**options):
+            with attempt:
+                return await self._acall(
+                    self.backend.astream, system_prompt, user_prompt, model, temperature, forward
+                )
+
+    def list_models(self) -> List[str]:
+        return self._call(self.backend.list_models)
+
+    async def alist_models(self) -> List[str]:
+        return await self._acall(self.backend.alist_models)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.backend.stats(),
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+    def close(self) -> None:
+        self.backend.close()
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
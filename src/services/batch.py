@@ -0,0 +1,186 @@
+"""
+Batch generation
+----------------
+Runs many (text, audience) jobs concurrently over the shared, compiled
+workflow. Results are yielded in completion order; a failing item is
+reported as an error result and never fails the batch. Successful
+results can be appended to a checkpoint file so an interrupted batch
+resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional, Set
+from src.models.config import Configuration
+from src.utils.constants import DEFAULT_N_DRAFTS, DEFAULT_BATCH_CONCURRENCY
+from src.services.workers import agenerate_post
+from src.utils.logger import logger
+
+@dataclass
+class BatchJob:
+    """
+    A single post to generate as part of a batch.
+    
+    Attributes:
+        id: Identifier of the job, unique within the batch
+        text: Original text to transform
+        target_audience: Target audience for the post
+        n_drafts: Number of iterations to perform
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round (configuration default when None)
+        error: Why the job could not be read; such a job is reported as
+            failed without running
+    """
+    id: str
+    text: str
+    target_audience: str
+    n_drafts: int = DEFAULT_N_DRAFTS
+    use_cache: bool = True
+    n_candidates: Optional[int] = None
+    error: Optional[str] = None
+
+def load_jobs(path: str) -> List[BatchJob]:
+    """
+    Read batch jobs from a JSONL file.
+    
+    Each line is an object with "text" and "target_audience" and optionally
+    "id", "n_drafts", "use_cache" and "n_candidates". Missing ids default
+    to the line number. A line that is not such an object becomes a job
+    carrying its error, so it is reported as a failed item instead of
+    aborting the batch.
+    
+    Args:
+        path: Path of the JSONL file
+        
+    Returns:
+        The jobs, in file order
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                item["id"] = str(item.get("id", line_number))
+                jobs.append(BatchJob(**item))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Invalid batch line {line_number}: {e}")
+                jobs.append(BatchJob(
+                    id=str(line_number), text="", target_audience="", error=f"Invalid line {line_number}: {e}"
+                ))
+    return jobs
+
+class BatchCheckpoint:
+    """
+    Append-only JSONL log of completed batch items.
+    
+    Args:
+        path: Path of the checkpoint file, created if missing
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def completed_ids(self) -> Set[str]:
+        """Ids of the items successfully completed by previous runs"""
+        if not os.path.exists(self.path):
+            return set()
+        
+        done = set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial line left by an interrupted write
+                    continue
+                if record.get("status") == "ok":
+                    done.add(str(record["id"]))
+        return done
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Append a successful result to the checkpoint"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+async def arun_batch(
+    jobs: Iterable[BatchJob],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    checkpoint_path: Optional[str] = None,
+    config: Optional[Configuration] = None,
+    limiter: Optional[asyncio.Semaphore] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate posts for many jobs concurrently.
+    
+    Args:
+        jobs: Jobs to run
+        concurrency: Maximum number of generations in flight for this batch
+        checkpoint_path: Checkpoint file; completed jobs found there are skipped
+        config: Workflow configuration, defaults are used when omitted
+        limiter: Optional semaphore shared with other callers (e.g. the API
+            worker limit), acquired around each generation
+        
+    Yields:
+        One result per job in completion order: {"id", "status": "ok",
+        "result"} or {"id", "status": "error", "error"}
+    """
+    checkpoint = BatchCheckpoint(checkpoint_path) if checkpoint_path else None
+    done = checkpoint.completed_ids() if checkpoint else set()
+    pending = [job for job in jobs if job.id not in done]
+    if done:
+        logger.info(f"Resuming batch: {len(done)} items already completed, {len(pending)} remaining")
+
+    todo: asyncio.Queue = asyncio.Queue()
+    for job in pending:
+        todo.put_nowait(job)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def run_job(job: BatchJob) -> Dict[str, Any]:
+        if job.error is not None:
+            return {"id": job.id, "status": "error", "error": job.error}
+        try:
+            if limiter is None:
+                result = await _generate(job, config)
+            else:
+                async with limiter:
+                    result = await _generate(job, config)
+            if result is None:
+                raise RuntimeError("Failed to generate post")
+            return {"id": job.id, "status": "ok", "result": result}
+        except Exception as e:
+            logger.error(f"Batch item {job.id} failed: {e}")
+            return {"id": job.id, "status": "error", "error": str(e)}
+
+    async def worker() -> None:
+        while not todo.empty():
+            job = todo.get_nowait()
+            results.put_nowait(await run_job(job))
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(pending))))]
+    try:
+        for _ in range(len(pending)):
+            result = await results.get()
+            if checkpoint and result["status"] == "ok":
+                checkpoint.record(result)
+            yield result
+    finally:
+        for task in workers:
+            task.cancel()
+
+async def _generate(job: BatchJob, config: Optional[Configuration]) -> Optional[Dict[str, Any]]:
+    """Run the workflow for one batch job (in a generation worker when the pool runs)"""
+    return await agenerate_post(
+        text=job.text,
+        target_audience=job.target_audience,
+        n_drafts=job.n_drafts,
+        config=config,
+        use_cache=job.use_cache,
+        n_candidates=job.n_candidates
+    )
@@ -0,0 +1,258 @@
+"""
+LLM response cache
+------------------
+Content-addressed cache for LLM responses. Entries are keyed on a hash of
+the model, temperature, system prompt and user prompt, so resubmitting
+the same text (retries, duplicate queue deliveries) costs no LLM call.
+
+Two tiers are available: an in-memory LRU and an optional sqlite file
+shared across restarts and worker processes. Both support TTL and
+size-based eviction.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from src.utils.constants import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL,
+    LLM_CACHE_PATH,
+    LLM_CACHE_DISK_MAX_ENTRIES
+)
+from src.utils.logger import logger
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    system_prompt: str,
+    user_prompt: str,
+    variant: int = 0
+) -> str:
+    """
+    Compute the content address of an LLM call.
+    
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        system_prompt: Instructions for the AI role
+        user_prompt: Specific task or content to process
+        variant: Index distinguishing parallel samples of the same prompt
+        
+    Returns:
+        Hex digest identifying the call
+    """
+    digest = hashlib.sha256()
+    for part in (model, repr(float(temperature)), system_prompt, user_prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    if variant:
+        digest.update(f"variant:{variant}".encode("utf-8"))
+    return digest.hexdigest()
+
+class ResponseCache:
+    """
+    Base class of response caches, tracking hit/miss counters.
+    
+    Subclasses implement `_get` and `_set`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None"""
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response"""
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU cache with optional TTL.
+    
+    Args:
+        max_entries: Maximum number of responses kept
+        ttl: Entry lifetime in seconds, None for no expiry
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            created_at, value = item
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "entries": len(self._entries)}
+
+class SqliteCache(ResponseCache):
+    """
+    On-disk cache backed by a sqlite file, with TTL and LRU eviction.
+    
+    Args:
+        path: Path of the sqlite database file
+        max_entries: Maximum number of responses kept
+        ttl: Entry lifetime in seconds, None for no expiry
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used ones above the size limit"""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {**super().stats(), "entries": entries, "path": self.path}
+
+class TieredCache(ResponseCache):
+    """
+    Memory cache in front of a disk cache; disk hits are promoted to memory.
+    
+    Args:
+        memory: First-level cache
+        disk: Second-level cache
+    """
+
+    def __init__(self, memory: MemoryCache, disk: SqliteCache):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def _get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "memory": self.memory.stats(), "disk": self.disk.stats()}
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_built = False
+_default_cache_lock = threading.Lock()
+
+def build_response_cache() -> Optional[ResponseCache]:
+    """
+    Build a response cache from the environment configuration.
+    
+    Returns:
+        The configured cache, or None when caching is disabled
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    
+    memory = MemoryCache(max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL)
+    if not LLM_CACHE_PATH:
+        return memory
+    
+    logger.info(f"Using on-disk LLM response cache at {LLM_CACHE_PATH}")
+    disk = SqliteCache(LLM_CACHE_PATH, max_entries=LLM_CACHE_DISK_MAX_ENTRIES, ttl=LLM_CACHE_TTL)
+    return TieredCache(memory, disk)
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache shared by every agent"""
+    global _default_cache, _default_cache_built
+    if not _default_cache_built:
+        with _default_cache_lock:
+            if not _default_cache_built:
+                _default_cache = build_response_cache()
+                _default_cache_built = True
+    return _default_cache
@@ -0,0 +1,309 @@
+"""
+Workflow checkpointing
+----------------------
+Durable LangGraph checkpointer so an interrupted generation resumes from
+its last completed node instead of re-running every LLM call.
+
+Checkpoints are stored as append-only deltas in a sqlite file: each write
+only records what changed since the previous checkpoint of the same
+thread (new keys, changed values, and the appended tail of lists such as
+the drafts), not a full copy of the state. A new run first claims its
+thread (`reserve`), so an id cannot be reused while it has checkpoints,
+even by concurrent requests. Threads inactive for longer than the TTL
+are pruned at startup, then while checkpoints are written (at most
+once per prune interval), so the file does not keep growing.
+
+The latest checkpoint of recent threads is kept in memory, tagged with
+the sequence number of its last delta. Generation workers share the
+file, so a cached checkpoint is only used while that delta is still
+the latest one of the thread; otherwise the deltas written since are
+replayed onto it (or the whole thread, if it was pruned meanwhile).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.utils import ConfigurableFieldSpec
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointAt
+from src.services.errors import GenerationExistsError
+from src.utils.constants import CHECKPOINT_ENABLED, CHECKPOINT_PATH, CHECKPOINT_TTL, CHECKPOINT_PRUNE_INTERVAL
+from src.utils.logger import logger
+
+_UNCHANGED = object()
+MAX_CACHED_THREADS = 1024
+
+def diff_state(old: Any, new: Any) -> Any:
+    """
+    Compute the delta turning `old` into `new`.
+    
+    Dictionaries are diffed key by key and lists that only grew are
+    stored as their appended tail; anything else is replaced.
+    
+    Returns:
+        The delta, or `_UNCHANGED` when both values are equal
+    """
+    if old == new:
+        return _UNCHANGED
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key, value in new.items():
+            delta = diff_state(old[key], value) if key in old else {"$set": value}
+            if delta is not _UNCHANGED:
+                changes[key] = delta
+        removed = [key for key in old if key not in new]
+        return {"$dict": changes, **({"$del": removed} if removed else {})}
+    if isinstance(old, list) and isinstance(new, list) and new[:len(old)] == old:
+        return {"$append": new[len(old):]}
+    return {"$set": new}
+
+def apply_delta(old: Any, delta: Any) -> Any:
+    """Apply a delta produced by `diff_state`"""
+    if "$set" in delta:
+        return delta["$set"]
+    if "$append" in delta:
+        return list(old) + delta["$append"]
+    value = dict(old)
+    for key, change in delta["$dict"].items():
+        value[key] = apply_delta(value.get(key), change)
+    for key in delta.get("$del", []):
+        value.pop(key, None)
+    return value
+
+def _restore(checkpoint: Dict[str, Any]) -> Checkpoint:
+    """Checkpoint with the version counters LangGraph increments in place"""
+    return Checkpoint(
+        v=checkpoint["v"],
+        ts=checkpoint["ts"],
+        channel_values=dict(checkpoint["channel_values"]),
+        channel_versions=defaultdict(int, checkpoint["channel_versions"]),
+        versions_seen=defaultdict(
+            lambda: defaultdict(int),
+            {node: defaultdict(int, seen) for node, seen in checkpoint["versions_seen"].items()}
+        )
+    )
+
+class DeltaSqliteSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer persisting per-thread checkpoint deltas in sqlite.
+    
+    Args:
+        path: Path of the sqlite database file
+        ttl: Seconds after which inactive threads are pruned, None to keep them
+        prune_interval: Minimum seconds between two prunes triggered by writes
+    """
+
+    path: str
+    ttl: Optional[float] = CHECKPOINT_TTL
+    prune_interval: float = CHECKPOINT_PRUNE_INTERVAL
+    # A checkpoint per completed step, so a run resumes after its last node
+    at: CheckpointAt = CheckpointAt.END_OF_STEP
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # Latest checkpoint per thread, with the seq and created_at of its last delta
+    _latest: "OrderedDict[str, Tuple[int, float, Dict[str, Any]]]" = PrivateAttr(default_factory=OrderedDict)
+    _conn: sqlite3.Connection = PrivateAttr()
+    _pruned_at: float = PrivateAttr(default=0.0)
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = CHECKPOINT_TTL,
+        prune_interval: float = CHECKPOINT_PRUNE_INTERVAL
+    ):
+        super().__init__(path=path, ttl=ttl, prune_interval=prune_interval)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_deltas ("
+            " thread_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " delta TEXT NOT NULL,"
+            " PRIMARY KEY (thread_id, seq))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_threads ("
+            " thread_id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL)"
+        )
+        self.prune()
+
+    def reserve(self, thread_ids: Iterable[str]) -> None:
+        """
+        Claim the threads of new runs, all of them or none.
+        
+        The claims are inserted in one transaction under a unique key, so
+        of several requests (or processes) given the same id only one
+        starts a run under it.
+        
+        Args:
+            thread_ids: Thread (generation) identifiers
+            
+        Raises:
+            GenerationExistsError: When a thread is already claimed or
+                holds checkpoints
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for thread_id in thread_ids:
+                    # Threads checkpointed before claims were recorded have no claim
+                    if self._conn.execute(
+                        "SELECT 1 FROM checkpoint_deltas WHERE thread_id = ? LIMIT 1", (thread_id,)
+                    ).fetchone():
+                        raise GenerationExistsError(thread_id)
+                    try:
+                        self._conn.execute(
+                            "INSERT INTO checkpoint_threads (thread_id, created_at) VALUES (?, ?)",
+                            (thread_id, time.time())
+                        )
+                    except sqlite3.IntegrityError:
+                        raise GenerationExistsError(thread_id) from None
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild the latest checkpoint of a thread.
+        
+        Args:
+            thread_id: Thread (generation) identifier
+            
+        Returns:
+            The latest checkpoint, or None if the thread is unknown
+        """
+        with self._lock:
+            return self._load(thread_id)[2]
+
+    def delete(self, thread_id: str) -> None:
+        """Forget every checkpoint of a thread, and its claim"""
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_deltas WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM checkpoint_threads WHERE thread_id = ?", (thread_id,))
+            self._latest.pop(thread_id, None)
+
+    def prune(self) -> None:
+        """Delete threads whose last checkpoint is older than the TTL"""
+        self._pruned_at = time.time()
+        if self.ttl is None:
+            return
+        with self._lock:
+            # Claimed threads without checkpoints (runs that failed early) expire too
+            expired = [thread_id for (thread_id,) in self._conn.execute(
+                "SELECT thread_id FROM ("
+                " SELECT thread_id, created_at FROM checkpoint_threads"
+                " UNION ALL SELECT thread_id, created_at FROM checkpoint_deltas)"
+                " GROUP BY thread_id HAVING MAX(created_at) < ?",
+                (time.time() - self.ttl,)
+            )]
+            for thread_id in expired:
+                self._conn.execute("DELETE FROM checkpoint_deltas WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("DELETE FROM checkpoint_threads WHERE thread_id = ?", (thread_id,))
+                self._latest.pop(thread_id, None)
+            if expired:
+                logger.info(f"Pruned the checkpoints of {len(expired)} expired generations")
+
+    @property
+    def config_specs(self) -> List[ConfigurableFieldSpec]:
+        return [
+            ConfigurableFieldSpec(
+                id="thread_id",
+                annotation=str,
+                name="Thread ID",
+                description=None,
+                default="",
+                is_shared=True,
+            ),
+        ]
+
+    def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        checkpoint = self.load(config["configurable"]["thread_id"])
+        return _restore(checkpoint) if checkpoint is not None else None
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        # Round-trip through JSON: the stored form is what later deltas diff against
+        encoded = json.dumps(checkpoint, default=str)
+        current = json.loads(encoded)
+        with self._lock:
+            # Held until the insert, so no other process writes the thread in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq, created_at, previous = self._load(thread_id)
+                if previous is None:
+                    delta = {"$set": current}
+                else:
+                    delta = diff_state(previous, current)
+                if delta is not _UNCHANGED:
+                    seq, created_at = seq + 1, time.time()
+                    self._conn.execute(
+                        "INSERT INTO checkpoint_deltas (thread_id, seq, created_at, delta) VALUES (?, ?, ?, ?)",
+                        (thread_id, seq, created_at, json.dumps(delta, default=str))
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._latest.pop(thread_id, None)
+                raise
+            self._conn.execute("COMMIT")
+            self._remember(thread_id, seq, created_at, current)
+        if time.time() - self._pruned_at >= self.prune_interval:
+            self.prune()
+
+    def _load(self, thread_id: str) -> Tuple[int, float, Optional[Dict[str, Any]]]:
+        """
+        Latest checkpoint of a thread, with the seq and created_at of its
+        last delta (-1 and 0 when the thread has none).
+        
+        The cached checkpoint is checked against the database, which
+        other processes may have written or pruned since it was cached.
+        """
+        latest = self._conn.execute(
+            "SELECT seq, created_at FROM checkpoint_deltas WHERE thread_id = ? ORDER BY seq DESC LIMIT 1",
+            (thread_id,)
+        ).fetchone()
+        if latest is None:
+            self._latest.pop(thread_id, None)
+            return -1, 0.0, None
+        seq, created_at, checkpoint = self._latest.get(thread_id, (-1, 0.0, None))
+        if (seq, created_at) != latest:
+            # Replay the deltas written since the cached one, if that one is still stored
+            if checkpoint is None or seq > latest[0] or self._conn.execute(
+                "SELECT created_at FROM checkpoint_deltas WHERE thread_id = ? AND seq = ?", (thread_id, seq)
+            ).fetchone() != (created_at,):
+                seq, checkpoint = -1, None
+            for (delta,) in self._conn.execute(
+                "SELECT delta FROM checkpoint_deltas WHERE thread_id = ? AND seq > ? AND seq <= ? ORDER BY seq",
+                (thread_id, seq, latest[0])
+            ):
+                checkpoint = apply_delta(checkpoint, json.loads(delta))
+            seq, created_at = latest
+        self._remember(thread_id, seq, created_at, checkpoint)
+        return seq, created_at, checkpoint
+
+    def _remember(self, thread_id: str, seq: int, created_at: float, checkpoint: Dict[str, Any]) -> None:
+        self._latest[thread_id] = (seq, created_at, checkpoint)
+        self._latest.move_to_end(thread_id)
+        while len(self._latest) > MAX_CACHED_THREADS:
+            self._latest.popitem(last=False)
+
+_saver: Optional[DeltaSqliteSaver] = None
+_saver_lock = threading.Lock()
+
+def get_checkpointer() -> Optional[DeltaSqliteSaver]:
+    """Process-wide checkpointer, None when checkpointing is disabled"""
+    global _saver
+    if not CHECKPOINT_ENABLED:
+        return None
+    if _saver is None:
+        with _saver_lock:
+            if _saver is None:
+                _saver = DeltaSqliteSaver(CHECKPOINT_PATH)
+    return _saver
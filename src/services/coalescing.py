@@ -0,0 +1,215 @@
+"""
+Request coalescing
+------------------
+Single-flight deduplication of identical in-flight generations: retries
+and double-clicks that arrive while the same request is still running
+join the running workflow instead of starting another one. Every caller
+receives the shared result, and stream callers replay the events emitted
+so far before following the live stream.
+
+Requests are identical when their normalized key matches; the
+normalization applied to the text and audience is configurable. A run
+is only cancelled once every caller waiting on it has gone away.
+"""
+
+import asyncio
+import re
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Sequence, TypeVar, Union
+from src.utils.constants import COALESCE_ENABLED, COALESCE_KEY_MODE
+from src.utils.logger import logger
+from src.utils.metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"\s+")
+
+NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "exact": lambda value: value,
+    "whitespace": lambda value: _WHITESPACE.sub(" ", value).strip(),
+    "casefold": lambda value: _WHITESPACE.sub(" ", value).strip().casefold(),
+}
+
+class _Flight:
+    """A shared run and the callers waiting on it"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Optional[Dict[str, Any]] = None) -> None:
+        """Record a stream event (or only a state change) and wake up followers"""
+        if event is not None:
+            self.events.append(event)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+class Coalescer:
+    """
+    Single-flight registry of running generations.
+
+    Args:
+        normalize: Normalization of the text and audience, a name of
+            `NORMALIZERS` or a callable
+        enabled: When False every request runs on its own
+    """
+
+    def __init__(
+        self,
+        normalize: Union[str, Callable[[str], str]] = COALESCE_KEY_MODE,
+        enabled: bool = COALESCE_ENABLED
+    ):
+        if isinstance(normalize, str):
+            if normalize not in NORMALIZERS:
+                raise ValueError(f"Unknown coalescing key mode: {normalize}")
+            normalize = NORMALIZERS[normalize]
+        self.normalize = normalize
+        self.enabled = enabled
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def key(
+        self,
+        kind: str,
+        text: str,
+        target_audience: Union[str, Sequence[str]],
+        generation_id: Optional[str] = None,
+        **params: Any
+    ) -> Optional[Hashable]:
+        """
+        Coalescing key of a request.
+
+        Args:
+            kind: Kind of response ("generate" or "stream"), runs are only
+                shared between requests of the same kind
+            text: Original text to transform
+            target_audience: Target audience for the post, or the
+                audiences of a multi-audience request
+            generation_id: Explicit run identifier; such requests are
+                never coalesced since the caller owns the checkpoint
+            **params: Other generation arguments (n_drafts, use_cache...)
+
+        Returns:
+            The key, or None when the request must run on its own
+        """
+        if not self.enabled or generation_id is not None:
+            return None
+        return (
+            kind,
+            self.normalize(text),
+            self.normalize(target_audience) if isinstance(target_audience, str)
+            else tuple(map(self.normalize, target_audience)),
+            tuple(sorted(params.items())),
+        )
+
+    async def run(self, key: Optional[Hashable], factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a coroutine once per key, concurrent callers sharing its result.
+
+        Args:
+            key: Coalescing key, None to run unconditionally
+            factory: Starts the run; only called by the first caller
+
+        Returns:
+            The result of the shared run
+        """
+        if key is None:
+            return await factory()
+
+        flight = self._join(key, "generate")
+        if flight.task is None:
+            flight.task = asyncio.create_task(factory())
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, flight)
+
+    async def stream(
+        self,
+        key: Optional[Hashable],
+        factory: Callable[[], AsyncIterator[Dict[str, Any]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream events of a run shared by concurrent callers.
+
+        Callers joining late first receive every event already emitted.
+
+        Args:
+            key: Coalescing key, None to run unconditionally
+            factory: Starts the event stream; only called by the first caller
+
+        Yields:
+            Events of the shared run
+        """
+        if key is None:
+            async for event in factory():
+                yield event
+            return
+
+        flight = self._join(key, "stream")
+        if flight.task is None:
+            flight.task = asyncio.create_task(self._pump(key, flight, factory))
+        try:
+            sent = 0
+            while True:
+                changed = flight._changed
+                while sent < len(flight.events):
+                    yield flight.events[sent]
+                    sent += 1
+                if flight.done:
+                    return
+                await changed.wait()
+        finally:
+            self._leave(key, flight)
+
+    def joinable(self, key: Optional[Hashable]) -> bool:
+        """Whether a request with this key would join a running generation"""
+        return key is not None and key in self._flights
+
+    def in_flight(self) -> int:
+        """Number of distinct generations currently shared"""
+        return len(self._flights)
+
+    def _join(self, key: Hashable, kind: str) -> _Flight:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+        else:
+            COALESCED_REQUESTS.inc(kind=kind)
+            logger.info(f"Coalesced {kind} request with a generation in flight")
+        flight.waiters += 1
+        return flight
+
+    def _leave(self, key: Hashable, flight: _Flight) -> None:
+        """Drop a caller, cancelling the run when nobody waits for it anymore"""
+        flight.waiters -= 1
+        if flight.waiters == 0 and flight.task is not None and not flight.task.done():
+            self._forget(key, flight)
+            flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        # Later requests start a new run once this one has finished
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _pump(
+        self,
+        key: Hashable,
+        flight: _Flight,
+        factory: Callable[[], AsyncIterator[Dict[str, Any]]]
+    ) -> None:
+        """Feed the events of the shared stream to its followers"""
+        try:
+            async for event in factory():
+                flight.publish(event)
+        except Exception as e:
+            logger.error(f"Coalesced stream failed: {e}")
+            flight.publish({"event": "error", "detail": str(e)})
+        finally:
+            self._forget(key, flight)
+            flight.done = True
+            flight.publish()
+
+coalescer = Coalescer()
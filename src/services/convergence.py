@@ -0,0 +1,135 @@
+"""
+Convergence policy
+------------------
+Decides when the writer/critic loop can stop before `n_drafts` is
+reached. A run stops as soon as one rule fires:
+
+- max_drafts: the requested number of drafts was written
+- no_progress: the new draft is nearly identical to the previous one
+- critic_approved: the critic approves the draft (verdict or score) and
+  the draft passes the deterministic post constraints
+"""
+
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from enum import Enum
+from typing import List, Optional
+from src.models.config import Configuration
+from src.services.scoring import check_constraints
+
+SCORE_PATTERN = re.compile(r"SCORE\s*:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+VERDICT_PATTERN = re.compile(r"VERDICT\s*:\s*\**\s*(APPROVE|REVISE)", re.IGNORECASE)
+
+class StopReason(str, Enum):
+    """Rule that ended the writer/critic loop"""
+    MAX_DRAFTS = "max_drafts"
+    NO_PROGRESS = "no_progress"
+    CRITIC_APPROVED = "critic_approved"
+
+@dataclass
+class CritiqueVerdict:
+    """
+    Structured part of a critique.
+    
+    Attributes:
+        score: Score out of 10 given by the critic, if any
+        approved: Explicit APPROVE/REVISE verdict, if any
+    """
+    score: Optional[float] = None
+    approved: Optional[bool] = None
+
+def parse_critique(text: str) -> CritiqueVerdict:
+    """
+    Extract the score and verdict lines from a critique.
+    
+    The last occurrence wins, since the prompt asks for them at the end.
+    
+    Args:
+        text: Critique returned by the critic
+        
+    Returns:
+        The parsed verdict, with None for missing parts
+    """
+    verdict = CritiqueVerdict()
+    scores = SCORE_PATTERN.findall(text)
+    if scores:
+        verdict.score = float(scores[-1])
+    verdicts = VERDICT_PATTERN.findall(text)
+    if verdicts:
+        verdict.approved = verdicts[-1].upper() == "APPROVE"
+    return verdict
+
+def drafts_similar(previous: str, current: str, threshold: float) -> bool:
+    """
+    Whether two drafts are at least `threshold` similar (difflib ratio).
+    
+    Args:
+        previous: Previous draft
+        current: New draft
+        threshold: Minimum similarity ratio, from 0 to 1
+        
+    Returns:
+        True when the drafts are similar enough to consider the loop stalled
+    """
+    matcher = SequenceMatcher(None, previous, current, autojunk=False)
+    # The quick ratios are cheap upper bounds of ratio(), so most pairs exit early
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
+
+def check_after_draft(drafts: List[str], n_drafts: int, config: Configuration) -> Optional[StopReason]:
+    """
+    Rules evaluated by the supervisor once a new draft is written.
+    
+    Args:
+        drafts: Drafts written so far, the latest last
+        n_drafts: Maximum number of drafts
+        config: Workflow configuration holding the policy thresholds
+        
+    Returns:
+        The rule ending the loop, or None to continue
+    """
+    if len(drafts) >= n_drafts:
+        return StopReason.MAX_DRAFTS
+    
+    if config.early_exit and len(drafts) >= 2:
+        if drafts_similar(drafts[-2], drafts[-1], config.no_progress_similarity):
+            return StopReason.NO_PROGRESS
+    return None
+
+def check_after_critique(
+    draft: str,
+    critique: str,
+    config: Configuration,
+    constraints_passed: Optional[bool] = None
+) -> Optional[StopReason]:
+    """
+    Rules evaluated once the critic reviewed the latest draft.
+    
+    Args:
+        draft: Latest draft
+        critique: Critic feedback on the draft
+        config: Workflow configuration holding the policy thresholds
+        constraints_passed: Result of the post constraints on the draft
+            when already checked (while the critic was working)
+        
+    Returns:
+        The rule ending the loop, or None to continue
+    """
+    if not config.early_exit:
+        return None
+    
+    verdict = parse_critique(critique)
+    approved = verdict.approved is True or (
+        verdict.approved is None and verdict.score is not None and verdict.score >= config.approve_score
+    )
+    if not approved:
+        return None
+    if constraints_passed is None:
+        constraints_passed = check_constraints(draft).passed
+    if constraints_passed:
+        return StopReason.CRITIC_APPROVED
+    return None
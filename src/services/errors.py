@@ -0,0 +1,23 @@
+"""
+Generation errors
+-----------------
+Errors raised by the workflow stack that the API maps to a status code.
+They live apart from the stack so the API process (and the worker pool,
+which raises them again on the API side) can catch them without loading
+langgraph.
+"""
+
+class GenerationExistsError(ValueError):
+    """
+    Raised when a new run is given the id of an existing generation.
+
+    A new run under that id would mix its drafts with those of the
+    existing one: the generation must be resumed, or another id used.
+
+    Args:
+        generation_id: The id already taken
+    """
+
+    def __init__(self, generation_id: str):
+        super().__init__(f"Generation {generation_id} already exists, resume it or use another id")
+        self.generation_id = generation_id
@@ -0,0 +1,166 @@
+"""
+Health snapshots
+----------------
+Probes must answer in microseconds and never wait on the network, so
+dependency checks (model availability on Ollama, system statistics) run
+in a background task at a fixed interval. Endpoints read the latest
+snapshot and report how old it is; a snapshot older than the staleness
+limit means the refresher itself is stuck and readiness is withdrawn.
+"""
+
+import asyncio
+import platform
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+import psutil
+from src.services.backends.factory import get_backend
+from src.utils.constants import (
+    OLLAMA_MODEL, HEALTH_REFRESH_INTERVAL, HEALTH_STALE_AFTER, HEALTH_PROBE_TIMEOUT
+)
+from src.utils.logger import logger
+
+NOT_READY_INTERVAL = 1.0  # seconds between checks while the model is unavailable
+
+@dataclass
+class HealthSnapshot:
+    """Result of one round of dependency checks"""
+    checked_at: float
+    ollama: Dict[str, Any]
+    system: Dict[str, Any]
+    environment: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ollama_ready(self) -> bool:
+        return self.ollama.get("status") == "healthy"
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the checks ran"""
+        return max(0.0, (now or time.time()) - self.checked_at)
+
+class HealthMonitor:
+    """
+    Refreshes a `HealthSnapshot` in the background.
+
+    Args:
+        interval: Seconds between two refreshes
+        stale_after: Age after which a snapshot is no longer trusted
+        probe_timeout: Seconds allowed for the model listing
+    """
+
+    def __init__(
+        self,
+        interval: float = HEALTH_REFRESH_INTERVAL,
+        stale_after: float = HEALTH_STALE_AFTER,
+        probe_timeout: float = HEALTH_PROBE_TIMEOUT
+    ):
+        self.interval = interval
+        self.stale_after = stale_after
+        self.probe_timeout = probe_timeout
+        self.snapshot: Optional[HealthSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._environment = {
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+        }
+        # First call primes the counters; later calls measure since the previous one
+        psutil.cpu_percent(interval=None)
+
+    async def start(self) -> None:
+        """Refresh in the background, the first snapshot being taken right away"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Cancel the refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self.snapshot is None or self.snapshot.age(now) > self.stale_after
+
+    def is_ready(self) -> bool:
+        """Fresh snapshot and the configured model available"""
+        return not self.is_stale() and self.snapshot.ollama_ready
+
+    async def refresh(self) -> HealthSnapshot:
+        """Run the checks and replace the snapshot"""
+        ollama, system = await asyncio.gather(
+            self._check_ollama(), asyncio.to_thread(self._system_stats)
+        )
+        self.snapshot = HealthSnapshot(time.time(), ollama, system, self._environment)
+        return self.snapshot
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep the previous snapshot, it goes stale if this persists
+                logger.warning(f"Health refresh failed: {e}")
+            # Until Ollama answers (e.g. still starting), check again every second
+            ready = self.snapshot is not None and self.snapshot.ollama_ready
+            await asyncio.sleep(self.interval if ready else min(self.interval, NOT_READY_INTERVAL))
+
+    async def _check_ollama(self) -> Dict[str, Any]:
+        details: Dict[str, Any] = {"status": "healthy", "model": OLLAMA_MODEL, "available": True}
+        model_names: List[str] = []
+        try:
+            model_names = await asyncio.wait_for(get_backend().alist_models(), self.probe_timeout)
+            if OLLAMA_MODEL not in model_names:
+                details.update({
+                    "status": "degraded",
+                    "available": False,
+                    "error": f"Model {OLLAMA_MODEL} not found in available models: {model_names}"
+                })
+        except Exception as e:
+            details.update({"status": "degraded", "available": False, "error": str(e) or type(e).__name__})
+        details["available_models"] = model_names if details["status"] == "healthy" else []
+        return details
+
+    @staticmethod
+    def _system_stats() -> Dict[str, Any]:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        return {
+            # Non-blocking: utilisation since the previous refresh
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "percent": memory.percent
+            },
+            "disk": {
+                "total": disk.total,
+                "free": disk.free,
+                "percent": disk.percent
+            }
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Health payload built from the snapshot, without any I/O.
+
+        Returns:
+            Snapshot content with its age and staleness; the status is
+            "starting" before the first snapshot and "degraded" when stale
+        """
+        now = time.time()
+        if self.snapshot is None:
+            return {"status": "starting", "checked_at": None, "age_seconds": None, "stale": True,
+                    "environment": self._environment, "services": {}, "system": {}}
+        stale = self.is_stale(now)
+        return {
+            "status": "degraded" if stale else "healthy",
+            "checked_at": datetime.fromtimestamp(self.snapshot.checked_at, timezone.utc).isoformat(),
+            "age_seconds": round(self.snapshot.age(now), 3),
+            "stale": stale,
+            "environment": self.snapshot.environment,
+            "services": {"ollama": {**self.snapshot.ollama, **get_backend().stats()}},
+            "system": self.snapshot.system,
+        }
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,278 @@
+"""
+Generation jobs
+---------------
+Job mode for long generations: a job is queued and acknowledged
+immediately, a bounded pool of in-process workers runs it, and clients
+poll or subscribe to its progress. The queue is a pluggable broker with
+priority lanes; when it is full, submissions are rejected so the caller
+can apply backpressure instead of piling up connections.
+"""
+
+import asyncio
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from src.services.workers import astream_post
+from src.utils.constants import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RETENTION, DEFAULT_N_DRAFTS
+from src.utils.logger import logger
+
+class JobStatus(str, Enum):
+    """Lifecycle of a job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted to a full queue.
+    
+    Args:
+        depth: Number of queued jobs
+    """
+
+    def __init__(self, depth: int):
+        super().__init__(f"Job queue is full ({depth} jobs queued)")
+        self.depth = depth
+
+@dataclass
+class Job:
+    """
+    A generation job and its progress.
+    
+    Attributes:
+        id: Job identifier
+        params: Arguments of `astream_linkedin_post`
+        priority: Priority lane ("high", "normal" or "low")
+        status: Current status
+        events: Progress events (edited text, drafts, critiques)
+        result: Final result, same payload as `generate_linkedin_post`
+        error: Failure description
+    """
+    id: str
+    params: Dict[str, Any]
+    priority: str = "normal"
+    status: JobStatus = JobStatus.QUEUED
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record a progress event and wake up subscribers"""
+        self.events.append(event)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the job"""
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": [event for event in self.events if event["event"] not in ("completed", "error")],
+            "result": self.result,
+            "error": self.error,
+        }
+
+class JobBroker:
+    """
+    Queue of job ids waiting for a worker.
+    
+    The in-memory implementation is the local stand-in; a networked broker
+    only needs to implement the same three methods.
+    """
+
+    def put(self, job_id: str, priority: int) -> None:
+        """Enqueue a job id, raising QueueFullError when full"""
+        raise NotImplementedError
+
+    async def get(self) -> str:
+        """Wait for and return the next job id (highest priority first)"""
+        raise NotImplementedError
+
+    def depth(self) -> int:
+        """Number of queued job ids"""
+        raise NotImplementedError
+
+class InMemoryBroker(JobBroker):
+    """
+    Bounded in-process priority queue, FIFO within a priority lane.
+    
+    Args:
+        max_size: Maximum number of queued jobs
+    """
+
+    def __init__(self, max_size: int = JOB_QUEUE_SIZE):
+        self.max_size = max_size
+        self._queue: "asyncio.PriorityQueue[Tuple[int, int, str]]" = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+
+    def put(self, job_id: str, priority: int) -> None:
+        if self._queue.qsize() >= self.max_size:
+            raise QueueFullError(self._queue.qsize())
+        self._queue.put_nowait((priority, next(self._sequence), job_id))
+
+    async def get(self) -> str:
+        _, _, job_id = await self._queue.get()
+        return job_id
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+class JobManager:
+    """
+    Tracks jobs and runs them on a bounded pool of workers.
+    
+    Args:
+        broker: Queue of pending jobs, an in-memory one when omitted
+        workers: Number of jobs run concurrently
+        retention: Number of finished jobs kept for polling
+    """
+
+    def __init__(
+        self,
+        broker: Optional[JobBroker] = None,
+        workers: int = JOB_WORKERS,
+        retention: int = JOB_RETENTION
+    ):
+        self.broker = broker
+        self.workers = workers
+        self.retention = retention
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers; must be called from the running event loop"""
+        if self.broker is None:
+            self.broker = InMemoryBroker()
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        text: str,
+        target_audience: str,
+        n_drafts: int = DEFAULT_N_DRAFTS,
+        priority: str = "normal",
+        **params: Any
+    ) -> Job:
+        """
+        Queue a generation.
+        
+        Args:
+            text: Original text to transform
+            target_audience: Target audience for the post
+            n_drafts: Number of iterations to perform
+            priority: Priority lane ("high", "normal" or "low")
+            **params: Other arguments of `astream_linkedin_post`
+            
+        Returns:
+            The queued job
+            
+        Raises:
+            QueueFullError: When the queue is full
+            ValueError: On an unknown priority
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        job = Job(
+            id=uuid.uuid4().hex,
+            params={"text": text, "target_audience": target_audience, "n_drafts": n_drafts, **params},
+            priority=priority
+        )
+        self.broker.put(job.id, PRIORITIES[priority])
+        self._jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id"""
+        return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self.broker.depth() if self.broker else 0
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Replay the events of a job, then follow it until it finishes.
+        
+        Args:
+            job_id: Job to follow
+            
+        Yields:
+            Progress events, the last one being "completed" or "error"
+        """
+        job = self._jobs[job_id]
+        sent = 0
+        while True:
+            changed = job._changed
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.done:
+                return
+            await changed.wait()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self.broker.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        """Run one job, recording its node progress and result"""
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            async for event in astream_post(**job.params, stream_tokens=False):
+                if event["event"] == "completed":
+                    job.result = {key: value for key, value in event.items() if key != "event"}
+                    job.status = JobStatus.COMPLETED
+                elif event["event"] == "error":
+                    job.error = event["detail"]
+                    job.status = JobStatus.FAILED
+                job.finished_at = time.time() if job.done else None
+                job.publish(event)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            job.finished_at = time.time()
+            job.publish({"event": "error", "detail": str(e)})
+
+    def _evict(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit"""
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+job_manager = JobManager()
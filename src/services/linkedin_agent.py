@@ -1,18 +1,45 @@
-from typing import Dict, Any, Union, List
-from langchain_community.llms import Ollama
-from langchain_core.messages import HumanMessage, SystemMessage
-from src.utils.constants import (
-    OLLAMA_BASE_URL, 
-    OLLAMA_MODEL, 
-    OLLAMA_TEMPERATURE,
-    DEFAULT_N_DRAFTS
-)
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Awaitable, Optional, Union, List
+from src.services.admission import admission
+from src.services.backends.base import LLMBackend
+from src.services.backends.factory import get_backend
+from src.services.cache import ResponseCache, get_response_cache, make_cache_key
+from src.services.convergence import check_after_critique, check_after_draft
+from src.services.scoring import check_constraints, score_draft, select_best_draft
+from src.services.semantic_cache import SemanticCache, SemanticHit, get_semantic_cache
+from src.services.token_budget import chars_per_token, count_tokens, count_prompt_tokens, split_text
+from src.services.usage import LLMUsage
+from src.utils.constants import EDITOR_CHUNK_CONCURRENCY
 from src.utils.logger import logger
-from src.utils.prompts import EDITOR_PROMPT, LINKEDIN_PROMPT, LINKEDIN_CRITIQUE_PROMPT
+from src.utils.metrics import (
+    LLM_CALLS,
+    LLM_CALL_DURATION,
+    LLM_QUEUE_WAIT,
+    LLM_PROMPT_TOKENS,
+    LLM_COMPLETION_TOKENS,
+    LLM_TOKENS_PER_SECOND,
+    SEMANTIC_CACHE_LOOKUPS,
+    span
+)
+from src.utils.token_stream import token_sink
+from src.utils.prompts import FEEDBACK_SECTION, prompt_library
+from src.utils.templates import Prompt
+from src.models.config import Configuration
 from src.models.post import Post
 from src.models.state import OverallState, WorkflowStatus
 from langgraph.graph import END
 
+MIN_CHUNK_TOKENS = 128
+MAX_SUMMARY_ROUNDS = 3
+CHARS_PER_WORD = 6  # average English word and its trailing space
+
+def _part_node(node: str, index: int, parts: int) -> str:
+    """Name of one of several parallel calls of a node, as reported in usage and streams"""
+    return node if parts == 1 else f"{node}[{index}]"
+
 class LinkedInAgent:
     """
     Main agent coordinating different AI experts for LinkedIn post generation.
@@ -24,34 +51,244 @@ class LinkedInAgent:
     - Supervisor: Manages the iteration process
     """
     
-    def __init__(self):
-        """Initialize the agent with Ollama LLM configuration"""
-        self.llm = Ollama(
-            model=OLLAMA_MODEL,
-            temperature=OLLAMA_TEMPERATURE,
-            base_url=OLLAMA_BASE_URL,
-        )
+    def __init__(
+        self,
+        config: Optional[Configuration] = None,
+        cache: Optional[ResponseCache] = None,
+        backend: Optional[LLMBackend] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
+        """
+        Initialize the agent with its LLM configuration
+        
+        Args:
+            config: Model and workflow configuration, defaults are used when omitted
+            cache: LLM response cache, the process-wide one when omitted
+            backend: LLM backend, the process-wide one when omitted
+            semantic_cache: Near-duplicate cache of editor outputs, the
+                process-wide one when omitted
+        """
+        self.config = config or Configuration()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.backend = backend or get_backend()
+        self.semantic_cache = semantic_cache if semantic_cache is not None else get_semantic_cache()
 
-    def _get_prompt_response(self, system_prompt: str, user_prompt: str) -> str:
+    def _get_prompt_response(
+        self,
+        prompt: Prompt,
+        user_prompt: str,
+        node: str = "",
+        use_cache: bool = True,
+        variant: int = 0,
+        usage: Optional[List[Dict[str, Any]]] = None,
+        iteration: int = 0
+    ) -> str:
         """
         Get a response from the LLM using system and user prompts.
         
         Args:
-            system_prompt: Instructions for the AI role
-            user_prompt: Specific task or content to process
+            prompt: Prompt of the AI role, its system instructions are sent
+            user_prompt: Specific task or content to process, rendered from
+                the prompt template
+            node: Name of the calling node, used to label usage
+            use_cache: Whether a cached response may be returned; the fresh
+                response is stored in the cache either way
+            variant: Index of the sample when several responses are drawn
+                for the same prompt, so each is cached separately
+            usage: List receiving the usage record of the call
+            iteration: Draft number the call belongs to, for metrics
             
         Returns:
             Generated response from the LLM
         """
-        return self.llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)
-        ])
+        started_at = time.perf_counter()
+        key = self._cache_key(prompt.system, user_prompt, variant)
+        cached = self._cache_lookup(key, use_cache)
+        if cached is not None:
+            self._record_usage(
+                usage, LLMUsage(
+                    node=node, model=self.config.model, iteration=iteration, prompt=prompt.label, cached=True
+                )
+            )
+            return cached
+        
+        prompt_size = self._prompt_size(prompt.system, user_prompt, node)
+        with span("llm_call", node=node, model=self.config.model, iteration=iteration):
+            result = self.backend.generate(
+                prompt.system, user_prompt, self.config.model, self.config.temperature
+            )
+        self._record_usage(usage, LLMUsage.from_generation_info(
+            node, result.info, started_at, self.config.model, iteration, prompt_size, prompt.label
+        ))
+        
+        self._cache_store(key, result.text)
+        return result.text
+
+    async def _aget_prompt_response(
+        self,
+        prompt: Prompt,
+        user_prompt: str,
+        node: str = "",
+        use_cache: bool = True,
+        variant: int = 0,
+        usage: Optional[List[Dict[str, Any]]] = None,
+        iteration: int = 0
+    ) -> str:
+        """
+        Asynchronous counterpart of `_get_prompt_response`.
+        
+        When a token sink is installed (streaming run), the response is
+        streamed from the LLM and every token is forwarded to the sink.
+        
+        Args:
+            prompt: Prompt of the AI role, its system instructions are sent
+            user_prompt: Specific task or content to process, rendered from
+                the prompt template
+            node: Name of the calling node, attached to streamed tokens
+            use_cache: Whether a cached response may be returned
+            variant: Index of the sample when several responses are drawn
+                for the same prompt
+            usage: List receiving the usage record of the call
+            iteration: Draft number the call belongs to, for metrics
+            
+        Returns:
+            Generated response from the LLM
+        """
+        started_at = time.perf_counter()
+        sink = token_sink.get()
+        key = self._cache_key(prompt.system, user_prompt, variant)
+        cached = self._cache_lookup(key, use_cache)
+        if cached is not None:
+            if sink is not None:
+                sink(node, cached)
+            self._record_usage(
+                usage, LLMUsage(
+                    node=node, model=self.config.model, iteration=iteration, prompt=prompt.label, cached=True
+                )
+            )
+            return cached
+        
+        prompt_size = self._prompt_size(prompt.system, user_prompt, node)
+        with span("llm_call", node=node, model=self.config.model, iteration=iteration):
+            if sink is None:
+                result = await self.backend.agenerate(
+                    prompt.system, user_prompt, self.config.model, self.config.temperature
+                )
+            else:
+                result = await self.backend.astream(
+                    prompt.system, user_prompt, self.config.model, self.config.temperature,
+                    on_token=lambda token: sink(node, token)
+                )
+        self._record_usage(usage, LLMUsage.from_generation_info(
+            node, result.info, started_at, self.config.model, iteration, prompt_size, prompt.label
+        ))
+        
+        self._cache_store(key, result.text)
+        return result.text
+
+    def _prompt(self, name: str, state: OverallState) -> Prompt:
+        """Version of a prompt used by the generation, see `PromptLibrary.select`"""
+        return prompt_library.select(name, state.get("generation_id"))
+
+    def _prompt_size(self, system_prompt: str, user_prompt: str, node: str) -> int:
+        """Estimated tokens of a prompt, warning when it overflows the context window"""
+        size = count_prompt_tokens(system_prompt, user_prompt, self.config.model)
+        if size > self.config.context_tokens:
+            logger.warning(
+                f"Prompt of {node or 'LLM call'} (~{size} tokens) exceeds the "
+                f"{self.config.context_tokens}-token context window and may be truncated"
+            )
+        return size
+
+    def _record_usage(self, usage: Optional[List[Dict[str, Any]]], call_usage: LLMUsage) -> None:
+        """Append the usage of a call to the caller's list, log it and export its metrics"""
+        logger.info(
+            f"LLM call {call_usage.node or '-'}: "
+            f"prompt {call_usage.prompt_tokens} tok/{call_usage.prompt_eval_seconds:.2f}s, "
+            f"generation {call_usage.completion_tokens} tok/{call_usage.eval_seconds:.2f}s"
+            f"{' (cached)' if call_usage.cached else ''}"
+        )
+        if usage is not None:
+            usage.append(call_usage.to_dict())
+        
+        # Parallel calls of a node ("editor[3]") share its label
+        labels = {"node": call_usage.node.split("[", 1)[0], "model": call_usage.model}
+        LLM_CALLS.inc(cached=str(call_usage.cached).lower(), prompt=call_usage.prompt, **labels)
+        if call_usage.cached:
+            return
+        admission.observe_llm_call(call_usage.queue_seconds)
+        LLM_CALL_DURATION.observe(call_usage.wall_seconds, iteration=str(call_usage.iteration), **labels)
+        LLM_QUEUE_WAIT.observe(call_usage.queue_seconds, **labels)
+        LLM_PROMPT_TOKENS.observe(call_usage.prompt_tokens, **labels)
+        LLM_COMPLETION_TOKENS.observe(call_usage.completion_tokens, **labels)
+        if call_usage.tokens_per_second is not None:
+            LLM_TOKENS_PER_SECOND.observe(call_usage.tokens_per_second, **labels)
+
+    def _cache_key(self, system_prompt: str, user_prompt: str, variant: int = 0) -> Optional[str]:
+        """Content address of an LLM call, None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return make_cache_key(
+            self.config.model, self.config.temperature, system_prompt, user_prompt, variant
+        )
+
+    def _cache_lookup(self, key: Optional[str], use_cache: bool) -> Optional[str]:
+        """Return the cached response for a key, if allowed and present"""
+        if key is None or not use_cache:
+            return None
+        return self.cache.get(key)
+
+    def _cache_store(self, key: Optional[str], response: str) -> None:
+        """Store a fresh response in the cache"""
+        if key is not None and response:
+            self.cache.set(key, response)
 
     def editor_node(self, state: OverallState) -> Dict[str, Any]:
         """
         Editor node: improves text clarity and structure.
         
+        A source text too long for one prompt is split into chunks edited
+        separately, then joined. An edited text above the token budget is
+        also condensed into the summary used by the writer/critic loop.
+        A near-duplicate of a text already edited reuses its edit (see
+        `SemanticCache`).
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            Updated state with edited text and initialized post
+        """
+        logger.info("Entering editor_node")
+        usage = []
+        use_cache = state.get("use_cache", True)
+        prompt = self._prompt("editor", state)
+        hit = self._semantic_lookup(prompt, state, usage)
+        if hit is not None:
+            summary = hit.summary
+            if summary is None and self._over_budget(hit.edit_text):
+                summary = self._summarize(self._prompt("editor_summary", state), hit.edit_text, use_cache, usage)
+            return self._editor_update(state, hit.edit_text, summary, usage)
+        chunks = self._split_source(prompt, state["user_text"])
+        edit_text = "\n\n".join(
+            self._get_prompt_response(
+                prompt, self._build_editor_prompt(prompt, chunk, i, len(chunks)),
+                node=_part_node("editor", i, len(chunks)), use_cache=use_cache, usage=usage
+            )
+            for i, chunk in enumerate(chunks)
+        )
+        summary = None
+        if self._over_budget(edit_text):
+            summary = self._summarize(self._prompt("editor_summary", state), edit_text, use_cache, usage)
+        self._semantic_store(prompt, state, edit_text, summary)
+        return self._editor_update(state, edit_text, summary, usage)
+
+    async def aeditor_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Asynchronous editor node, see `editor_node`.
+        
+        Chunks of a long source text are edited concurrently.
+        
         Args:
             state: Current workflow state
             
@@ -59,28 +296,214 @@ class LinkedInAgent:
             Updated state with edited text and initialized post
         """
         logger.info("Entering editor_node")
+        usage = []
+        use_cache = state.get("use_cache", True)
+        prompt = self._prompt("editor", state)
+        hit = self._semantic_lookup(prompt, state, usage)
+        if hit is not None:
+            summary = hit.summary
+            if summary is None and self._over_budget(hit.edit_text):
+                summary = await self._asummarize(self._prompt("editor_summary", state), hit.edit_text, use_cache, usage)
+            return self._editor_update(state, hit.edit_text, summary, usage)
+        chunks = self._split_source(prompt, state["user_text"])
+        edited = await self._agather_chunks([
+            self._aget_prompt_response(
+                prompt, self._build_editor_prompt(prompt, chunk, i, len(chunks)),
+                node=_part_node("editor", i, len(chunks)), use_cache=use_cache, usage=usage
+            )
+            for i, chunk in enumerate(chunks)
+        ])
+        edit_text = "\n\n".join(edited)
+        summary = None
+        if self._over_budget(edit_text):
+            summary = await self._asummarize(self._prompt("editor_summary", state), edit_text, use_cache, usage)
+        self._semantic_store(prompt, state, edit_text, summary)
+        return self._editor_update(state, edit_text, summary, usage)
+
+    def _split_source(self, prompt: Prompt, text: str) -> List[str]:
+        """
+        Split the source text into chunks the editor handles in one call.
+        
+        The edited chunk comes back about as long as the chunk, so a chunk
+        gets half of the context left once the instructions are counted.
+        """
+        available = self.config.context_tokens - count_prompt_tokens(prompt.system, "", self.config.model)
+        chunks = split_text(text, max(MIN_CHUNK_TOKENS, available // 2), self.config.model)
+        if len(chunks) > 1:
+            logger.info(f"Source text split into {len(chunks)} chunks")
+        return chunks
+
+    def _over_budget(self, text: str) -> bool:
+        """Whether a text is too long to be embedded in every loop prompt"""
+        return count_tokens(text, self.config.model) > self.config.edit_text_budget
+
+    def _summary_parts(self, prompt: Prompt, text: str) -> List[str]:
+        """Parts of a text summarized in one call each, leaving room for the summary"""
+        available = self.config.context_tokens - count_prompt_tokens(prompt.system, "", self.config.model)
+        return split_text(
+            text, max(MIN_CHUNK_TOKENS, available - self.config.edit_text_budget), self.config.model
+        )
+
+    def _summary_words(self, parts: int) -> int:
+        """Word limit given to the summary of one part, so the joined summaries fit the budget"""
+        words = self.config.edit_text_budget * chars_per_token(self.config.model) / CHARS_PER_WORD
+        return max(1, int(words / parts))
+
+    def _summarize(self, prompt: Prompt, text: str, use_cache: bool, usage: List[Dict[str, Any]]) -> str:
+        """
+        Condense the edited text to the loop token budget.
+        
+        A text that does not fit one summary prompt is summarized part by
+        part and the joined summaries are condensed again if needed.
         
-        prompt = f"""
-            text:
-            ```
-            {state["user_text"]}
-            ```
-        """.strip()
+        Args:
+            prompt: Summary prompt of the generation
+            text: Edited text
+            use_cache: Whether cached responses may be returned
+            usage: List receiving the usage records of the calls
+            
+        Returns:
+            The summary
+        """
+        for _ in range(MAX_SUMMARY_ROUNDS):
+            parts = self._summary_parts(prompt, text)
+            text = "\n\n".join(
+                self._get_prompt_response(
+                    prompt, self._build_summary_prompt(prompt, part, self._summary_words(len(parts))),
+                    node=_part_node("editor_summary", i, len(parts)), use_cache=use_cache, usage=usage
+                )
+                for i, part in enumerate(parts)
+            )
+            if len(parts) == 1 or not self._over_budget(text):
+                break
+        return text
+
+    async def _asummarize(
+        self,
+        prompt: Prompt,
+        text: str,
+        use_cache: bool,
+        usage: List[Dict[str, Any]]
+    ) -> str:
+        """Asynchronous counterpart of `_summarize`, parts are summarized concurrently"""
+        for _ in range(MAX_SUMMARY_ROUNDS):
+            parts = self._summary_parts(prompt, text)
+            summaries = await self._agather_chunks([
+                self._aget_prompt_response(
+                    prompt, self._build_summary_prompt(prompt, part, self._summary_words(len(parts))),
+                    node=_part_node("editor_summary", i, len(parts)), use_cache=use_cache, usage=usage
+                )
+                for i, part in enumerate(parts)
+            ])
+            text = "\n\n".join(summaries)
+            if len(parts) == 1 or not self._over_budget(text):
+                break
+        return text
+
+    async def _agather_chunks(self, calls: List[Awaitable[str]]) -> List[str]:
+        """Await LLM calls over chunks of a text, at most `EDITOR_CHUNK_CONCURRENCY` at a time"""
+        semaphore = asyncio.Semaphore(EDITOR_CHUNK_CONCURRENCY)
+
+        async def limited(call: Awaitable[str]) -> str:
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*[limited(call) for call in calls])
+
+    def _build_editor_prompt(self, prompt: Prompt, text: str, part: int = 0, parts: int = 1) -> str:
+        """
+        Build the prompt for the editor.
         
-        response = self._get_prompt_response(EDITOR_PROMPT, prompt)
-        logger.info("Editor completed initial edit")
+        Args:
+            prompt: Editor prompt of the generation
+            text: Source text, or one chunk of it
+            part: Index of the chunk
+            parts: Number of chunks of the source text
+            
+        Returns:
+            Complete prompt for the editor
+        """
+        header = "text:" if parts == 1 else (
+            f"text (part {part + 1} of {parts} of a longer document, edit this part only):"
+        )
+        return prompt.user.render(header=header, text=text)
+
+    def _build_summary_prompt(self, prompt: Prompt, text: str, max_words: int) -> str:
+        """
+        Build the prompt condensing an edited text.
         
+        Args:
+            prompt: Summary prompt of the generation
+            text: Edited text, or one part of it
+            max_words: Length limit of the summary
+            
+        Returns:
+            Complete prompt for the summary
+        """
+        return prompt.user.render(max_words=max_words, text=text)
+
+    def _semantic_namespace(self, prompt: Prompt) -> str:
+        """Partition of the semantic cache: edits are only reused under the same model and prompt"""
+        return f"{self.config.model}\0{self.config.temperature!r}\0{prompt.label}"
+
+    def _semantic_lookup(
+        self,
+        prompt: Prompt,
+        state: OverallState,
+        usage: List[Dict[str, Any]]
+    ) -> Optional[SemanticHit]:
+        """Edit of a near-duplicate source text, recorded as a cached editor call"""
+        if self.semantic_cache is None or not state.get("use_cache", True):
+            return None
+        hit = self.semantic_cache.lookup(self._semantic_namespace(prompt), state["user_text"])
+        if hit is None:
+            SEMANTIC_CACHE_LOOKUPS.inc(result="miss")
+            return None
+        SEMANTIC_CACHE_LOOKUPS.inc(result="patched" if hit.patched else "hit")
+        logger.info(
+            f"Editor output reused from a near-duplicate text "
+            f"(similarity {hit.similarity:.3f}{', patched' if hit.patched else ''})"
+        )
+        self._record_usage(usage, LLMUsage(
+            node="editor", model=self.config.model, prompt=prompt.label, cached=True
+        ))
+        return hit
+
+    def _semantic_store(
+        self,
+        prompt: Prompt,
+        state: OverallState,
+        edit_text: str,
+        summary: Optional[str]
+    ) -> None:
+        """Index a fresh edit for later near-duplicates"""
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(self._semantic_namespace(prompt), state["user_text"], edit_text, summary)
+
+    def _editor_update(
+        self,
+        state: OverallState,
+        response: str,
+        summary: Optional[str],
+        usage: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the state update produced by the editor"""
+        logger.info("Editor completed initial edit" + (" (condensed for the loop)" if summary else ""))
         return {
             "edit_text": response,
-            "linkedin_post": Post().model_dump(),
-            "n_drafts": DEFAULT_N_DRAFTS,
-            "workflow_status": WorkflowStatus.STARTING
+            "edit_summary": summary,
+            "n_drafts": state.get("n_drafts") or self.config.n_drafts,
+            "workflow_status": WorkflowStatus.STARTING,
+            "llm_usage": usage
         }
 
     def linkedin_writer_node(self, state: OverallState) -> Dict[str, Any]:
         """
         Writer node: creates a LinkedIn-optimized version of the post.
         
+        Candidates are written concurrently in threads, each running in a
+        copy of the node's context (host affinity, token sink).
+        
         Args:
             state: Current workflow state
             
@@ -88,16 +511,91 @@ class LinkedInAgent:
             Updated state with new post draft
         """
         logger.info("Entering linkedin_writer_node")
-        post = Post(**state["linkedin_post"])
+        post = Post.from_state(state)
         
-        feedback_section = self._build_feedback_section(post)
-        prompt = self._build_writer_prompt(state, feedback_section)
+        prompt = self._prompt("linkedin_writer", state)
+        user_prompt = self._build_writer_prompt(prompt, state, self._build_feedback_section(post))
         
-        response = self._get_prompt_response(LINKEDIN_PROMPT, prompt)
-        logger.info("LinkedIn writer generated new version")
+        n_candidates = self._n_candidates(state)
+        usage = []
+
+        def write(i: int) -> str:
+            return self._get_prompt_response(
+                prompt, user_prompt,
+                node=_part_node("linkedin_writer", i, n_candidates),
+                use_cache=state.get("use_cache", True),
+                variant=i,
+                usage=usage,
+                iteration=len(post.drafts) + 1
+            )
+
+        if n_candidates == 1:
+            candidates = [write(0)]
+        else:
+            contexts = [contextvars.copy_context() for _ in range(n_candidates)]
+            with ThreadPoolExecutor(max_workers=n_candidates) as executor:
+                candidates = list(executor.map(
+                    lambda context, i: context.run(write, i), contexts, range(n_candidates)
+                ))
+        return self._writer_update(self._select_candidate(candidates), usage)
+
+    async def alinkedin_writer_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Asynchronous writer node, see `linkedin_writer_node`.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            Updated state with new post draft
+        """
+        logger.info("Entering linkedin_writer_node")
+        post = Post.from_state(state)
+        
+        prompt = self._prompt("linkedin_writer", state)
+        user_prompt = self._build_writer_prompt(prompt, state, self._build_feedback_section(post))
         
-        post.add_draft(response)
-        return {"linkedin_post": post.model_dump()}
+        n_candidates = self._n_candidates(state)
+        usage = []
+        candidates = await asyncio.gather(*[
+            self._aget_prompt_response(
+                prompt, user_prompt,
+                node=_part_node("linkedin_writer", i, n_candidates),
+                use_cache=state.get("use_cache", True),
+                variant=i,
+                usage=usage,
+                iteration=len(post.drafts) + 1
+            )
+            for i in range(n_candidates)
+        ])
+        return self._writer_update(self._select_candidate(candidates), usage)
+
+    def _n_candidates(self, state: OverallState) -> int:
+        """Number of candidate drafts the writer produces per round"""
+        return max(1, state.get("n_candidates") or self.config.n_candidates)
+
+    def _select_candidate(self, candidates: List[str]) -> str:
+        """
+        Pick the draft carried forward among the writer candidates.
+        
+        Args:
+            candidates: Candidate drafts of this round
+            
+        Returns:
+            The best scoring candidate
+        """
+        if len(candidates) == 1:
+            return candidates[0]
+        
+        best = select_best_draft(candidates)
+        scores = ", ".join(f"{score_draft(c):.2f}" for c in candidates)
+        logger.info(f"Selected candidate {best + 1}/{len(candidates)} (scores: {scores})")
+        return candidates[best]
+
+    def _writer_update(self, response: str, usage: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the state update produced by the writer: the new draft only"""
+        logger.info("LinkedIn writer generated new version")
+        return {"drafts": [response], "llm_usage": usage}
 
     def _build_feedback_section(self, post: Post) -> str:
         """
@@ -109,75 +607,131 @@ class LinkedInAgent:
         Returns:
             Formatted feedback section or empty string if no feedback
         """
-        if not post.feedback or not post.get_latest_draft():
+        feedback = post.get_latest_feedback()
+        if not feedback or not post.get_latest_draft():
             return ""
         
-        return f"""
-        Previous version and feedback:
-        ```
-        Post: {post.get_latest_draft()}
-        Feedback: {post.feedback}
-        ```
-        """.strip()
+        return FEEDBACK_SECTION.render(draft=post.get_latest_draft(), feedback=feedback)
+
+    def _source_text(self, state: OverallState) -> str:
+        """Edited text embedded in the writer and critic prompts, condensed when over budget"""
+        return state.get("edit_summary") or state["edit_text"]
 
-    def _build_writer_prompt(self, state: OverallState, feedback_section: str) -> str:
+    def _build_writer_prompt(self, prompt: Prompt, state: OverallState, feedback_section: str) -> str:
         """
         Build the complete prompt for the LinkedIn writer.
         
         Args:
+            prompt: Writer prompt of the generation
             state: Current workflow state
             feedback_section: Formatted feedback from critic
             
         Returns:
             Complete prompt for the writer
         """
-        return f"""
-            text:
-            ```
-            {state["edit_text"]}
-            ```
-            
-            {feedback_section}
-            
-            Target audience: {state["target_audience"]}
-            
-            Write only the post content.
-        """.strip()
+        return prompt.user.render(
+            source=self._source_text(state),
+            target_audience=state["target_audience"],
+            feedback=feedback_section
+        )
 
-    def critique_linkedin_node(self, state: OverallState) -> Dict[str, Any]:
+    def critique_linkedin_node(
+        self,
+        state: OverallState,
+        constraints_passed: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
         Critic node: analyzes and provides feedback on the post.
         
         Args:
             state: Current workflow state
+            constraints_passed: Result of the post constraints on the
+                latest draft when already checked (pipelined round)
             
         Returns:
             Updated state with critic's feedback
         """
         logger.info("Entering critique_linkedin_node")
-        post = Post(**state["linkedin_post"])
+        post = Post.from_state(state)
         
-        prompt = f"""
-            Original text:
-            ```
-            {state["edit_text"]}
-            ```
+        prompt = self._prompt("linkedin_critique", state)
+        user_prompt = self._build_critique_prompt(prompt, state, post)
+        usage = []
+        response = self._get_prompt_response(
+            prompt, user_prompt,
+            node="linkedin_critique", use_cache=state.get("use_cache", True), usage=usage,
+            iteration=len(post.drafts)
+        )
+        return self._critique_update(state, post, response, usage, constraints_passed)
+
+    async def acritique_linkedin_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Asynchronous critic node, see `critique_linkedin_node`.
+        
+        Args:
+            state: Current workflow state
             
-            Current LinkedIn post:
-            ```
-            {post.get_latest_draft()}
-            ```
+        Returns:
+            Updated state with critic's feedback
+        """
+        logger.info("Entering critique_linkedin_node")
+        post = Post.from_state(state)
+        
+        prompt = self._prompt("linkedin_critique", state)
+        user_prompt = self._build_critique_prompt(prompt, state, post)
+        usage = []
+        response = await self._aget_prompt_response(
+            prompt, user_prompt,
+            node="linkedin_critique", use_cache=state.get("use_cache", True), usage=usage,
+            iteration=len(post.drafts)
+        )
+        return self._critique_update(state, post, response, usage)
+
+    def _build_critique_prompt(self, prompt: Prompt, state: OverallState, post: Post) -> str:
+        """
+        Build the prompt for the critic.
+        
+        Args:
+            prompt: Critique prompt of the generation
+            state: Current workflow state
+            post: Current post with drafts and feedback
             
-            Target audience: {state["target_audience"]}
-        """.strip()
+        Returns:
+            Complete prompt for the critic
+        """
+        return prompt.user.render(
+            source=self._source_text(state),
+            target_audience=state["target_audience"],
+            draft=post.get_latest_draft()
+        )
 
-        response = self._get_prompt_response(LINKEDIN_CRITIQUE_PROMPT, prompt)
+    def _critique_update(
+        self,
+        state: OverallState,
+        post: Post,
+        response: str,
+        usage: List[Dict[str, Any]],
+        constraints_passed: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the state update produced by the critic.
+        
+        Ends the workflow when the convergence policy accepts the critique
+        as an approval of the latest draft.
+        """
         logger.info("LinkedIn critique completed")
+        update = {"feedback": [response], "llm_usage": usage}
         
-        post.feedback = response
-        return {"linkedin_post": post.model_dump()}
+        stop_reason = check_after_critique(
+            post.get_latest_draft() or "", response, self.config, constraints_passed
+        )
+        if stop_reason is not None:
+            logger.info(f"Workflow completed early: {stop_reason.value}")
+            update["workflow_status"] = WorkflowStatus.COMPLETED
+            update["stop_reason"] = stop_reason.value
+        return update
 
-    def supervisor_node(self, state: OverallState) -> OverallState:
+    def supervisor_node(self, state: OverallState) -> Dict[str, Any]:
         """
         Supervisor node: manages workflow state and iterations.
         
@@ -185,16 +739,114 @@ class LinkedInAgent:
             state: Current workflow state
             
         Returns:
-            Updated workflow state
+            Updated workflow status (and stop reason when completed)
         """
         logger.info("Entering supervisor_node")
-        post = Post(**state["linkedin_post"])
+        post = Post.from_state(state)
         
-        if len(post.drafts) >= state["n_drafts"]:
-            state["workflow_status"] = WorkflowStatus.COMPLETED
-        else:
-            state["workflow_status"] = WorkflowStatus.IN_PROGRESS
-        return state
+        stop_reason = check_after_draft(post.drafts, state["n_drafts"], self.config)
+        if stop_reason is not None:
+            logger.info(f"Workflow completed: {stop_reason.value}")
+            return {"workflow_status": WorkflowStatus.COMPLETED, "stop_reason": stop_reason.value}
+        return {"workflow_status": WorkflowStatus.IN_PROGRESS}
+
+    async def asupervisor_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Asynchronous supervisor node, see `supervisor_node`.
+        
+        The supervisor does no I/O; this variant only avoids handing the
+        node to a thread pool when the workflow runs asynchronously.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            Updated workflow status (and stop reason when completed)
+        """
+        return self.supervisor_node(state)
+
+    def draft_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Pipelined round: writes a draft, decides and reviews it in one node.
+        
+        Replaces the writer, supervisor and critic nodes when the workflow
+        is pipelined, so a round is a single graph step (and checkpoint)
+        instead of three. The critique is skipped when the supervisor ends
+        the loop on the new draft.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            Updated state with the new draft, its critique when the loop
+            continues, and the workflow status
+        """
+        written = self.linkedin_writer_node(state)
+        drafted = self._with_draft(state, written)
+        decision = self.supervisor_node(drafted)
+        if decision["workflow_status"] == WorkflowStatus.COMPLETED:
+            return self._merge_round(written, decision)
+        constraints_passed = check_constraints(drafted["drafts"][-1]).passed
+        review = self.critique_linkedin_node(drafted, constraints_passed)
+        return self._merge_round(written, decision, review)
+
+    async def adraft_node(self, state: OverallState) -> Dict[str, Any]:
+        """
+        Asynchronous pipelined round, see `draft_node`.
+        
+        The critique request is sent as soon as the draft is written; the
+        supervisor decision (draft similarity) and the deterministic post
+        checks then run in a worker thread while it is in flight, and the
+        critique is cancelled if the supervisor ends the loop. The next
+        writer call cannot overlap the critique: its prompt carries the
+        critique.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            Updated state with the new draft, its critique when the loop
+            continues, and the workflow status
+        """
+        written = await self.alinkedin_writer_node(state)
+        drafted = self._with_draft(state, written)
+        post = Post.from_state(drafted)
+        
+        logger.info("Entering critique_linkedin_node")
+        prompt = self._prompt("linkedin_critique", drafted)
+        usage = []
+        critique = asyncio.create_task(self._aget_prompt_response(
+            prompt, self._build_critique_prompt(prompt, drafted, post),
+            node="linkedin_critique", use_cache=state.get("use_cache", True), usage=usage,
+            iteration=len(post.drafts)
+        ))
+        try:
+            # Let the critique task send its request before deciding
+            await asyncio.sleep(0)
+            decision, constraints = await asyncio.to_thread(
+                lambda: (self.supervisor_node(drafted), check_constraints(post.get_latest_draft()))
+            )
+            if decision["workflow_status"] == WorkflowStatus.COMPLETED:
+                return self._merge_round(written, decision)
+            review = self._critique_update(drafted, post, await critique, usage, constraints.passed)
+            return self._merge_round(written, decision, review)
+        finally:
+            if not critique.done():
+                logger.info("Speculative critique cancelled")
+                critique.cancel()
+                await asyncio.gather(critique, return_exceptions=True)
+
+    def _with_draft(self, state: OverallState, written: Dict[str, Any]) -> OverallState:
+        """State seen by the rest of a pipelined round: the new draft appended"""
+        return {**state, "drafts": [*(state.get("drafts") or []), *written["drafts"]]}
+
+    def _merge_round(self, *updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the updates of a pipelined round, usage records appended"""
+        merged: Dict[str, Any] = {"llm_usage": []}
+        for update in updates:
+            for key, value in update.items():
+                merged[key] = merged[key] + value if key == "llm_usage" else value
+        return merged
 
     def should_continue(self, state: OverallState) -> Union[str, List[str]]:
         """
@@ -206,10 +858,7 @@ class LinkedInAgent:
         Returns:
             END if workflow is complete, or next node(s) to execute
         """
-        post = Post(**state["linkedin_post"])
-        n_drafts = state["n_drafts"]
-        
-        if len(post.drafts) >= n_drafts:
+        if state["workflow_status"] == WorkflowStatus.COMPLETED:
             logger.info("Workflow completed")
             return END
         
@@ -226,7 +875,7 @@ class LinkedInAgent:
         Returns:
             The final optimized LinkedIn post
         """
-        post = Post(**state["linkedin_post"])
+        post = Post.from_state(state)
         return post.get_latest_draft() or ""
 
     def get_all_versions(self, state: OverallState) -> List[Dict[str, str]]:
@@ -239,14 +888,8 @@ class LinkedInAgent:
         Returns:
             List of dictionaries containing each version and its feedback
         """
-        post = Post(**state["linkedin_post"])
-        versions = []
-        
-        for i, draft in enumerate(post.drafts):
-            versions.append({
-                "version": i + 1,
-                "content": draft,
-                "feedback": post.feedback if i == len(post.drafts) - 1 else None
-            })
-            
-        return versions    
\ No newline at end of file
+        post = Post.from_state(state)
+        return [
+            {"version": i + 1, "content": draft, "feedback": post.get_feedback(i)}
+            for i, draft in enumerate(post.drafts)
+        ]    
\ No newline at end of file
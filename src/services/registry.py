@@ -0,0 +1,135 @@
+"""
+Workflow registry
+-----------------
+Process-wide cache of compiled workflows. Building the graph creates a
+LinkedInAgent (and its LLM client) and compiles the StateGraph, which is
+too expensive to repeat on every request. Each configuration is built
+once and the compiled workflow is shared by all requests.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional
+from src.models.config import Configuration
+from src.services.checkpoint import get_checkpointer
+from src.services.linkedin_agent import LinkedInAgent
+from src.workflow import create_linkedin_graph, editor_step
+from src.utils.logger import logger
+
+@dataclass
+class WorkflowEntry:
+    """
+    A compiled workflow and the agent backing its nodes.
+
+    Attributes:
+        config: Configuration the workflow was built for
+        agent: Agent shared by the workflow nodes and result readers
+        workflow: Compiled LangGraph workflow
+        editor: Editor node alone, the pass shared by the audiences of a
+            multi-audience generation
+        build_seconds: Time spent creating the agent and the graph
+        compile_seconds: Time spent compiling the graph
+        created_at: Unix timestamp of the build
+        uses: Number of times the entry was handed out
+    """
+    config: Configuration
+    agent: LinkedInAgent
+    workflow: Any
+    editor: Any
+    build_seconds: float
+    compile_seconds: float
+    created_at: float = field(default_factory=time.time)
+    uses: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the entry metadata (without the workflow itself)"""
+        return {
+            "config": self.config.model_dump(),
+            "build_seconds": round(self.build_seconds, 6),
+            "compile_seconds": round(self.compile_seconds, 6),
+            "created_at": self.created_at,
+            "uses": self.uses,
+        }
+
+class WorkflowRegistry:
+    """
+    Thread-safe registry compiling each workflow variant exactly once.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Configuration, WorkflowEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, config: Optional[Configuration] = None) -> WorkflowEntry:
+        """
+        Get the compiled workflow for a configuration, building it if needed.
+
+        Args:
+            config: Workflow configuration, defaults are used when omitted
+
+        Returns:
+            The registry entry for this configuration
+        """
+        config = config or Configuration()
+        entry = self._entries.get(config)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(config)
+                if entry is None:
+                    entry = self._build(config)
+                    self._entries[config] = entry
+        entry.uses += 1
+        return entry
+
+    def warm_up(self, configs: Optional[Iterable[Configuration]] = None) -> List[WorkflowEntry]:
+        """
+        Eagerly build workflows, typically from an application startup hook.
+
+        Args:
+            configs: Configurations to build, the default one when omitted
+
+        Returns:
+            The registry entries that were built or already present
+        """
+        configs = list(configs) if configs else [Configuration()]
+        entries = []
+        for config in configs:
+            entry = self.get(config)
+            entry.uses -= 1
+            entries.append(entry)
+        return entries
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Build/compile timings and usage of every registered workflow"""
+        return [entry.to_dict() for entry in list(self._entries.values())]
+
+    def clear(self) -> None:
+        """Drop every compiled workflow"""
+        with self._lock:
+            self._entries.clear()
+
+    def _build(self, config: Configuration) -> WorkflowEntry:
+        """Create the agent, build the graph and compile it, timing each step"""
+        start = time.perf_counter()
+        agent = LinkedInAgent(config)
+        graph = create_linkedin_graph(agent)
+        built = time.perf_counter()
+        workflow = graph.compile(checkpointer=get_checkpointer())
+        compiled = time.perf_counter()
+
+        entry = WorkflowEntry(
+            config=config,
+            agent=agent,
+            workflow=workflow,
+            editor=editor_step(agent),
+            build_seconds=built - start,
+            compile_seconds=compiled - built,
+        )
+        logger.info(
+            f"Workflow built for model={config.model} temperature={config.temperature} "
+            f"(build {entry.build_seconds * 1000:.1f} ms, compile {entry.compile_seconds * 1000:.1f} ms)"
+        )
+        return entry
+
+registry = WorkflowRegistry()
@@ -0,0 +1,95 @@
+"""
+Draft scoring
+-------------
+Cheap, deterministic checks of a draft against the LinkedIn post
+constraints defined in `src.utils.constants`. Used to pick the best of
+several candidate drafts without an extra LLM call.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence
+from src.utils.constants import MAX_POST_LENGTH, MIN_HASHTAGS, MAX_HASHTAGS
+
+HASHTAG_PATTERN = re.compile(r"(?<!\w)#\w+")
+
+@dataclass
+class ConstraintReport:
+    """
+    Result of checking a draft against the post constraints.
+    
+    Attributes:
+        length: Number of characters of the draft
+        hashtags: Number of hashtags in the draft
+        violations: Human readable list of violated constraints
+    """
+    length: int
+    hashtags: int
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        """Whether the draft satisfies every constraint"""
+        return not self.violations
+
+def count_hashtags(text: str) -> int:
+    """Count the hashtags of a text"""
+    return len(HASHTAG_PATTERN.findall(text))
+
+def check_constraints(text: str) -> ConstraintReport:
+    """
+    Check a draft against MAX_POST_LENGTH and the hashtag limits.
+    
+    Args:
+        text: Draft to check
+        
+    Returns:
+        Report of the draft length, hashtag count and violations
+    """
+    report = ConstraintReport(length=len(text), hashtags=count_hashtags(text))
+    if report.length > MAX_POST_LENGTH:
+        report.violations.append(f"length {report.length} > {MAX_POST_LENGTH}")
+    if report.hashtags < MIN_HASHTAGS:
+        report.violations.append(f"hashtags {report.hashtags} < {MIN_HASHTAGS}")
+    if report.hashtags > MAX_HASHTAGS:
+        report.violations.append(f"hashtags {report.hashtags} > {MAX_HASHTAGS}")
+    return report
+
+def score_draft(text: str) -> float:
+    """
+    Score a draft between 0 (unusable) and 1 (satisfies every constraint).
+    
+    Penalties grow with the distance to each constraint, so among drafts
+    violating the same rule the closest one scores higher.
+    
+    Args:
+        text: Draft to score
+        
+    Returns:
+        Score of the draft
+    """
+    if not text.strip():
+        return 0.0
+    
+    report = check_constraints(text)
+    score = 1.0
+    if report.length > MAX_POST_LENGTH:
+        score -= min(0.5, 0.5 * (report.length - MAX_POST_LENGTH) / MAX_POST_LENGTH)
+    if report.hashtags < MIN_HASHTAGS:
+        score -= 0.1 * (MIN_HASHTAGS - report.hashtags)
+    elif report.hashtags > MAX_HASHTAGS:
+        score -= 0.1 * (report.hashtags - MAX_HASHTAGS)
+    return max(0.0, score)
+
+def select_best_draft(candidates: Sequence[str]) -> int:
+    """
+    Pick the best candidate draft.
+    
+    Args:
+        candidates: Candidate drafts
+        
+    Returns:
+        Index of the highest scoring candidate (the first one on ties)
+    """
+    scores = [score_draft(candidate) for candidate in candidates]
+    return max(range(len(candidates)), key=lambda i: (scores[i], -i))
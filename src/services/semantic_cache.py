@@ -0,0 +1,377 @@
+"""
+Semantic editor cache
+---------------------
+Users often resubmit slightly different versions of the same text (a
+fixed typo, another date, a product renamed). The response cache only
+matches identical prompts, so each version costs a full editor call.
+
+This cache indexes the source texts already edited as hashed n-gram
+vectors (word unigrams and bigrams, character trigrams) and reuses the
+edited text of the most similar one above a cosine similarity threshold:
+
+- as is when both sources contain the same words (case and whitespace
+  aside);
+- patched when the sources only differ by a few replaced words, which are
+  replaced the same way in the edited text;
+- not at all when words were added or removed, or a replaced phrase does
+  not appear exactly once in the source and in the edited text (which
+  occurrence to change would be a guess): the editor runs and its output
+  is indexed in turn.
+
+Similarities are computed with NumPy when it is installed, and in pure
+Python otherwise. The index is bounded (LRU eviction) and can be
+persisted to a sqlite file, reloaded at startup.
+"""
+
+import difflib
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from src.utils.constants import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_PATH
+)
+from src.utils.logger import logger
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+VECTOR_DIMENSIONS = 1024
+CHAR_NGRAM = 3
+MAX_PATCH_WORDS = 3  # longest run of words replaced by a patch
+MAX_CANDIDATES = 3  # most similar entries tried per lookup
+
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def normalize(text: str) -> str:
+    """Case and whitespace insensitive form of a text"""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def vectorize(text: str, dimensions: int = VECTOR_DIMENSIONS) -> Dict[int, float]:
+    """
+    Hashed n-gram vector of a text, L2-normalized.
+
+    Features are hashed with CRC32 (stable across processes, unlike
+    `hash`) into `dimensions` buckets, with a sign drawn from the hash so
+    that collisions cancel out on average.
+
+    Returns:
+        Non-zero coordinates by bucket
+    """
+    text = normalize(text)
+    words = re.findall(r"\w+", text)
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    features.update(f"#{text[i:i + CHAR_NGRAM]}" for i in range(len(text) - CHAR_NGRAM + 1))
+
+    vector: Dict[int, float] = {}
+    for feature, count in features.items():
+        digest = zlib.crc32(feature.encode("utf-8"))
+        bucket = digest % dimensions
+        vector[bucket] = vector.get(bucket, 0.0) + (count if digest & 0x80000000 else -count)
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {bucket: value / norm for bucket, value in vector.items() if value} if norm else {}
+
+def patch_edit(source: str, new_source: str, edited: str) -> Optional[str]:
+    """
+    Carry the differences between two sources over to an edited text.
+
+    Args:
+        source: Source text `edited` was produced from
+        new_source: Similar source text
+        edited: Edited version of `source`
+
+    Returns:
+        `edited` with the words replaced in `new_source` replaced the same
+        way, or None when the difference cannot be carried over (words
+        added or removed, punctuation changed, long replacements, or a
+        replaced phrase not found exactly once in `source` and in `edited`)
+    """
+    tokens = _TOKEN.findall(source)
+    new_tokens = _TOKEN.findall(new_source)
+    folded = [token.casefold() for token in tokens]
+    new_folded = [token.casefold() for token in new_tokens]
+    # Only the middle part differing between the sources goes through difflib
+    start = 0
+    while start < min(len(folded), len(new_folded)) and folded[start] == new_folded[start]:
+        start += 1
+    end = 0
+    while end < min(len(folded), len(new_folded)) - start and folded[-1 - end] == new_folded[-1 - end]:
+        end += 1
+    tokens, new_tokens = tokens[start:len(tokens) - end], new_tokens[start:len(new_tokens) - end]
+    matcher = difflib.SequenceMatcher(
+        None, folded[start:len(folded) - end], new_folded[start:len(new_folded) - end], autojunk=False
+    )
+    # Replacements by replaced words (casefolded), with the words as written in the source
+    replacements: Dict[str, str] = {}
+    originals: Dict[str, str] = {}
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        old, new = tokens[i1:i2], new_tokens[j1:j2]
+        if tag != "replace" or max(len(old), len(new)) > MAX_PATCH_WORDS:
+            return None
+        if not all(token[0].isalnum() or token[0] == "_" for token in old + new):
+            return None
+        if replacements.setdefault(" ".join(old).casefold(), " ".join(new)) != " ".join(new):
+            return None
+        originals[" ".join(old).casefold()] = " ".join(old)
+    if not replacements:
+        return edited
+
+    # A phrase occurring several times may only be changed in some places
+    phrases = {old: _phrase_pattern(old) for old in replacements}
+    for phrase in phrases.values():
+        if len(phrase.findall(source)) != 1 or len(phrase.findall(edited)) != 1:
+            return None
+
+    # One pass, so that a replacement is never replaced again
+    alternatives = sorted(replacements, key=len, reverse=True)
+    pattern = re.compile("|".join(phrases[old].pattern for old in alternatives), re.IGNORECASE)
+
+    def replace(match: "re.Match[str]") -> str:
+        old = " ".join(match.group(0).split()).casefold()
+        new, first = replacements[old], match.group(0)[0]
+        # The editor may have changed the case of the first letter ("Launch" -> "launch")
+        if first != originals[old][0]:
+            new = (new[0].lower() if first.islower() else new[0].upper()) + new[1:]
+        return new
+
+    return pattern.sub(replace, edited)
+
+def _phrase_pattern(phrase: str) -> "re.Pattern[str]":
+    """Whole-word, case-insensitive match of a phrase, whatever its spacing"""
+    return re.compile(r"(?<!\w)" + r"\s+".join(map(re.escape, phrase.split())) + r"(?!\w)", re.IGNORECASE)
+
+@dataclass
+class SemanticHit:
+    """
+    Edited text reused for a near-duplicate source.
+
+    Attributes:
+        edit_text: Edited text, patched when needed
+        summary: Condensed edited text, None when it was not needed or
+            could not be patched
+        similarity: Cosine similarity between the two sources
+        patched: Whether words were replaced in the reused text
+    """
+    edit_text: str
+    summary: Optional[str]
+    similarity: float
+    patched: bool
+
+@dataclass
+class _Entry:
+    namespace: str
+    source: str
+    edit_text: str
+    summary: Optional[str]
+    slot: int
+
+class SemanticCache:
+    """
+    Bounded index of edited texts searched by source similarity.
+
+    Entries are partitioned by namespace (model, temperature and editor
+    prompt version) so a text edited under another prompt is never reused.
+
+    Args:
+        threshold: Cosine similarity from which a source is a near-duplicate
+        max_entries: Maximum number of indexed texts
+        path: Optional sqlite file persisting the index across restarts
+        dimensions: Size of the hashed vectors
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        path: Optional[str] = None,
+        dimensions: int = VECTOR_DIMENSIONS
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self.dimensions = dimensions
+        self.hits = 0
+        self.patched = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        if np is not None:
+            self._matrix = np.zeros((max_entries, dimensions), dtype=np.float32)
+        else:
+            self._vectors: List[Optional[Dict[int, float]]] = [None] * max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    def lookup(self, namespace: str, source: str) -> Optional[SemanticHit]:
+        """
+        Find the edited text of a near-duplicate source.
+
+        Args:
+            namespace: Partition of the index to search
+            source: Source text about to be edited
+
+        Returns:
+            The reusable edited text, or None
+        """
+        vector = vectorize(source, self.dimensions)
+        with self._lock:
+            for key, similarity in self._search(namespace, vector):
+                entry = self._entries[key]
+                edit_text = patch_edit(entry.source, source, entry.edit_text)
+                if edit_text is None:
+                    continue
+                patched = edit_text != entry.edit_text
+                summary = entry.summary
+                if summary is not None and patched:
+                    summary = patch_edit(entry.source, source, summary)
+                self._touch(key)
+                self.hits += 1
+                self.patched += patched
+                return SemanticHit(edit_text, summary, similarity, patched)
+            self.misses += 1
+        return None
+
+    def add(self, namespace: str, source: str, edit_text: str, summary: Optional[str] = None) -> None:
+        """
+        Index the edited text of a source, evicting the least recently used
+        entry when the index is full.
+        """
+        if not edit_text:
+            return
+        key = self._key(namespace, source)
+        vector = vectorize(source, self.dimensions)
+        with self._lock:
+            self._insert(key, _Entry(namespace, source, edit_text, summary, -1), vector)
+            if self._conn is not None:
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO semantic_entries"
+                    " (key, namespace, source, edit_text, summary, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, namespace, source, edit_text, summary, now)
+                )
+                self._conn.execute(
+                    "DELETE FROM semantic_entries WHERE key IN ("
+                    " SELECT key FROM semantic_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "patched": self.patched,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "index": "numpy" if np is not None else "python",
+            **({"path": self.path} if self.path else {}),
+        }
+
+    def _search(self, namespace: str, vector: Dict[int, float]) -> List[Tuple[str, float]]:
+        """Most similar entries of a namespace at or above the threshold, best first"""
+        if not vector or not self._entries:
+            return []
+        keys = {entry.slot: key for key, entry in self._entries.items() if entry.namespace == namespace}
+        if np is not None:
+            query = np.zeros(self.dimensions, dtype=np.float32)
+            query[list(vector)] = list(vector.values())
+            scores = self._matrix @ query
+            candidates = [(keys[slot], float(scores[slot])) for slot in keys]
+        else:
+            candidates = [
+                (key, sum(value * self._vectors[slot].get(bucket, 0.0) for bucket, value in vector.items()))
+                for slot, key in keys.items()
+            ]
+        return sorted(
+            (candidate for candidate in candidates if candidate[1] >= self.threshold),
+            key=lambda candidate: candidate[1], reverse=True
+        )[:MAX_CANDIDATES]
+
+    def _insert(self, key: str, entry: _Entry, vector: Dict[int, float]) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._free.append(previous.slot)
+        elif not self._free:
+            _, evicted = self._entries.popitem(last=False)
+            self._free.append(evicted.slot)
+        entry.slot = self._free.pop()
+        if np is not None:
+            row = self._matrix[entry.slot]
+            row[:] = 0
+            row[list(vector)] = list(vector.values())
+        else:
+            self._vectors[entry.slot] = vector
+        self._entries[key] = entry
+
+    def _touch(self, key: str) -> None:
+        self._entries.move_to_end(key)
+        if self._conn is not None:
+            self._conn.execute("UPDATE semantic_entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+    def _key(self, namespace: str, source: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{normalize(source)}".encode("utf-8")).hexdigest()
+
+    def _open(self, path: str) -> None:
+        """Open the sqlite file and load its most recently used entries"""
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_entries ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " edit_text TEXT NOT NULL,"
+            " summary TEXT,"
+            " accessed_at REAL NOT NULL)"
+        )
+        rows = self._conn.execute(
+            "SELECT key, namespace, source, edit_text, summary FROM semantic_entries"
+            " ORDER BY accessed_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        # Oldest first, so the LRU order is restored
+        for key, namespace, source, edit_text, summary in reversed(rows):
+            self._insert(key, _Entry(namespace, source, edit_text, summary, -1), vectorize(source, self.dimensions))
+        logger.info(f"Loaded {len(rows)} semantic cache entries from {path}")
+
+_default_cache: Optional[SemanticCache] = None
+_default_cache_built = False
+_default_cache_lock = threading.Lock()
+
+def build_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Build the semantic editor cache from the environment configuration.
+
+    Returns:
+        The configured cache, or None when it is disabled
+    """
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(path=SEMANTIC_CACHE_PATH)
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Process-wide semantic editor cache shared by every agent"""
+    global _default_cache, _default_cache_built
+    if not _default_cache_built:
+        with _default_cache_lock:
+            if not _default_cache_built:
+                _default_cache = build_semantic_cache()
+                _default_cache_built = True
+    return _default_cache
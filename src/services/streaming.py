@@ -0,0 +1,139 @@
+"""
+Streaming generation
+--------------------
+Runs the workflow with node-level streaming and token streaming so
+clients receive the edited text, every draft and every critique as soon
+as they are produced instead of waiting for the whole workflow.
+
+Events are plain dictionaries with an "event" key:
+    token     - LLM token: {"node", "content"}
+    edited    - editor output: {"content"}
+    draft     - writer output: {"version", "content"}
+    critique  - critic output: {"version", "content"}
+    completed - final result: same payload as `generate_linkedin_post`
+    error     - generation failure: {"detail"}
+"""
+
+import asyncio
+from typing import Dict, Any, AsyncIterator, List, Optional
+from langgraph.graph import END
+from src.main import _initial_state, _format_result, _run_config
+from src.models.config import Configuration
+from src.services.registry import registry
+from src.utils.logger import logger
+from src.utils.token_stream import token_sink
+
+_DONE = object()
+
+async def astream_linkedin_post(
+    text: str,
+    target_audience: str,
+    n_drafts: int = 3,
+    config: Optional[Configuration] = None,
+    use_cache: bool = True,
+    n_candidates: Optional[int] = None,
+    stream_tokens: bool = True,
+    generation_id: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate a LinkedIn post, yielding progress events as they happen.
+    
+    Args:
+        text: Original text to transform
+        target_audience: Target audience for the post
+        n_drafts: Number of iterations to perform
+        config: Workflow configuration, defaults are used when omitted
+        use_cache: Whether cached LLM responses may be reused
+        n_candidates: Candidate drafts written per round, best one kept
+        stream_tokens: Whether to emit individual LLM tokens
+        generation_id: Identifier of the run, used to resume it; generated
+            when omitted
+        
+    Yields:
+        Event dictionaries, the last one being "completed" or "error"
+    """
+    entry = registry.get(config)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> None:
+        try:
+            # Inside the try: a taken generation id ends the stream with an error event
+            state = _initial_state(text, target_audience, n_drafts, use_cache, n_candidates, generation_id)
+            async for chunk in entry.workflow.astream(state, _run_config(state["generation_id"])):
+                for node, update in chunk.items():
+                    if node == END:
+                        state = update
+                        continue
+                    state = _merge_update(state, update)
+                    for event in _node_events(node, update, state):
+                        queue.put_nowait(event)
+            queue.put_nowait({"event": "completed", **_format_result(entry.agent, state)})
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {e}")
+            queue.put_nowait({"event": "error", "detail": str(e)})
+        finally:
+            queue.put_nowait(_DONE)
+
+    def on_token(node: str, content: str) -> None:
+        queue.put_nowait({"event": "token", "node": node, "content": content})
+
+    # The task copies the current context, so the sink is only visible to this run
+    sink_token = token_sink.set(on_token if stream_tokens else None)
+    try:
+        task = asyncio.create_task(run())
+    finally:
+        token_sink.reset(sink_token)
+
+    try:
+        while True:
+            event = await queue.get()
+            if event is _DONE:
+                break
+            yield event
+    finally:
+        if not task.done():
+            task.cancel()
+
+# State keys whose updates are appended rather than replaced (see OverallState)
+_APPENDED_KEYS = ("drafts", "feedback", "llm_usage")
+
+def _merge_update(state: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a node update to the locally tracked state, honouring the append reducers"""
+    merged = {**state, **update}
+    for key in _APPENDED_KEYS:
+        if key in update:
+            merged[key] = (state.get(key) or []) + update[key]
+    return merged
+
+def _node_events(node: str, update: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Translate a node state update into client events.
+    
+    Args:
+        node: Name of the node that produced the update
+        update: State update returned by the node
+        state: Tracked state, the update already merged
+        
+    Returns:
+        Events to emit for this update (possibly none)
+    """
+    if node == "editor":
+        event = {"event": "edited", "content": update["edit_text"]}
+        if update.get("edit_summary"):
+            event["summary"] = update["edit_summary"]
+        return [event]
+    
+    if node == "linkedin_writer":
+        return [{"event": "draft", "version": len(state["drafts"]), "content": update["drafts"][-1]}]
+    
+    if node == "linkedin_critique":
+        return [{"event": "critique", "version": len(state["feedback"]), "content": update["feedback"][-1]}]
+    
+    if node == "linkedin_draft":
+        # Pipelined round: the draft and, unless the loop ended, its critique
+        events = [{"event": "draft", "version": len(state["drafts"]), "content": update["drafts"][-1]}]
+        if update.get("feedback"):
+            events.append({"event": "critique", "version": len(state["feedback"]), "content": update["feedback"][-1]})
+        return events
+    
+    return []
@@ -0,0 +1,110 @@
+"""
+Prompt token budget
+-------------------
+Keeps prompts within the context window of the model.
+
+Ollama does not expose its tokenizers, so token counts are estimated
+from the average characters per token of the model family, rounded down
+so that estimates err on the high side. Texts that do not fit a budget
+are split at paragraph, then sentence, then word boundaries.
+"""
+
+import math
+import re
+from typing import List
+
+# Characters per token of English prose, per model family
+CHARS_PER_TOKEN = {
+    "llama3": 4.0,
+    "llama2": 3.5,
+    "mistral": 3.5,
+    "mixtral": 3.5,
+    "gemma": 4.0,
+    "phi3": 3.5,
+    "qwen": 3.8,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.2
+
+# Chat template tokens wrapped around each message
+MESSAGE_OVERHEAD_TOKENS = 8
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+def chars_per_token(model: str) -> float:
+    """Characters per token of a model, the longest matching family wins"""
+    name = model.split(":", 1)[0].rsplit("/", 1)[-1].lower()
+    families = [family for family in CHARS_PER_TOKEN if name.startswith(family)]
+    if not families:
+        return DEFAULT_CHARS_PER_TOKEN
+    return CHARS_PER_TOKEN[max(families, key=len)]
+
+def count_tokens(text: str, model: str) -> int:
+    """Estimated number of tokens of a text for a model"""
+    return math.ceil(len(text) / chars_per_token(model))
+
+def count_prompt_tokens(system_prompt: str, user_prompt: str, model: str) -> int:
+    """Estimated tokens of a (system prompt, user prompt) chat request"""
+    return (
+        count_tokens(system_prompt, model)
+        + count_tokens(user_prompt, model)
+        + 2 * MESSAGE_OVERHEAD_TOKENS
+    )
+
+def split_text(text: str, max_tokens: int, model: str) -> List[str]:
+    """
+    Split a text into chunks of at most `max_tokens` tokens.
+
+    Chunks are packed greedily from paragraphs; a paragraph that does not
+    fit on its own is split into sentences, and a sentence into words.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget of a chunk
+        model: Model whose token count applies
+
+    Returns:
+        The chunks, a single one when the whole text fits
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    for paragraph in _PARAGRAPH.split(text.strip()):
+        if count_tokens(paragraph, model) <= max_tokens:
+            pieces = [paragraph]
+        else:
+            pieces = _split_long(paragraph, max_tokens, model)
+        _pack(chunks, pieces, max_tokens, model, first_separator="\n\n")
+    return chunks
+
+def _split_long(paragraph: str, max_tokens: int, model: str) -> List[str]:
+    """Sentences of a paragraph, over-long sentences cut into runs of words"""
+    # Characters of the longest word that fits, longer ones (URLs, data) are cut
+    width = max(1, int(max_tokens * chars_per_token(model)))
+    pieces: List[str] = []
+    for sentence in _SENTENCE.split(paragraph):
+        if count_tokens(sentence, model) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words: List[str] = []
+        _pack(words, [
+            word[i:i + width] for word in sentence.split() for i in range(0, len(word), width)
+        ], max_tokens, model)
+        pieces.extend(words)
+    return pieces
+
+def _pack(
+    chunks: List[str],
+    pieces: List[str],
+    max_tokens: int,
+    model: str,
+    first_separator: str = " "
+) -> None:
+    """Append pieces to the last chunk while it fits, else start a new chunk"""
+    for i, piece in enumerate(pieces):
+        joined = f"{chunks[-1]}{first_separator if i == 0 else ' '}{piece}" if chunks else None
+        if joined is not None and count_tokens(joined, model) <= max_tokens:
+            chunks[-1] = joined
+        else:
+            chunks.append(piece)
@@ -0,0 +1,141 @@
+"""
+LLM usage accounting
+--------------------
+Per-call breakdown of prompt evaluation versus generation, taken from
+the metadata Ollama returns with each response. Prompt evaluation only
+counts the tokens the server actually processed, so a prompt whose
+prefix was already in the model's KV cache shows a small
+`prompt_tokens` / `prompt_eval_seconds`.
+"""
+
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, Optional
+
+NANOSECONDS = 1e9
+
+@dataclass
+class LLMUsage:
+    """
+    Usage of a single LLM call.
+    
+    Attributes:
+        node: Workflow node that issued the call
+        model: Model that served the call
+        iteration: Draft number the call belongs to (0 for the editor)
+        prompt: Name and version of the prompt (`linkedin_writer@v1`)
+        prompt_tokens: Prompt tokens evaluated by the model
+        prompt_size_tokens: Estimated tokens of the whole prompt, prefix
+            reused from the KV cache included
+        completion_tokens: Tokens generated
+        prompt_eval_seconds: Time spent evaluating the prompt
+        eval_seconds: Time spent generating
+        load_seconds: Time spent loading the model
+        wall_seconds: End-to-end duration seen by the agent
+        cached: Whether the response came from the response cache
+    """
+    node: str
+    model: str = ""
+    iteration: int = 0
+    prompt: str = ""
+    prompt_tokens: int = 0
+    prompt_size_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_eval_seconds: float = 0.0
+    eval_seconds: float = 0.0
+    load_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cached: bool = False
+
+    @classmethod
+    def from_generation_info(
+        cls,
+        node: str,
+        info: Optional[Dict[str, Any]],
+        started_at: float,
+        model: str = "",
+        iteration: int = 0,
+        prompt_size_tokens: int = 0,
+        prompt: str = ""
+    ) -> "LLMUsage":
+        """
+        Build the usage of a call from Ollama's final response metadata.
+        
+        Args:
+            node: Workflow node that issued the call
+            info: Final response metadata, see `LLMResult.info`
+            started_at: `time.perf_counter()` value taken before the call
+            model: Model that served the call
+            iteration: Draft number the call belongs to
+            prompt_size_tokens: Estimated tokens of the prompt sent
+            prompt: Name and version of the prompt
+            
+        Returns:
+            Usage of the call
+        """
+        info = info or {}
+        return cls(
+            node=node,
+            model=model,
+            iteration=iteration,
+            prompt=prompt,
+            prompt_tokens=info.get("prompt_eval_count") or 0,
+            prompt_size_tokens=prompt_size_tokens,
+            completion_tokens=info.get("eval_count") or 0,
+            prompt_eval_seconds=(info.get("prompt_eval_duration") or 0) / NANOSECONDS,
+            eval_seconds=(info.get("eval_duration") or 0) / NANOSECONDS,
+            load_seconds=(info.get("load_duration") or 0) / NANOSECONDS,
+            wall_seconds=time.perf_counter() - started_at,
+        )
+
+    @property
+    def queue_seconds(self) -> float:
+        """Time not spent loading, evaluating or generating: server queue and network"""
+        if self.cached:
+            return 0.0
+        return max(0.0, self.wall_seconds - self.load_seconds - self.prompt_eval_seconds - self.eval_seconds)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed, None when unknown"""
+        if not self.eval_seconds:
+            return None
+        return self.completion_tokens / self.eval_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the usage"""
+        return asdict(self)
+
+def summarize_usage(calls: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the usage of every LLM call of a generation.
+    
+    Args:
+        calls: Serialized `LLMUsage` records
+        
+    Returns:
+        Totals of calls, tokens and time, split between prompt evaluation
+        and generation; `prompt_size_tokens` counts every prompt token sent
+        whereas `prompt_tokens` only counts those the model evaluated
+    """
+    summary = {
+        "calls": 0,
+        "cached_calls": 0,
+        "prompt_tokens": 0,
+        "prompt_size_tokens": 0,
+        "completion_tokens": 0,
+        "prompt_eval_seconds": 0.0,
+        "eval_seconds": 0.0,
+        "wall_seconds": 0.0,
+    }
+    for call in calls:
+        summary["calls"] += 1
+        summary["cached_calls"] += bool(call.get("cached"))
+        for key in (
+            "prompt_tokens", "prompt_size_tokens", "completion_tokens",
+            "prompt_eval_seconds", "eval_seconds", "wall_seconds"
+        ):
+            summary[key] += call.get(key, 0)
+    for key in ("prompt_eval_seconds", "eval_seconds", "wall_seconds"):
+        summary[key] = round(summary[key], 6)
+    return summary
@@ -0,0 +1,477 @@
+"""
+Generation workers
+------------------
+Worker-process mode: the API process validates, admits and routes
+requests while generations run in a pool of worker processes, each with
+its own compiled workflows and `LinkedInAgent` (nothing is shared between
+processes but the checkpoint and cache files). CPU work around the LLM
+calls then scales across cores instead of contending with request
+handling for the GIL of a single process.
+
+The API process talks to each worker over a duplex pipe (pickled
+messages), read and written by two threads per worker so that a large
+message or a busy worker never blocks the event loop. A job goes to the
+worker with the fewest jobs in flight; stream events are forwarded as
+they are produced. A worker is recycled
+after `WORKER_MAX_JOBS` jobs: a replacement is started, and once it is
+ready the old worker receives no new job and exits after finishing its
+own. A worker that dies is replaced, its jobs fail. On shutdown, running
+jobs are given `WORKER_DRAIN_TIMEOUT` seconds to finish.
+
+Workers send the snapshot of their counters and histograms with every
+result, so /metrics in the API process covers the LLM calls made in the
+workers. The queue wait of their LLM calls is forwarded to the admission
+controller of the API process.
+
+`agenerate_post`, `agenerate_posts`, `aresume_post` and `astream_post`
+run a generation in the pool when it is started, and in the current
+process otherwise.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import psutil
+from src.services.admission import admission
+from src.services.errors import GenerationExistsError
+from src.utils.constants import WORKER_PROCESSES, WORKER_MAX_JOBS, WORKER_DRAIN_TIMEOUT
+from src.utils.logger import logger
+from src.utils.metrics import (
+    WORKER_IN_FLIGHT,
+    WORKER_JOBS,
+    WORKER_JOB_DURATION,
+    WORKER_RESTARTS,
+    merge_series,
+    metrics
+)
+
+STOP_TIMEOUT = 10.0  # seconds for a stopped worker to exit before it is killed
+
+async def agenerate_post(**params: Any) -> Optional[Dict[str, Any]]:
+    """`agenerate_linkedin_post` in a worker process, or in this one without a pool"""
+    if worker_pool.running:
+        return await worker_pool.generate(**params)
+    from src.main import agenerate_linkedin_post
+    return await agenerate_linkedin_post(**params)
+
+async def agenerate_posts(**params: Any) -> Optional[Dict[str, Any]]:
+    """`agenerate_linkedin_posts` (one post per audience) in a worker process, or in this one without a pool"""
+    if worker_pool.running:
+        return await worker_pool.generate_posts(**params)
+    from src.main import agenerate_linkedin_posts
+    return await agenerate_linkedin_posts(**params)
+
+async def aresume_post(generation_id: str) -> Optional[Dict[str, Any]]:
+    """`aresume_linkedin_post` in a worker process, or in this one without a pool"""
+    if worker_pool.running:
+        return await worker_pool.resume(generation_id)
+    from src.main import aresume_linkedin_post
+    return await aresume_linkedin_post(generation_id)
+
+def astream_post(**params: Any) -> AsyncIterator[Dict[str, Any]]:
+    """`astream_linkedin_post` in a worker process, or in this one without a pool"""
+    if worker_pool.running:
+        return worker_pool.stream(**params)
+    from src.services.streaming import astream_linkedin_post
+    return astream_linkedin_post(**params)
+
+# Worker process side
+
+class _Channel:
+    """Pipe end of a worker; sends may come from workflow executor threads"""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            try:
+                self.conn.send(message)
+            except (BrokenPipeError, OSError):
+                pass  # API process gone, the worker stops on EOF
+
+def _worker_main(conn: Connection, slot: int) -> None:
+    """Entry point of a worker process: compile the workflows, then serve jobs"""
+    # Ctrl-C reaches the whole process group; the API process drains the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from src.services.registry import registry
+    channel = _Channel(conn)
+    admission.forward = lambda queue_seconds: channel.send({"type": "llm_call", "queue_seconds": queue_seconds})
+    registry.warm_up()
+    asyncio.run(_serve(channel, slot))
+
+async def _serve(channel: _Channel, slot: int) -> None:
+    from src.services.backends.factory import get_backend
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    def read() -> None:
+        """Receive in a thread: a large job message never blocks the running generations"""
+        try:
+            while True:
+                message = channel.conn.recv()
+                loop.call_soon_threadsafe(inbox.put_nowait, message)
+        except (EOFError, OSError):
+            _call_soon(loop, inbox.put_nowait, {"type": "stop"})
+
+    threading.Thread(target=read, name="generation-worker-reader", daemon=True).start()
+    channel.send({"type": "ready", "pid": os.getpid()})
+    logger.info(f"Generation worker {slot} ready (pid {os.getpid()})")
+
+    tasks: Dict[str, asyncio.Task] = {}
+    while True:
+        message = await inbox.get()
+        if message["type"] == "job":
+            task = tasks[message["id"]] = asyncio.create_task(_run_job(channel, message))
+            task.add_done_callback(lambda _, job_id=message["id"]: tasks.pop(job_id, None))
+        elif message["type"] == "cancel" and message["id"] in tasks:
+            tasks[message["id"]].cancel()
+        elif message["type"] == "stop":
+            break
+
+    # Finish the jobs already received
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    channel.send({"type": "metrics", "snapshot": metrics.snapshot()})
+    await get_backend().aclose()
+    logger.info(f"Generation worker {slot} stopped")
+
+async def _run_job(channel: _Channel, message: Dict[str, Any]) -> None:
+    """Run one job, ending with a result or an error message"""
+    from src.main import agenerate_linkedin_post, agenerate_linkedin_posts, aresume_linkedin_post
+    from src.services.streaming import astream_linkedin_post
+    job_id, kind, params = message["id"], message["kind"], message["params"]
+    reply: Dict[str, Any] = {"type": "result", "id": job_id, "result": None}
+    try:
+        if kind == "stream":
+            async for event in astream_linkedin_post(**params):
+                channel.send({"type": "event", "id": job_id, "event": event})
+        elif kind == "resume":
+            reply["result"] = await aresume_linkedin_post(**params)
+        elif kind == "generate_posts":
+            reply["result"] = await agenerate_linkedin_posts(**params)
+        else:
+            reply["result"] = await agenerate_linkedin_post(**params)
+    except asyncio.CancelledError:
+        reply = {"type": "error", "id": job_id, "error": "Job cancelled", "cancelled": True}
+    except KeyError as e:
+        # Unknown generation to resume, reported as such by the API
+        reply = {"type": "error", "id": job_id, "error": e.args[0] if e.args else str(e), "not_found": True}
+    except GenerationExistsError as e:
+        # Raised again on the API side, which answers with a conflict
+        reply = {"type": "error", "id": job_id, "error": str(e), "exists": e.generation_id}
+    except Exception as e:
+        logger.error(f"Worker job {job_id} failed: {e}")
+        reply = {"type": "error", "id": job_id, "error": str(e)}
+    channel.send({**reply, "metrics": metrics.snapshot()})
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Any, *args: Any) -> None:
+    """Schedule a callback from a pipe thread, unless the loop is already closed"""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # loop closed, the process is exiting
+
+# API process side
+
+@dataclass
+class _Worker:
+    """A worker process and the jobs dispatched to it"""
+    slot: int
+    process: Any
+    conn: Connection
+    ready: asyncio.Future
+    # Messages to send, written by the sender thread; None stops it
+    outbox: queue.SimpleQueue = field(default_factory=queue.SimpleQueue)
+    reader: Optional[threading.Thread] = None
+    pid: Optional[int] = None
+    jobs: int = 0
+    retiring: bool = False
+    recycling: bool = False
+    started_at: float = field(default_factory=time.time)
+    # job id -> (messages of the job, dispatch time)
+    pending: Dict[str, Tuple[asyncio.Queue, float]] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+class WorkerPool:
+    """
+    Pool of generation worker processes.
+
+    Args:
+        processes: Number of worker processes, 0 disables the pool
+        max_jobs: Jobs after which a worker is replaced, 0 never
+        drain_timeout: Seconds running jobs are given to finish on shutdown
+    """
+
+    def __init__(
+        self,
+        processes: int = WORKER_PROCESSES,
+        max_jobs: int = WORKER_MAX_JOBS,
+        drain_timeout: float = WORKER_DRAIN_TIMEOUT
+    ):
+        self.processes = processes
+        self.max_jobs = max_jobs
+        self.drain_timeout = drain_timeout
+        self.running = False
+        self._workers: List[_Worker] = []
+        self._retiring: List[_Worker] = []
+        # Counters and histograms of the workers that exited
+        self._retired_metrics: Dict[str, Dict] = {}
+        self._ids = itertools.count()
+        self._context = multiprocessing.get_context("spawn")
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    async def start(self) -> None:
+        """Start the workers and wait until every one has compiled its workflows"""
+        if self.running or not self.enabled:
+            return
+        self._workers = [self._spawn(slot) for slot in range(self.processes)]
+        await asyncio.gather(*(worker.ready for worker in self._workers))
+        self.running = True
+        logger.info(f"{self.processes} generation workers ready")
+
+    async def stop(self) -> None:
+        """Stop dispatching, let running jobs finish, then stop the workers"""
+        self.running = False
+        workers = self._workers + self._retiring
+        deadline = time.monotonic() + self.drain_timeout
+        while any(worker.pending for worker in workers) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for worker in workers:
+            self._send(worker, {"type": "stop"})
+        for worker in workers:
+            await asyncio.to_thread(worker.process.join, STOP_TIMEOUT)
+            if worker.process.is_alive():
+                logger.warning(f"Generation worker {worker.slot} did not stop, killing it")
+                worker.process.kill()
+            # The reader sees the EOF, closes the pipe and reports the exit
+            await asyncio.to_thread(worker.reader.join, STOP_TIMEOUT)
+        await asyncio.sleep(0)
+        self._workers, self._retiring = [], []
+
+    async def generate(self, **params: Any) -> Optional[Dict[str, Any]]:
+        """Run `agenerate_linkedin_post` in a worker"""
+        return await self._call("generate", params)
+
+    async def generate_posts(self, **params: Any) -> Optional[Dict[str, Any]]:
+        """Run `agenerate_linkedin_posts` in a worker: its audiences share the worker's agent and caches"""
+        return await self._call("generate_posts", params)
+
+    async def resume(self, generation_id: str) -> Optional[Dict[str, Any]]:
+        """Run `aresume_linkedin_post` in a worker; needs a checkpoint file shared by the workers"""
+        return await self._call("resume", {"generation_id": generation_id})
+
+    async def stream(self, **params: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Run `astream_linkedin_post` in a worker, yielding its events"""
+        worker, job_id, messages = self._dispatch("stream", params)
+        finished = False
+        try:
+            while True:
+                message = await messages.get()
+                if message["type"] == "event":
+                    yield message["event"]
+                    continue
+                finished = True
+                if message["type"] == "error":
+                    yield {"event": "error", "detail": message["error"]}
+                return
+        finally:
+            if not finished:
+                self._send(worker, {"type": "cancel", "id": job_id})
+
+    def metrics_snapshots(self) -> List[Dict[str, Any]]:
+        """Counter and histogram snapshots of the workers, to render with the local metrics"""
+        workers = [worker.metrics for worker in self._workers + self._retiring if worker.metrics]
+        return [self._retired_metrics, *workers] if self._retired_metrics else workers
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "processes": self.processes,
+            "max_jobs": self.max_jobs,
+            "workers": [
+                {
+                    "slot": worker.slot,
+                    "pid": worker.pid,
+                    "ready": worker.ready.done() and worker.ready.exception() is None,
+                    "retiring": worker.retiring,
+                    "jobs": worker.jobs,
+                    "in_flight": len(worker.pending),
+                    "uptime_seconds": round(now - worker.started_at, 3),
+                    "rss_bytes": self._rss(worker),
+                }
+                for worker in self._workers + self._retiring
+            ],
+        }
+
+    async def _call(self, kind: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        worker, job_id, messages = self._dispatch(kind, params)
+        try:
+            message = await messages.get()
+        except asyncio.CancelledError:
+            self._send(worker, {"type": "cancel", "id": job_id})
+            raise
+        if message["type"] == "error":
+            if message.get("not_found"):
+                raise KeyError(message["error"])
+            if message.get("exists") is not None:
+                raise GenerationExistsError(message["exists"])
+            raise RuntimeError(message["error"])
+        return message["result"]
+
+    def _dispatch(self, kind: str, params: Dict[str, Any]) -> Tuple[_Worker, str, asyncio.Queue]:
+        """Send a job to the least loaded ready worker"""
+        candidates = [worker for worker in self._workers if worker.ready.done() and not worker.retiring]
+        if not self.running or not candidates:
+            raise RuntimeError("No generation worker available")
+        worker = min(candidates, key=lambda candidate: (len(candidate.pending), candidate.jobs))
+        job_id = str(next(self._ids))
+        messages: asyncio.Queue = asyncio.Queue()
+        worker.pending[job_id] = (messages, time.perf_counter())
+        worker.jobs += 1
+        WORKER_IN_FLIGHT.set(len(worker.pending), worker=str(worker.slot))
+        self._send(worker, {"type": "job", "id": job_id, "kind": kind, "params": params})
+        if self.max_jobs and worker.jobs >= self.max_jobs and not worker.recycling:
+            worker.recycling = True
+            asyncio.get_running_loop().create_task(self._recycle(worker))
+        return worker, job_id, messages
+
+    async def _recycle(self, worker: _Worker) -> None:
+        """Replace a worker that ran `max_jobs` jobs once its replacement is ready"""
+        replacement = self._spawn(worker.slot)
+        try:
+            await replacement.ready
+        except Exception as e:
+            logger.error(f"Replacement of generation worker {worker.slot} failed to start: {e}")
+            worker.recycling = False
+            return
+        if worker not in self._workers:
+            # The worker exited meanwhile and was already replaced
+            self._send(replacement, {"type": "stop"})
+            self._retiring.append(replacement)
+            return
+        self._workers[self._workers.index(worker)] = replacement
+        WORKER_RESTARTS.inc(worker=str(worker.slot), reason="recycled")
+        logger.info(f"Recycling generation worker {worker.slot} (pid {worker.pid}) after {worker.jobs} jobs")
+        worker.retiring = True
+        self._retiring.append(worker)
+        if not worker.pending:
+            self._send(worker, {"type": "stop"})
+
+    def _spawn(self, slot: int) -> _Worker:
+        loop = asyncio.get_running_loop()
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, slot), name=f"generation-worker-{slot}", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(slot, process, conn, loop.create_future())
+        sender = threading.Thread(target=self._write, args=(worker,), name=f"generation-worker-{slot}-sender", daemon=True)
+        worker.reader = threading.Thread(
+            target=self._read, args=(worker, sender, loop), name=f"generation-worker-{slot}-reader", daemon=True
+        )
+        sender.start()
+        worker.reader.start()
+        return worker
+
+    def _read(self, worker: _Worker, sender: threading.Thread, loop: asyncio.AbstractEventLoop) -> None:
+        """Reader thread: hand every message to the loop, then the exit once the pipe is closed"""
+        try:
+            while True:
+                message = worker.conn.recv()
+                loop.call_soon_threadsafe(self._on_message, worker, message)
+        except (EOFError, OSError):
+            pass
+        except RuntimeError:
+            return  # loop closed
+        # The process is gone: stop the sender before closing the pipe it writes to
+        worker.outbox.put(None)
+        sender.join()
+        worker.conn.close()
+        _call_soon(loop, self._on_exit, worker)
+
+    @staticmethod
+    def _write(worker: _Worker) -> None:
+        """Sender thread: write the queued messages in order"""
+        while True:
+            message = worker.outbox.get()
+            if message is None:
+                return
+            try:
+                worker.conn.send(message)
+            except (BrokenPipeError, OSError):
+                return  # the reader sees the EOF and handles the exit
+
+    def _on_message(self, worker: _Worker, message: Dict[str, Any]) -> None:
+        kind = message["type"]
+        if kind == "llm_call":
+            admission.observe_llm_call(message["queue_seconds"])
+        elif kind == "event":
+            item = worker.pending.get(message["id"])
+            if item is not None:
+                item[0].put_nowait(message)
+        elif kind in ("result", "error"):
+            worker.metrics = message.pop("metrics", worker.metrics)
+            item = worker.pending.pop(message["id"], None)
+            if item is not None:
+                messages, dispatched_at = item
+                outcome = "ok" if kind == "result" else ("cancelled" if message.get("cancelled") else "error")
+                WORKER_JOBS.inc(worker=str(worker.slot), outcome=outcome)
+                WORKER_JOB_DURATION.observe(time.perf_counter() - dispatched_at, worker=str(worker.slot))
+                messages.put_nowait(message)
+            WORKER_IN_FLIGHT.set(len(worker.pending), worker=str(worker.slot))
+            if worker.retiring and not worker.pending and self.running:
+                self._send(worker, {"type": "stop"})
+        elif kind == "metrics":
+            worker.metrics = message["snapshot"]
+        elif kind == "ready":
+            worker.pid = message["pid"]
+            if not worker.ready.done():
+                worker.ready.set_result(None)
+
+    def _on_exit(self, worker: _Worker) -> None:
+        """Worker process gone: fail its jobs and replace it if it was serving"""
+        if not worker.ready.done():
+            worker.ready.set_exception(RuntimeError(f"Generation worker {worker.slot} exited during startup"))
+        for messages, _ in worker.pending.values():
+            messages.put_nowait({"type": "error", "error": "Generation worker exited"})
+        if worker.pending:
+            WORKER_JOBS.inc(len(worker.pending), worker=str(worker.slot), outcome="error")
+        worker.pending.clear()
+        WORKER_IN_FLIGHT.set(0, worker=str(worker.slot))
+        for name, series in worker.metrics.items():
+            merge_series(self._retired_metrics.setdefault(name, {}), series)
+        worker.metrics = {}
+        if worker in self._retiring:
+            self._retiring.remove(worker)
+        elif worker in self._workers and self.running:
+            logger.error(f"Generation worker {worker.slot} (pid {worker.pid}) exited, replacing it")
+            WORKER_RESTARTS.inc(worker=str(worker.slot), reason="exited")
+            self._workers[self._workers.index(worker)] = self._spawn(worker.slot)
+
+    def _send(self, worker: _Worker, message: Dict[str, Any]) -> None:
+        """Queue a message for the sender thread of the worker"""
+        worker.outbox.put(message)
+
+    @staticmethod
+    def _rss(worker: _Worker) -> Optional[int]:
+        try:
+            return psutil.Process(worker.pid).memory_info().rss if worker.pid else None
+        except psutil.Error:
+            return None
+
+worker_pool = WorkerPool()
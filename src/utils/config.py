@@ -4,11 +4,22 @@ Handles environment variables and API keys.
 """
 
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file if not in Docker
-if not os.getenv("DOCKER_CONTAINER"):
-    load_dotenv()
+def load_environment(path: str = ".env") -> bool:
+    """
+    Load environment variables from a local .env file if not in Docker.
 
-# Ollama configuration
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
\ No newline at end of file
+    Only the file in the working directory is considered and python-dotenv
+    is only imported when it exists, so containers and deployments without
+    a .env file pay a single stat call.
+
+    Args:
+        path: Location of the .env file
+
+    Returns:
+        Whether variables were loaded
+    """
+    if os.getenv("DOCKER_CONTAINER") or not os.path.isfile(path):
+        return False
+    from dotenv import load_dotenv
+    return load_dotenv(path)
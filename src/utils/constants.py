@@ -3,19 +3,119 @@ Constants used throughout the application
 """
 
 import os
+from src.utils.config import load_environment
+
+# A local .env file must be loaded before the settings below are read
+load_environment()
 
 # API Configuration
-OLLAMA_BASE_URL = "http://localhost:11434" if not os.getenv("DOCKER_CONTAINER") else "http://127.0.0.1:11434"
+OLLAMA_BASE_URL = os.getenv(
+    "OLLAMA_BASE_URL",
+    "http://localhost:11434" if not os.getenv("DOCKER_CONTAINER") else "http://127.0.0.1:11434"
+)
+# Several comma-separated hosts enable load balancing; defaults to OLLAMA_BASE_URL alone
+OLLAMA_BASE_URLS = [url.strip() for url in os.getenv("OLLAMA_BASE_URLS", OLLAMA_BASE_URL).split(",") if url.strip()]
 OLLAMA_MODEL = "llama3:latest"
 OLLAMA_TEMPERATURE = 0.7
 
+# LLM backend
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")  # "ollama" or "fake"
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))  # seconds
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "300"))  # seconds between two chunks
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "32"))
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "3"))
+LLM_RETRY_MAX_WAIT = float(os.getenv("LLM_RETRY_MAX_WAIT", "10"))  # seconds
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # seconds
+OLLAMA_ROUTING = os.getenv("OLLAMA_ROUTING", "least_outstanding")  # or "latency"
+OLLAMA_STICKY = os.getenv("OLLAMA_STICKY", "true").lower() in ("1", "true", "yes")  # one host per generation
+OLLAMA_EJECT_AFTER_ERRORS = int(os.getenv("OLLAMA_EJECT_AFTER_ERRORS", "3"))
+OLLAMA_EJECT_SECONDS = float(os.getenv("OLLAMA_EJECT_SECONDS", "30"))
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))  # seconds before the first token
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0"))  # 0 = instantaneous
+
 # Default values
 DEFAULT_N_DRAFTS = 3
+DEFAULT_N_CANDIDATES = int(os.getenv("N_CANDIDATES", "1"))  # writer drafts per round, best one kept
+
+# Pipelined loop: writer, supervisor and critic run as one graph step per draft
+PIPELINED_WORKFLOW = os.getenv("PIPELINED_WORKFLOW", "false").lower() in ("1", "true", "yes")
+
+# Early exit of the writer/critic loop
+EARLY_EXIT_ENABLED = os.getenv("EARLY_EXIT_ENABLED", "true").lower() in ("1", "true", "yes")
+APPROVE_SCORE = float(os.getenv("APPROVE_SCORE", "8"))  # critic score (out of 10) accepted as approval
+NO_PROGRESS_SIMILARITY = float(os.getenv("NO_PROGRESS_SIMILARITY", "0.95"))  # consecutive drafts ratio
+
+# Prompt token budget
+CONTEXT_WINDOW_TOKENS = int(os.getenv("CONTEXT_WINDOW_TOKENS", "2048"))  # num_ctx of the model on Ollama
+EDIT_TEXT_TOKEN_BUDGET = int(os.getenv("EDIT_TEXT_TOKEN_BUDGET", "600"))  # longer edited texts are summarized
+EDITOR_CHUNK_CONCURRENCY = int(os.getenv("EDITOR_CHUNK_CONCURRENCY", "4"))  # chunks of a long text edited at once
+
+# Prompt versions, e.g. "linkedin_writer=v1:50,v2:50;linkedin_critique=v2" (default versions when unset)
+PROMPT_VARIANTS = os.getenv("PROMPT_VARIANTS", "")
+
+# Checkpointing of interrupted generations
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".checkpoints.sqlite")
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "86400"))  # seconds a generation stays resumable
+CHECKPOINT_PRUNE_INTERVAL = float(os.getenv("CHECKPOINT_PRUNE_INTERVAL", "300"))  # seconds between two prunes
+
+# Concurrency
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", "8"))
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# Job queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))  # finished jobs kept for polling
+
+# Worker-process mode: generations run in a pool of processes behind the API
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "0"))  # 0 runs generations in the API process
+WORKER_MAX_JOBS = int(os.getenv("WORKER_MAX_JOBS", "500"))  # jobs before a worker is recycled, 0 never
+WORKER_DRAIN_TIMEOUT = float(os.getenv("WORKER_DRAIN_TIMEOUT", "60"))  # seconds allowed to finish on shutdown
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL")) if os.getenv("LLM_CACHE_TTL") else None  # seconds
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")  # sqlite file, memory only when unset
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+# Semantic editor cache: near-duplicate source texts reuse a previous edit
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))  # cosine similarity
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH")  # sqlite file, memory only when unset
 
 # LinkedIn Post Constraints
 MAX_POST_LENGTH = 1300
 MIN_HASHTAGS = 3
 MAX_HASHTAGS = 5
 
+# Admission control
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+MAX_N_DRAFTS = int(os.getenv("MAX_N_DRAFTS", "10"))  # upper bound accepted by the API
+MAX_N_CANDIDATES = int(os.getenv("MAX_N_CANDIDATES", "5"))
+MAX_TARGET_AUDIENCES = int(os.getenv("MAX_TARGET_AUDIENCES", "5"))  # audiences of one multi-audience request
+EXPECTED_TOKENS_PER_CALL = int(os.getenv("EXPECTED_TOKENS_PER_CALL", "600"))  # prompt + completion estimate
+API_KEY_HEADER = os.getenv("API_KEY_HEADER", "X-API-Key")  # tenant identifier, shared bucket when absent
+TENANT_TOKENS_PER_MINUTE = float(os.getenv("TENANT_TOKENS_PER_MINUTE", "30000"))  # bucket refill rate
+TENANT_BURST_TOKENS = float(os.getenv("TENANT_BURST_TOKENS", "60000"))  # bucket capacity
+ADMISSION_MIN_CONCURRENCY = int(os.getenv("ADMISSION_MIN_CONCURRENCY", "1"))
+ADMISSION_TARGET_QUEUE_SECONDS = float(os.getenv("ADMISSION_TARGET_QUEUE_SECONDS", "2"))  # Ollama queue wait
+
+# Request coalescing
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() in ("1", "true", "yes")
+COALESCE_KEY_MODE = os.getenv("COALESCE_KEY_MODE", "whitespace")  # "exact", "whitespace" or "casefold"
+
+# Health probes
+HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", "15"))  # seconds between snapshots
+HEALTH_STALE_AFTER = float(os.getenv("HEALTH_STALE_AFTER", str(HEALTH_REFRESH_INTERVAL * 3)))  # seconds
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))  # seconds for the model listing
+
+# Observability
+OTEL_TRACING = os.getenv("OTEL_TRACING", "false").lower() in ("1", "true", "yes")  # needs opentelemetry-api
+
 # Module Names
 LOGGER_NAME = "linkedin_agent" 
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Metrics and tracing
+-------------------
+Minimal Prometheus-compatible counters and histograms, rendered in the
+text exposition format by the /metrics endpoint, plus optional
+OpenTelemetry spans. Counters and histograms of other processes (the
+generation workers) can be added to the rendering from their
+snapshots. Spans are only emitted when the `opentelemetry-api` package
+is installed and OTEL_TRACING is enabled; otherwise `span` is a no-op.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from src.utils.constants import OTEL_TRACING
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # optional dependency
+    _otel_trace = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def merge_series(into: Dict[Tuple[str, ...], Any], snapshot: Dict[Tuple[str, ...], Any]) -> None:
+    """Add the series of a counter or histogram snapshot to another snapshot"""
+    for key, value in snapshot.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+        elif isinstance(value, list):
+            current[0] = [a + b for a, b in zip(current[0], value[0])]
+            current[1] += value[1]
+            current[2] += value[2]
+        else:
+            into[key] = current + value
+
+class Counter:
+    """
+    Monotonic counter with labels.
+    
+    Args:
+        name: Metric name
+        documentation: Help text
+        labels: Label names
+    """
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        """Current value of every series"""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self, extra: Sequence[Dict[Tuple[str, ...], float]] = ()) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        values = self.snapshot()
+        for snapshot in extra:
+            for key, value in snapshot.items():
+                values[key] = values.get(key, 0) + value
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self, extra: Sequence[Dict[Tuple[str, ...], float]] = ()) -> List[str]:
+        # Values of other processes are not added: a gauge is per process
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    """
+    Cumulative histogram with labels.
+    
+    Args:
+        name: Metric name
+        documentation: Help text
+        labels: Label names
+        buckets: Upper bounds of the buckets
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List]:
+        """Bucket counts, sum and count of every series"""
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self._series.items()}
+
+    def render(self, extra: Sequence[Dict[Tuple[str, ...], List]] = ()) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        series = self.snapshot()
+        for snapshot in extra:
+            merge_series(series, snapshot)
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+        """Series of the counters and histograms (not gauges), by metric name"""
+        return {
+            metric.name: metric.snapshot() for metric in self._metrics if not isinstance(metric, Gauge)
+        }
+
+    def render(self, extra: Sequence[Dict[str, Dict[Tuple[str, ...], Any]]] = ()) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+
+        Args:
+            extra: Snapshots of the same metrics in other processes, added
+                to the counters and histograms of this one
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render([snapshot[metric.name] for snapshot in extra if metric.name in snapshot]))
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+NODE_DURATION = metrics.register(Histogram(
+    "linkedin_node_duration_seconds", "Wall time of a workflow node", ["node"]
+))
+LLM_CALLS = metrics.register(Counter(
+    "linkedin_llm_calls_total", "LLM calls issued by the agent", ["node", "model", "prompt", "cached"]
+))
+LLM_CALL_DURATION = metrics.register(Histogram(
+    "linkedin_llm_call_duration_seconds", "Wall time of an LLM call", ["node", "model", "iteration"]
+))
+LLM_QUEUE_WAIT = metrics.register(Histogram(
+    "linkedin_llm_queue_wait_seconds",
+    "LLM call time not spent loading, evaluating the prompt or generating (server queue and network)",
+    ["node", "model"]
+))
+LLM_PROMPT_TOKENS = metrics.register(Histogram(
+    "linkedin_llm_prompt_tokens", "Prompt tokens evaluated per LLM call", ["node", "model"], TOKEN_BUCKETS
+))
+LLM_COMPLETION_TOKENS = metrics.register(Histogram(
+    "linkedin_llm_completion_tokens", "Tokens generated per LLM call", ["node", "model"], TOKEN_BUCKETS
+))
+LLM_TOKENS_PER_SECOND = metrics.register(Histogram(
+    "linkedin_llm_tokens_per_second", "Generation speed of an LLM call", ["node", "model"], RATE_BUCKETS
+))
+GENERATION_SLOT_WAIT = metrics.register(Histogram(
+    "linkedin_generation_slot_wait_seconds", "Time a request waited for a generation slot of the API worker"
+))
+ADMISSION_REJECTED = metrics.register(Counter(
+    "linkedin_admission_rejected_total", "Requests rejected by admission control", ["reason"]
+))
+ADMISSION_LIMIT = metrics.register(Gauge(
+    "linkedin_admission_concurrency_limit", "Adaptive cap on concurrent generations"
+))
+ADMISSION_IN_FLIGHT = metrics.register(Gauge(
+    "linkedin_admission_in_flight", "Generations admitted and still running"
+))
+COALESCED_REQUESTS = metrics.register(Counter(
+    "linkedin_coalesced_requests_total",
+    "Requests served by an identical generation already in flight",
+    ["kind"]
+))
+WORKER_JOBS = metrics.register(Counter(
+    "linkedin_worker_jobs_total", "Jobs run by the generation worker processes, by outcome", ["worker", "outcome"]
+))
+WORKER_JOB_DURATION = metrics.register(Histogram(
+    "linkedin_worker_job_duration_seconds", "Time from dispatch to result of a worker job", ["worker"]
+))
+WORKER_IN_FLIGHT = metrics.register(Gauge(
+    "linkedin_worker_in_flight", "Jobs dispatched to a generation worker and not finished", ["worker"]
+))
+WORKER_RESTARTS = metrics.register(Counter(
+    "linkedin_worker_restarts_total", "Generation workers replaced, by reason (recycled, exited)", ["worker", "reason"]
+))
+SEMANTIC_CACHE_LOOKUPS = metrics.register(Counter(
+    "linkedin_semantic_cache_lookups_total",
+    "Editor runs looked up in the semantic cache, by result (hit, patched, miss)",
+    ["result"]
+))
+
+_tracer = _otel_trace.get_tracer("linkedin_agent") if (_otel_trace is not None and OTEL_TRACING) else None
+
+@contextmanager
+def span(name: str, **attributes: object) -> Iterator[Optional[object]]:
+    """
+    OpenTelemetry span around a block, or a no-op when tracing is off.
+    
+    Args:
+        name: Span name
+        **attributes: Span attributes
+    """
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
@@ -4,8 +4,16 @@ LinkedIn Post Generator Prompts
 Collection of prompts used by different agents in the LinkedIn post generation workflow.
 Each prompt is carefully crafted to guide the AI in performing specific tasks
 in the content creation and refinement process.
+
+The system prompts are registered in `prompt_library` together with the
+template of their user message, by name and version (see
+`src.utils.templates`). Set `PROMPT_VARIANTS` to pin another version or
+to split generations between versions.
 """
 
+from src.utils.constants import PROMPT_VARIANTS
+from src.utils.templates import PromptLibrary, PromptTemplate, parse_variants
+
 EDITOR_PROMPT = """You are a professional content editor specializing in business communication. Your task is to:
 
 1. Structure and Clarity:
@@ -104,4 +112,72 @@ Provide specific, actionable feedback for each dimension. Include:
 - Specific suggestions for enhancement
 
 Be constructive and detailed in your feedback, focusing on concrete improvements.
-""" 
\ No newline at end of file
+
+End your answer with exactly these two lines:
+SCORE: <overall score from 1 to 10>
+VERDICT: <APPROVE if the post is ready to publish as is, otherwise REVISE>
+"""
+
+SUMMARY_PROMPT = """You are a professional content editor. Condense the text you are given into a faithful summary:
+
+1. Keep the core message, key facts, figures and examples
+2. Keep the author's voice and industry-specific terms
+3. Drop repetitions, digressions and filler
+4. Stay within the requested length
+
+Respond only with the summary, without explanations or comments.
+"""
+
+prompt_library = PromptLibrary(parse_variants(PROMPT_VARIANTS))
+
+EDITOR = prompt_library.register("editor", "v1", EDITOR_PROMPT, """
+    {header}
+    ```
+    {text}
+    ```
+""")
+
+SUMMARY = prompt_library.register("editor_summary", "v1", SUMMARY_PROMPT, """
+    Summarize this text in at most {max_words} words:
+    ```
+    {text}
+    ```
+""")
+
+# Static and per-generation parts first so consecutive calls share the
+# longest possible prompt prefix (reused from the model KV cache)
+LINKEDIN_WRITER = prompt_library.register("linkedin_writer", "v1", LINKEDIN_PROMPT, """
+    text:
+    ```
+    {source}
+    ```
+
+    Target audience: {target_audience}
+
+    {feedback}Write only the post content.
+""")
+
+LINKEDIN_CRITIQUE = prompt_library.register("linkedin_critique", "v1", LINKEDIN_CRITIQUE_PROMPT, """
+    Original text:
+    ```
+    {source}
+    ```
+
+    Target audience: {target_audience}
+
+    Current LinkedIn post:
+    ```
+    {draft}
+    ```
+""")
+
+# Nested in the writer prompt, empty before the first critique
+FEEDBACK_SECTION = PromptTemplate("""
+    Previous version and feedback:
+    ```
+    Post: {draft}
+    Feedback: {feedback}
+    ```
+""", end="\n\n")
+
+prompt_library.validate()
@@ -0,0 +1,15 @@
+"""
+Token stream plumbing
+---------------------
+Context-local sink receiving LLM tokens as they are generated. The
+streaming entry point installs a sink for the duration of one workflow
+run; nodes executed inside that run forward their tokens to it. Outside
+of a streaming run no sink is set and LLM calls are not streamed.
+"""
+
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+TokenSink = Callable[[str, str], None]
+
+token_sink: ContextVar[Optional[TokenSink]] = ContextVar("token_sink", default=None)
@@ -1,21 +1,85 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph
 from src.models.state import OverallState
 from src.models.config import Configuration
+from src.services.backends.pool import routing_affinity
+from src.services.checkpoint import get_checkpointer
 from src.services.linkedin_agent import LinkedInAgent
+from src.utils.metrics import NODE_DURATION, span
 
-def build_linkedin_workflow() -> StateGraph:
-    """Build and return the LinkedIn workflow"""
+def _node(
+    name: str,
+    func: Callable[[OverallState], Dict[str, Any]],
+    afunc: Callable[[OverallState], Awaitable[Dict[str, Any]]]
+) -> RunnableLambda:
+    """
+    Wrap a node implementation pair (sync for invoke, async for ainvoke).
+
+    The generation id is bound for the duration of the node so the LLM
+    host pool can route all calls of a generation to the same host, and
+    the node wall time is recorded (metrics and tracing span).
+    """
+    def run(state: OverallState) -> Dict[str, Any]:
+        token = routing_affinity.set(state.get("generation_id"))
+        started_at = time.perf_counter()
+        try:
+            with span(f"node.{name}", generation_id=state.get("generation_id") or ""):
+                return func(state)
+        finally:
+            NODE_DURATION.observe(time.perf_counter() - started_at, node=name)
+            routing_affinity.reset(token)
+
+    async def arun(state: OverallState) -> Dict[str, Any]:
+        token = routing_affinity.set(state.get("generation_id"))
+        started_at = time.perf_counter()
+        try:
+            with span(f"node.{name}", generation_id=state.get("generation_id") or ""):
+                return await afunc(state)
+        finally:
+            NODE_DURATION.observe(time.perf_counter() - started_at, node=name)
+            routing_affinity.reset(token)
+
+    return RunnableLambda(run, afunc=arun)
+
+def editor_step(agent: LinkedInAgent) -> RunnableLambda:
+    """
+    The editor node on its own, for the editor pass shared by the
+    audiences of a multi-audience generation
+    """
+    return _node("editor", agent.editor_node, agent.aeditor_node)
+
+def _entry(loop_node: str) -> Callable[[OverallState], str]:
+    """Entry routing: a state already edited (one audience of a fan-out) starts at the loop"""
+    return lambda x: loop_node if x.get("edit_text") else "editor"
+
+def create_linkedin_graph(agent: LinkedInAgent) -> StateGraph:
+    """
+    Create the (uncompiled) LinkedIn workflow graph around an agent.
+
+    Args:
+        agent: Agent providing the node implementations
+
+    Returns:
+        The workflow graph, ready to be compiled
+    """
     workflow = StateGraph(schema=OverallState)
-    agent = LinkedInAgent()
+    if agent.config.pipelined:
+        return _pipelined_graph(workflow, agent)
 
     # Adding nodes
-    workflow.add_node("editor", agent.editor_node)
-    workflow.add_node("linkedin_writer", agent.linkedin_writer_node)
-    workflow.add_node("linkedin_critique", agent.critique_linkedin_node)
-    workflow.add_node("supervisor", agent.supervisor_node)
+    nodes = {
+        "editor": (agent.editor_node, agent.aeditor_node),
+        "linkedin_writer": (agent.linkedin_writer_node, agent.alinkedin_writer_node),
+        "linkedin_critique": (agent.critique_linkedin_node, agent.acritique_linkedin_node),
+        "supervisor": (agent.supervisor_node, agent.asupervisor_node),
+    }
+    for name, (func, afunc) in nodes.items():
+        workflow.add_node(name, _node(name, func, afunc))
 
     # Adding edges with conditional routing
-    workflow.set_entry_point("editor")
+    workflow.set_conditional_entry_point(_entry("linkedin_writer"))
     workflow.add_edge("editor", "linkedin_writer")
     workflow.add_edge("linkedin_writer", "supervisor")
     
@@ -25,6 +89,47 @@ def build_linkedin_workflow() -> StateGraph:
         lambda x: END if x["workflow_status"] == "completed" else "linkedin_critique"
     )
     
-    workflow.add_edge("linkedin_critique", "linkedin_writer")
+    # The critic may approve the draft and end the loop early
+    workflow.add_conditional_edges(
+        "linkedin_critique",
+        lambda x: END if x["workflow_status"] == "completed" else "linkedin_writer"
+    )
+
+    return workflow
+
+def _pipelined_graph(workflow: StateGraph, agent: LinkedInAgent) -> StateGraph:
+    """
+    Pipelined topology: one `linkedin_draft` step per round.
+
+    The round writes the draft, then starts its critique right away while
+    the supervisor decides on it (see `LinkedInAgent.adraft_node`), so no
+    graph step separates a draft from its critique or the critique from
+    the next draft.
+    """
+    workflow.add_node("editor", editor_step(agent))
+    workflow.add_node("linkedin_draft", _node("linkedin_draft", agent.draft_node, agent.adraft_node))
+
+    workflow.set_conditional_entry_point(_entry("linkedin_draft"))
+    workflow.add_edge("editor", "linkedin_draft")
+    workflow.add_conditional_edges(
+        "linkedin_draft",
+        lambda x: END if x["workflow_status"] == "completed" else "linkedin_draft"
+    )
+    return workflow
+
+def build_linkedin_workflow(
+    config: Optional[Configuration] = None,
+    agent: Optional[LinkedInAgent] = None
+):
+    """
+    Build and return the compiled LinkedIn workflow
+
+    Args:
+        config: Workflow configuration, defaults are used when omitted
+        agent: Existing agent to reuse, a new one is created when omitted
 
-    return workflow.compile() 
\ No newline at end of file
+    Returns:
+        The compiled workflow
+    """
+    agent = agent or LinkedInAgent(config)
+    return create_linkedin_graph(agent).compile(checkpointer=get_checkpointer())